@@ -0,0 +1,231 @@
+"""
+Shared measurement helpers for the gs_prompt_manager benchmark scripts.
+
+Every benchmark produces a list of result records (plain dicts) that are written
+to a JSON file together with some environment metadata, so that runs from
+different commits can be compared with `compare_results`.
+"""
+import datetime
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+# Make the in-tree package importable when running the scripts from a checkout
+_SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if os.path.isdir(_SRC_DIR) and _SRC_DIR not in sys.path:
+    sys.path.insert(0, _SRC_DIR)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    Return the `pct` percentile (0-100) of an already sorted list, with linear interpolation.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def measure_latency(
+    func: Callable[[], object], repeat: int, warmup: int = 10
+) -> Dict[str, float]:
+    """
+    Call `func` `repeat` times and return throughput and latency percentiles (microseconds).
+    """
+    for _ in range(warmup):
+        func()
+
+    timings: List[float] = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        timer = time.perf_counter
+        total_start = timer()
+        for _ in range(repeat):
+            start = timer()
+            func()
+            timings.append(timer() - start)
+        total = timer() - total_start
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    timings.sort()
+    return {
+        "calls": repeat,
+        "ops_per_sec": repeat / total if total > 0 else 0.0,
+        "mean_us": sum(timings) / len(timings) * 1e6,
+        "p50_us": percentile(timings, 50) * 1e6,
+        "p90_us": percentile(timings, 90) * 1e6,
+        "p99_us": percentile(timings, 99) * 1e6,
+        "max_us": timings[-1] * 1e6,
+    }
+
+
+def measure_allocations(func: Callable[[], object], calls: int = 20) -> Dict[str, float]:
+    """
+    Return the average number of bytes and blocks still allocated plus the peak traced memory per call.
+    """
+    func()  # populate any lazy caches outside of the traced window
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        base_current, _ = tracemalloc.get_traced_memory()
+        peak_total = 0
+        results = []
+        for _ in range(calls):
+            results.append(func())
+            _, peak = tracemalloc.get_traced_memory()
+            peak_total = max(peak_total, peak - base_current)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    diff = after.compare_to(before, "filename")
+    size = sum(stat.size_diff for stat in diff if stat.size_diff > 0)
+    blocks = sum(stat.count_diff for stat in diff if stat.count_diff > 0)
+    return {
+        "alloc_bytes_per_call": size / calls,
+        "alloc_blocks_per_call": blocks / calls,
+        "peak_alloc_bytes": float(peak_total),
+    }
+
+
+def git_revision() -> Optional[str]:
+    """
+    Return the current git commit hash of the checkout, if available.
+    """
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+        return out.stdout.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment_info() -> dict:
+    """
+    Describe the machine and interpreter a result file was produced on.
+    """
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "git_revision": git_revision(),
+        "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def write_results(path: str, suite: str, results: List[dict]) -> None:
+    """
+    Write benchmark results as JSON to `path`.
+    """
+    payload = {"suite": suite, "environment": environment_info(), "results": results}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+
+
+def load_results(path: str) -> dict:
+    """
+    Load a result file written by `write_results`.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_results(
+    current: List[dict],
+    baseline: List[dict],
+    metrics: Dict[str, str],
+    threshold: float = 0.10,
+) -> List[dict]:
+    """
+    Compare two result lists by record "name" and report regressions.
+
+    Args:
+        current: List[dict]
+            Records from the run under test.
+        baseline: List[dict]
+            Records from the stored baseline.
+        metrics: Dict[str, str]
+            Metric name to direction, "lower" if lower is better, "higher" otherwise.
+        threshold: float
+            Relative change tolerated before a metric counts as regressed.
+
+    Returns:
+        List[dict]: One entry per compared metric, with a "regressed" flag.
+    """
+    baseline_by_name = {record["name"]: record for record in baseline}
+    report = []
+    for record in current:
+        old = baseline_by_name.get(record["name"])
+        if old is None:
+            continue
+        for metric, direction in metrics.items():
+            if metric not in record or metric not in old or not old[metric]:
+                continue
+            ratio = record[metric] / old[metric]
+            if direction == "lower":
+                regressed = ratio > 1 + threshold
+            else:
+                regressed = ratio < 1 - threshold
+            report.append(
+                {
+                    "name": record["name"],
+                    "metric": metric,
+                    "baseline": old[metric],
+                    "current": record[metric],
+                    "ratio": ratio,
+                    "regressed": regressed,
+                }
+            )
+    return report
+
+
+def print_table(results: List[dict], columns: List[str]) -> None:
+    """
+    Print results as a fixed width text table.
+    """
+    name_width = max([len("name")] + [len(r["name"]) for r in results])
+    header = "name".ljust(name_width) + "".join(c.rjust(16) for c in columns)
+    print(header)
+    print("-" * len(header))
+    for record in results:
+        row = record["name"].ljust(name_width)
+        for column in columns:
+            value = record.get(column, "")
+            if isinstance(value, float):
+                value = f"{value:.2f}"
+            row += str(value).rjust(16)
+        print(row)
+
+
+def print_comparison(report: List[dict]) -> int:
+    """
+    Print a comparison report and return the number of regressions.
+    """
+    regressions = [entry for entry in report if entry["regressed"]]
+    for entry in report:
+        flag = "REGRESSED" if entry["regressed"] else "ok"
+        print(
+            f"{entry['name']:<48} {entry['metric']:<22} "
+            f"{entry['baseline']:>14.2f} -> {entry['current']:>14.2f} "
+            f"({entry['ratio']:.2f}x) {flag}"
+        )
+    print(f"{len(regressions)} regression(s) out of {len(report)} compared metric(s).")
+    return len(regressions)
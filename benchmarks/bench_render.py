@@ -0,0 +1,207 @@
+"""
+Render-path microbenchmarks for PromptBase.
+
+Generates synthetic PromptBase subclasses and measures `get_prompt_chat` /
+`get_prompt_system` along four axes, varying one at a time around a base case:
+
+    template_size     static characters in the template
+    piece_count       number of {piece} slots
+    piece_value_size  characters per piece value
+    macro_count       number of <<MACRO>> substitutions
+
+Usage:
+    python benchmarks/bench_render.py --output render.json
+    python benchmarks/bench_render.py --output render.json --baseline render_baseline.json
+"""
+import argparse
+import sys
+from typing import Dict, List
+
+import _harness
+from gs_prompt_manager import PromptBase
+
+BASE_CASE = {
+    "template_size": 2_000,
+    "piece_count": 8,
+    "piece_value_size": 100,
+    "macro_count": 2,
+}
+
+AXES = {
+    "template_size": [200, 2_000, 20_000, 200_000],
+    "piece_count": [1, 8, 64, 256],
+    "piece_value_size": [10, 1_000, 100_000],
+    "macro_count": [0, 4, 32, 128],
+}
+
+COMPARED_METRICS = {
+    "p50_us": "lower",
+    "p99_us": "lower",
+    "ops_per_sec": "higher",
+    "alloc_bytes_per_call": "lower",
+}
+
+_FILLER = "The quick brown fox jumps over the lazy dog. "
+
+
+def _filler(size: int) -> str:
+    return (_FILLER * (size // len(_FILLER) + 1))[:size]
+
+
+def build_template(template_size: int, piece_count: int, macro_count: int) -> str:
+    """
+    Build a template with the slots and macros spread evenly through the static text.
+    """
+    slots = [f"{{piece_{i}}}" for i in range(piece_count)]
+    slots += [f"<<MACRO_{i}>>" for i in range(macro_count)]
+    # interleave pieces and macros so both are spread over the template
+    slots.sort(key=lambda s: int(s.strip("{}<>").split("_")[1]))
+    chunk = template_size // (len(slots) + 1)
+    parts = [_filler(chunk)]
+    for slot in slots:
+        parts.append(slot)
+        parts.append(_filler(chunk))
+    return "".join(parts)
+
+
+def make_prompt_class(
+    template_size: int, piece_count: int, piece_value_size: int, macro_count: int
+) -> type:
+    """
+    Create a PromptBase subclass for one benchmark case.
+    """
+    template = build_template(template_size, piece_count, macro_count)
+    pieces = [f"piece_{i}" for i in range(piece_count)]
+    macros = {f"<<MACRO_{i}>>": f"macro value {i}" for i in range(macro_count)}
+    defaults = {piece: _filler(piece_value_size) for piece in pieces}
+
+    def set_prompt_chat(self):
+        return template
+
+    def set_prompt_system(self):
+        return template
+
+    def set_prompt_pieces_available(self):
+        self.prompt_pieces_available = list(pieces)
+
+    def set_prompt_pieces_default_value(self):
+        self.prompt_pieces_default_value = dict(defaults)
+
+    def set_prompt_predefine_value(self):
+        self.prompt_predefine_value = dict(macros)
+
+    def set_name(self):
+        self.name = "BenchPrompt"
+
+    def set_tools(self):
+        self.tools = []
+
+    def set_associated_prompt(self):
+        self.associated_prompt = {}
+
+    return type(
+        "BenchPrompt",
+        (PromptBase,),
+        {
+            "set_prompt_chat": set_prompt_chat,
+            "set_prompt_system": set_prompt_system,
+            "set_prompt_pieces_available": set_prompt_pieces_available,
+            "set_prompt_pieces_default_value": set_prompt_pieces_default_value,
+            "set_prompt_predefine_value": set_prompt_predefine_value,
+            "set_name": set_name,
+            "set_tools": set_tools,
+            "set_associated_prompt": set_associated_prompt,
+        },
+    )
+
+
+def iter_cases() -> List[Dict[str, int]]:
+    """
+    Return the benchmark cases: the base case plus a one-axis sweep for each axis.
+    """
+    cases = []
+    seen = set()
+    for axis, values in AXES.items():
+        for value in values:
+            case = dict(BASE_CASE)
+            case[axis] = value
+            key = tuple(sorted(case.items()))
+            if key in seen:
+                continue
+            seen.add(key)
+            cases.append(case)
+    return cases
+
+
+def _case_name(method: str, case: Dict[str, int]) -> str:
+    return "render/{}/t{}_p{}_v{}_m{}".format(
+        method,
+        case["template_size"],
+        case["piece_count"],
+        case["piece_value_size"],
+        case["macro_count"],
+    )
+
+
+def _repeat_for(case: Dict[str, int], budget: int) -> int:
+    # keep the runtime of the large cases bounded
+    work = case["template_size"] + case["piece_count"] * case["piece_value_size"]
+    return max(20, min(budget, budget * 4_000 // max(work, 1)))
+
+
+def run(repeat: int) -> List[dict]:
+    results = []
+    for case in iter_cases():
+        prompt = make_prompt_class(**case)()
+        pieces = {
+            name: _filler(case["piece_value_size"]) for name in prompt.prompt_pieces_available
+        }
+        for method in ("get_prompt_chat", "get_prompt_system"):
+            render = getattr(prompt, method)
+
+            def call(render=render):
+                return render(pieces)
+
+            record = {"name": _case_name(method, case), "method": method}
+            record.update(case)
+            record.update(_harness.measure_latency(call, _repeat_for(case, repeat)))
+            record.update(_harness.measure_allocations(call))
+            results.append(record)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    parser.add_argument("--baseline", help="Compare against a previous result file.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Relative change tolerated before reporting a regression (default: 0.10).",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=2_000, help="Calls per case for the small cases."
+    )
+    parser.add_argument("--quick", action="store_true", help="Run a short smoke pass.")
+    args = parser.parse_args(argv)
+
+    results = run(100 if args.quick else args.repeat)
+    _harness.print_table(
+        results, ["ops_per_sec", "p50_us", "p99_us", "alloc_bytes_per_call"]
+    )
+    if args.output:
+        _harness.write_results(args.output, "render", results)
+
+    if args.baseline:
+        baseline = _harness.load_results(args.baseline)["results"]
+        report = _harness.compare_results(
+            results, baseline, COMPARED_METRICS, threshold=args.threshold
+        )
+        if _harness.print_comparison(report):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""
+Startup-scaling benchmark for PromptManager over generated prompt trees.
+
+For each case a tree of prompt files is generated in a temporary directory and
+measured in a fresh subprocess, so module state and peak memory do not leak
+between cases. Recorded per case:
+
+    walk_ms         os.walk over the tree (file discovery only)
+    search_ms       PromptManager.search_available_prompts (walk + import + class scan)
+    import_ms       search_ms - walk_ms
+    instantiate_ms  instantiating every discovered class
+    init_ms         PromptManager(prompt_paths=tree) end to end, cold
+    second_init_ms  a second PromptManager over the same tree in the same process
+    metadata_ms     PromptManager.get_all_prompt_metadata over the discovered classes
+    lookup_ns       mean PromptManager.get_prompt hit latency
+    peak_rss_kb     peak resident set size of the worker process (Unix only)
+
+Usage:
+    python benchmarks/bench_startup.py --output startup.json
+    python benchmarks/bench_startup.py --sizes 10 100 1000 --depths 1 4 --output startup.json
+    python benchmarks/bench_startup.py --output startup.json --baseline startup_baseline.json
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+import _harness
+
+DEFAULT_SIZES = [10, 100, 1_000, 10_000, 50_000]
+DEFAULT_DEPTHS = [1, 4]
+IMPORT_COSTS = ["light", "heavy"]
+FILES_PER_DIRECTORY = 100
+
+COMPARED_METRICS = {
+    "walk_ms": "lower",
+    "import_ms": "lower",
+    "instantiate_ms": "lower",
+    "init_ms": "lower",
+    "second_init_ms": "lower",
+    "metadata_ms": "lower",
+    "lookup_ns": "lower",
+    "peak_rss_kb": "lower",
+}
+
+_PROMPT_TEMPLATE = '''
+from gs_prompt_manager import PromptBase
+{extra}
+
+class Prompt{index}(PromptBase):
+    def set_prompt_chat(self):
+        return "Prompt {index} for {{topic}} at <<DATETIME>>"
+
+    def set_prompt_system(self):
+        return "You are assistant number {index}."
+
+    def set_prompt_pieces_available(self):
+        self.prompt_pieces_available = ["topic"]
+
+    def set_prompt_pieces_default_value(self):
+        self.prompt_pieces_default_value = {{"topic": "anything"}}
+
+    def set_name(self):
+        self.name = "Prompt{index}"
+
+    def set_tools(self):
+        self.tools = ["tool_{index}"]
+
+    def set_associated_prompt(self):
+        self.associated_prompt = {{}}
+'''
+
+# Simulates prompt modules that do real work at import time
+_HEAVY_EXTRA = "\n".join(
+    ["import json", "import textwrap"]
+    + [f"CONSTANT_{i} = textwrap.dedent('''  value {i}  ''') * 20" for i in range(100)]
+    + [f"def helper_{i}(x):\n    return json.dumps({{'x': x, 'i': {i}}})" for i in range(50)]
+)
+
+
+def generate_tree(root: str, size: int, depth: int, import_cost: str) -> None:
+    """
+    Write `size` prompt files under `root`, nested `depth` directory levels deep.
+    """
+    extra = _HEAVY_EXTRA if import_cost == "heavy" else ""
+    levels = depth - 1
+    directories = max(1, size // FILES_PER_DIRECTORY)
+    fan_out = max(1, round(directories ** (1.0 / levels))) if levels else 1
+    for index in range(size):
+        parts = [root]
+        bucket = index // FILES_PER_DIRECTORY
+        for level in range(levels):
+            parts.append(f"d{level}_{bucket % fan_out}")
+            bucket //= fan_out
+        directory = os.path.join(*parts)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"prompt_{index}.py"), "w") as f:
+            f.write(_PROMPT_TEMPLATE.format(index=index, extra=extra))
+
+
+def _peak_rss_kb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def measure_tree(root: str, lookups: int = 10_000) -> dict:
+    """
+    Measure one generated tree in the current process.
+    """
+    from gs_prompt_manager import PromptManager
+
+    start = time.perf_counter()
+    file_count = 0
+    for _, _, files in os.walk(root):
+        file_count += sum(1 for f in files if f.endswith(".py"))
+    walk_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    classes = PromptManager.search_available_prompts(root)
+    search_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for prompt_class in classes.values():
+        prompt_class()
+    instantiate_s = time.perf_counter() - start
+
+    # measure a cold start; search_available_prompts may have filled the module cache
+    clear_module_cache = getattr(PromptManager, "clear_module_cache", None)
+    if clear_module_cache is not None:
+        clear_module_cache()
+    start = time.perf_counter()
+    manager = PromptManager(prompt_paths=root)
+    init_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    PromptManager(prompt_paths=root)
+    second_init_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    PromptManager.get_all_prompt_metadata(classes)
+    metadata_s = time.perf_counter() - start
+
+    names = manager.get_prompt_names()
+    sample = [random.choice(names) for _ in range(lookups)] if names else []
+    start = time.perf_counter()
+    for name in sample:
+        manager.get_prompt(name)
+    lookup_ns = (time.perf_counter() - start) / max(len(sample), 1) * 1e9
+
+    return {
+        "files": file_count,
+        "prompts": len(names),
+        "walk_ms": walk_s * 1e3,
+        "search_ms": search_s * 1e3,
+        "import_ms": max(search_s - walk_s, 0.0) * 1e3,
+        "instantiate_ms": instantiate_s * 1e3,
+        "init_ms": init_s * 1e3,
+        "second_init_ms": second_init_s * 1e3,
+        "metadata_ms": metadata_s * 1e3,
+        "lookup_ns": lookup_ns,
+        "peak_rss_kb": _peak_rss_kb(),
+    }
+
+
+def run_case(size: int, depth: int, import_cost: str, keep_tree: bool = False) -> dict:
+    """
+    Generate a tree and measure it in a fresh interpreter.
+    """
+    root = tempfile.mkdtemp(prefix="gs_prompt_bench_")
+    try:
+        generate_tree(root, size, depth, import_cost)
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", root],
+            stdout=subprocess.PIPE,
+            check=True,
+        )
+        record = json.loads(out.stdout.decode().strip().splitlines()[-1])
+    finally:
+        if not keep_tree:
+            shutil.rmtree(root, ignore_errors=True)
+    record.update(
+        {
+            "name": f"startup/n{size}_d{depth}_{import_cost}",
+            "size": size,
+            "depth": depth,
+            "import_cost": import_cost,
+        }
+    )
+    return record
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--depths", type=int, nargs="+", default=DEFAULT_DEPTHS)
+    parser.add_argument(
+        "--import-costs", nargs="+", default=IMPORT_COSTS, choices=IMPORT_COSTS
+    )
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    parser.add_argument("--baseline", help="Compare against a previous result file.")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument("--quick", action="store_true", help="Only run sizes up to 1000.")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(measure_tree(args.worker)))
+        return 0
+
+    sizes = [s for s in args.sizes if s <= 1_000] if args.quick else args.sizes
+    results: List[dict] = []
+    for import_cost in args.import_costs:
+        for depth in args.depths:
+            for size in sizes:
+                results.append(run_case(size, depth, import_cost))
+                print(f"done {results[-1]['name']}", file=sys.stderr)
+
+    _harness.print_table(
+        results,
+        [
+            "walk_ms",
+            "import_ms",
+            "instantiate_ms",
+            "init_ms",
+            "second_init_ms",
+            "lookup_ns",
+            "peak_rss_kb",
+        ],
+    )
+    if args.output:
+        _harness.write_results(args.output, "startup", results)
+
+    if args.baseline:
+        baseline = _harness.load_results(args.baseline)["results"]
+        report = _harness.compare_results(
+            results, baseline, COMPARED_METRICS, threshold=args.threshold
+        )
+        if _harness.print_comparison(report):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
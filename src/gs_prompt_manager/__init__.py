@@ -1,4 +1,49 @@
-from gs_prompt_manager.prompt_manager import PromptManager
-from gs_prompt_manager.prompt_base import PromptBase
+from typing import TYPE_CHECKING
 
-__all__ = ["PromptManager", "PromptBase"]
+# Exported names -> defining module. Modules are imported on first attribute access
+# (PEP 562), so `import gs_prompt_manager` does not pay for the ones that are not used.
+_EXPORTS = {
+    "PromptManager": "gs_prompt_manager.prompt_manager",
+    "PromptBase": "gs_prompt_manager.prompt_base",
+    "ExampleSelector": "gs_prompt_manager.example_selector",
+    "PromptStore": "gs_prompt_manager.prompt_store",
+    "RenderCache": "gs_prompt_manager.render_cache",
+    "ToolRegistry": "gs_prompt_manager.tool_registry",
+    "WarningAggregator": "gs_prompt_manager.warning_aggregator",
+    "get_warning_aggregator": "gs_prompt_manager.warning_aggregator",
+}
+
+if TYPE_CHECKING:
+    from gs_prompt_manager.prompt_manager import PromptManager
+    from gs_prompt_manager.prompt_base import PromptBase
+    from gs_prompt_manager.example_selector import ExampleSelector
+    from gs_prompt_manager.prompt_store import PromptStore
+    from gs_prompt_manager.render_cache import RenderCache
+    from gs_prompt_manager.tool_registry import ToolRegistry
+    from gs_prompt_manager.warning_aggregator import WarningAggregator, get_warning_aggregator
+
+__all__ = [
+    "PromptManager",
+    "PromptBase",
+    "ExampleSelector",
+    "PromptStore",
+    "RenderCache",
+    "ToolRegistry",
+    "WarningAggregator",
+    "get_warning_aggregator",
+]
+
+
+def __getattr__(name: str):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'gs_prompt_manager' has no attribute '{name}'")
+    import importlib
+
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
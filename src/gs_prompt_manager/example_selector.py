@@ -0,0 +1,147 @@
+import re
+from typing import Dict, List, Optional, Sequence
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _require_numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError(
+            "Example selection requires numpy. Install it with "
+            "'pip install gs_prompt_manager[examples]'."
+        ) from e
+    return numpy
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase word tokens.
+    """
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class ExampleSelector:
+    """
+    Lexical top-k selector over a bank of few-shot examples.
+    At construction every example is turned into a TF-IDF vector (sublinear term frequency,
+    smoothed idf, L2 normalized) and stacked into one dense NumPy matrix; a query is scored
+    against all examples with a single matrix product. Runs locally, no model is needed.
+    """
+
+    def __init__(self, examples: Sequence, fields: Optional[Sequence[str]] = None):
+        """
+        Args:
+            examples: Sequence
+                The example bank. Dict items are indexed by the string values of `fields`
+                (default: all string values), other items by str(item).
+            fields: Sequence[str], optional
+                Dict keys whose values are indexed.
+        """
+        np = _require_numpy()
+        self.examples = list(examples)
+        self.fields = tuple(fields) if fields is not None else None
+
+        documents = [tokenize(self._example_text(example)) for example in self.examples]
+        vocabulary: Dict[str, int] = {}
+        for tokens in documents:
+            for token in tokens:
+                vocabulary.setdefault(token, len(vocabulary))
+        self.vocabulary = vocabulary
+
+        counts = self._count_matrix(documents)
+        document_frequency = (counts > 0).sum(axis=0)
+        n = len(self.examples)
+        self.idf = (np.log((1.0 + n) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+        self.matrix = self._weight(counts)
+
+    def _example_text(self, example) -> str:
+        if isinstance(example, dict):
+            if self.fields is not None:
+                values = [example.get(field) for field in self.fields]
+            else:
+                values = list(example.values())
+            return "\n".join(value for value in values if isinstance(value, str))
+        return str(example)
+
+    def _count_matrix(self, documents: List[List[str]]):
+        """
+        Term counts of tokenized documents over the vocabulary; unknown tokens are dropped.
+        """
+        np = _require_numpy()
+        vocabulary = self.vocabulary
+        rows: List[int] = []
+        cols: List[int] = []
+        for row, tokens in enumerate(documents):
+            for token in tokens:
+                col = vocabulary.get(token)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+        counts = np.zeros((len(documents), len(vocabulary)), dtype=np.float32)
+        if rows:
+            np.add.at(counts, (np.asarray(rows), np.asarray(cols)), 1.0)
+        return counts
+
+    def _weight(self, counts):
+        """
+        Turn term counts into L2 normalized TF-IDF rows (in place).
+        """
+        np = _require_numpy()
+        nonzero = counts > 0
+        counts[nonzero] = np.log(counts[nonzero]) + 1.0
+        counts *= self.idf
+        norms = np.linalg.norm(counts, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        counts /= norms
+        return counts
+
+    def scores(self, queries: Sequence[str]):
+        """
+        Cosine similarity of every query against every example.
+
+        Returns:
+            numpy.ndarray: Array of shape (len(queries), len(examples)).
+        """
+        query_matrix = self._weight(self._count_matrix([tokenize(q) for q in queries]))
+        return query_matrix @ self.matrix.T
+
+    def select_batch(self, queries: Sequence[str], k: int = 3) -> List[list]:
+        """
+        Return the k most similar examples for every query, best first.
+        Ties keep the bank order.
+
+        Args:
+            queries: Sequence[str]
+                Query texts, scored together.
+            k: int
+                Number of examples per query.
+
+        Returns:
+            List[list]: One list of examples per query.
+        """
+        np = _require_numpy()
+        if k < 0:
+            raise ValueError(f"k must be non-negative, got {k}.")
+        k = min(k, len(self.examples))
+        if not k or not len(queries):
+            return [[] for _ in queries]
+        scores = self.scores(queries)
+        # a stable sort keeps the bank order between equally scored examples
+        top = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+        examples = self.examples
+        selected = [[examples[i] for i in row] for row in top.tolist()]
+        return selected
+
+    def select(self, query: str, k: int = 3) -> list:
+        """
+        Return the k examples most similar to `query`, best first.
+        """
+        return self.select_batch([query], k)[0]
+
+    def __len__(self) -> int:
+        return len(self.examples)
+
+    def __repr__(self) -> str:
+        return f"ExampleSelector(examples={len(self.examples)}, vocabulary={len(self.vocabulary)})"
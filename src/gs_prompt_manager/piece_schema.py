@@ -0,0 +1,148 @@
+import re
+from typing import Callable, Dict, List
+
+# Schema type names (Python and JSON schema spellings) -> accepted Python types
+_TYPES = {
+    "str": (str,),
+    "string": (str,),
+    "int": (int,),
+    "integer": (int,),
+    "float": (int, float),
+    "number": (int, float),
+    "bool": (bool,),
+    "boolean": (bool,),
+    "list": (list, tuple),
+    "array": (list, tuple),
+    "dict": (dict,),
+    "object": (dict,),
+}
+
+SCHEMA_KEYS = ("type", "max_length", "min_length", "allowed", "regex")
+
+
+def _compile_pattern(pattern: str):
+    """
+    Compile a schema pattern with the third-party `regex` module when it is installed
+    (Unicode properties, possessive quantifiers, ...), otherwise with the standard `re`.
+    """
+    try:
+        import regex
+    except ImportError:
+        return re.compile(pattern)
+    return regex.compile(pattern)
+
+
+def compile_piece_validator(piece: str, schema: dict, prompt_name: str) -> Callable[[object], None]:
+    """
+    Compile the schema of one prompt piece into a function that raises ValueError for an invalid value.
+
+    Args:
+        piece: str
+            Name of the piece, used in error messages.
+        schema: dict
+            Any of: "type" (e.g. "str", "int", "number", "list"), "max_length", "min_length"
+            (len of str/list values, of str(value) otherwise), "allowed" (values) and "regex"
+            (must match the whole str(value)).
+        prompt_name: str
+            Name of the prompt, used in error messages.
+
+    Returns:
+        Callable[[object], None]: The validator.
+
+    Raises:
+        ValueError: If the schema itself is invalid.
+    """
+    unknown = [key for key in schema if key not in SCHEMA_KEYS]
+    if unknown:
+        raise ValueError(
+            f"Unknown schema keys {unknown} for piece '{piece}' of '{prompt_name}'. Allowed: {list(SCHEMA_KEYS)}"
+        )
+    where = f"Prompt piece '{piece}' for {prompt_name}"
+    checks: List[Callable[[object], None]] = []
+
+    type_name = schema.get("type")
+    if type_name is not None:
+        types = _TYPES.get(type_name)
+        if types is None:
+            raise ValueError(
+                f"Unknown type '{type_name}' for piece '{piece}' of '{prompt_name}'. Allowed: {list(_TYPES)}"
+            )
+        # bool is an int subclass, but not a valid int or number piece
+        reject_bool = bool not in types
+
+        def check_type(value):
+            if not isinstance(value, types) or (reject_bool and isinstance(value, bool)):
+                raise ValueError(f"{where} must be of type {type_name}, got {type(value).__name__}.")
+
+        checks.append(check_type)
+
+    min_length = schema.get("min_length")
+    max_length = schema.get("max_length")
+    if min_length is not None or max_length is not None:
+
+        def check_length(value):
+            length = len(value) if isinstance(value, (str, list, tuple, dict)) else len(str(value))
+            if max_length is not None and length > max_length:
+                raise ValueError(f"{where} is too long: {length} > max_length {max_length}.")
+            if min_length is not None and length < min_length:
+                raise ValueError(f"{where} is too short: {length} < min_length {min_length}.")
+
+        checks.append(check_length)
+
+    allowed = schema.get("allowed")
+    if allowed is not None:
+        try:
+            allowed_values = frozenset(allowed)
+        except TypeError:
+            allowed_values = list(allowed)
+
+        def check_allowed(value):
+            try:
+                ok = value in allowed_values
+            except TypeError:
+                ok = False
+            if not ok:
+                raise ValueError(f"{where} must be one of {list(allowed)}, got {value!r}.")
+
+        checks.append(check_allowed)
+
+    pattern = schema.get("regex")
+    if pattern is not None:
+        compiled = _compile_pattern(pattern)
+
+        def check_regex(value):
+            if compiled.fullmatch(value if isinstance(value, str) else str(value)) is None:
+                raise ValueError(f"{where} does not match {pattern!r}.")
+
+        checks.append(check_regex)
+
+    if len(checks) == 1:
+        return checks[0]
+
+    def validate(value):
+        for check in checks:
+            check(value)
+
+    return validate
+
+
+def compile_piece_validators(
+    schemas: Dict[str, dict], available: List[str], prompt_name: str
+) -> Dict[str, Callable[[object], None]]:
+    """
+    Compile the piece schemas of a prompt, see compile_piece_validator.
+
+    Raises:
+        ValueError: If a schema is invalid or names a piece that is not available.
+    """
+    validators = {}
+    for piece, schema in schemas.items():
+        if piece not in available:
+            raise ValueError(
+                f"Schema for piece '{piece}' of '{prompt_name}', which is not in prompt_pieces_available. Allowed: {available}"
+            )
+        if not isinstance(schema, dict):
+            raise ValueError(f"Schema for piece '{piece}' of '{prompt_name}' must be a dict.")
+        if schema:
+            validators[piece] = compile_piece_validator(piece, schema, prompt_name)
+    return validators
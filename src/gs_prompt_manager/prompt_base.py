@@ -1,10 +1,39 @@
-import regex
 import logging
+import re
 from abc import abstractmethod
+import copy
 import datetime
+import functools
+import hashlib
+import json
+from typing import Iterable, List
+from gs_prompt_manager.example_selector import ExampleSelector
+from gs_prompt_manager.piece_schema import compile_piece_validators
+from gs_prompt_manager.prompt_template import (
+    CompiledTemplate,
+    PieceStream,
+    PrefixRender,
+    RenderHandle,
+    SlotValue,
+    find_unresolved_macros,
+    join_value,
+    substitute_macros,
+)
+from gs_prompt_manager.warning_aggregator import (
+    UNKNOWN_PIECE,
+    UNRESOLVED_MACRO,
+    get_warning_aggregator,
+)
 
 logger = logging.getLogger(__name__)
 
+_PIECE_PATTERN = re.compile(r"\{(.*?)\}")
+
+_MESSAGE_OPENERS = {
+    role: ('{"role": "%s", "content": "' % role).encode("utf-8")
+    for role in ("system", "user")
+}
+
 
 class PromptBase:
     """
@@ -13,6 +42,22 @@ class PromptBase:
     Instantiation directly is possible (with all args), but discouraged in favor of subclassing.
     """
 
+    # Sink for render-time warnings (unknown pieces, unresolved macros); shared by default
+    warning_aggregator = get_warning_aggregator()
+
+    # Optional shared RenderCache for get_prompt_chat / get_prompt_system; None disables caching
+    render_cache = None
+
+    # Predefine macros whose value may change between renders or processes. They are kept as
+    # slots in the compiled template, so they do not break the cacheable static prefix.
+    volatile_predefine_keys = ("<<DATETIME>>",)
+    # Keys of example_bank items indexed by the example selector (None: all string values)
+    example_fields = None
+    # Resolves associated prompt names to instances; set by the PromptManager that loads the prompt
+    _prompt_resolver = None
+    # Resolved tool definitions (a ToolSet); set by a PromptManager created with a tool registry
+    _tool_set = None
+
     def __init__(
         self,
         description: str = "",
@@ -30,6 +75,9 @@ class PromptBase:
         tools: list = None,
         expected_config: dict = None,
         example: dict = None,
+        prompt_pieces_repeat: dict = None,
+        example_bank: list = None,
+        associated_prompt: dict = None,
         verbose: bool = False,
     ):
         self.verbose = verbose
@@ -51,6 +99,9 @@ class PromptBase:
         self.prompt_predefine_value = (
             prompt_predefine_value if prompt_predefine_value is not None else {}
         )
+        self.prompt_pieces_repeat = (
+            prompt_pieces_repeat if prompt_pieces_repeat is not None else {}
+        )
 
         self.name = name
         self.tags = tags if tags is not None else []
@@ -64,13 +115,30 @@ class PromptBase:
             if example is not None
             else {"sample_piece": "", "sample_response": ""}
         )
+        self.example_bank = example_bank if example_bank is not None else []
+        self.example_selector = None
 
-        self.associated_prompt = {}
+        self.associated_prompt = dict(associated_prompt) if associated_prompt else {}
         self.associated_prompt_names = []
 
+        # Compiled templates keyed by template string, see _compile_template
+        self._compiled_templates = {}
+        # Compiled item templates of repeated pieces, see _compile_repeat
+        self._compiled_repeats = {}
+        # Piece validators compiled from expected_config["pieces"], see _compile_piece_validators
+        self._piece_validators = {}
+        # Piece values folded into the templates by bind()
+        self._bound_pieces = {}
+        # Content fingerprint, computed at the end of __init__ and after add_* changes
+        self._fingerprint = None
+        # _encode_definition() when the fingerprint was computed, see fingerprint
+        self._fingerprint_inputs = None
+
         # Delegate to subclass "set_*" logic if not given in init
-        self.set_tools()
-        self.set_associated_prompt()
+        if not self.tools:
+            self.set_tools()
+        if not self.associated_prompt:
+            self.set_associated_prompt()
         self.associated_prompt_names = list(self.associated_prompt.keys())
 
         if not self.prompt_chat:
@@ -103,9 +171,31 @@ class PromptBase:
             if set_val:
                 self.prompt_predefine_value = set_val
 
+        if not self.prompt_pieces_repeat:
+            set_val = self.set_prompt_pieces_repeat()
+            if set_val:
+                self.prompt_pieces_repeat = set_val
+
+        if not self.example_bank:
+            set_val = self.set_example_bank()
+            if set_val:
+                self.example_bank = set_val
+
+        if not self.expected_config:
+            set_val = self.set_expected_config()
+            if set_val:
+                self.expected_config = set_val
+
         # Post-processing and required validation
         self._check_default_prompt_pieces()
+        self._check_repeat_pieces()
         self._check_required_fields()
+        self._compile_piece_validators()
+
+        if self.example_bank:
+            self.example_selector = ExampleSelector(self.example_bank, self.example_fields)
+
+        self.fingerprint
 
     ###### Abstract set_* methods for subclass implementation #######
 
@@ -137,6 +227,7 @@ class PromptBase:
         Add a predefine macro key-value pair.
         """
         self.prompt_predefine_value[key] = value
+        self._fingerprint = None
 
     @abstractmethod
     def set_prompt_pieces_default_value(self):
@@ -156,6 +247,7 @@ class PromptBase:
         Add a default value for a specific prompt piece.
         """
         self.prompt_pieces_default_value[piece] = default_value
+        self._fingerprint = None
 
     def set_prompt_pieces_default_value_empty(self):
         for piece in self.prompt_pieces_available:
@@ -173,11 +265,9 @@ class PromptBase:
         Default: extract {key} names from prompt_chat/system.
         """
         try:
-            self.prompt_pieces_available = regex.findall(r"\{(.*?)\}", self.prompt_chat)
+            self.prompt_pieces_available = _PIECE_PATTERN.findall(self.prompt_chat)
             # add system
-            self.prompt_pieces_available += regex.findall(
-                r"\{(.*?)\}", self.prompt_system
-            )
+            self.prompt_pieces_available += _PIECE_PATTERN.findall(self.prompt_system)
         except Exception as e:
             logger.error(
                 (
@@ -191,6 +281,29 @@ class PromptBase:
         if self.verbose:
             logger.info(f"Pieces for {self.name}: {self.prompt_pieces_available}")
 
+    def set_prompt_pieces_repeat(self):
+        """
+        Subclass may define self.prompt_pieces_repeat for pieces rendered from a list:
+        {piece: {"item": item template, "separator": str}}. The item template uses {field} for
+        the fields of dict items, or {item} for the item itself. Default: none.
+        """
+        pass
+
+    def set_expected_config(self):
+        """
+        Subclass may define self.expected_config. Its "pieces" entry declares piece schemas that
+        are enforced when rendering: {piece: {"type": "str", "max_length": 2000, "allowed": [...],
+        "regex": "..."}}. Default: none.
+        """
+        pass
+
+    def set_example_bank(self):
+        """
+        Subclass may define self.example_bank: a list of few-shot examples (usually dicts) that
+        select_examples() picks the most relevant ones from. Default: none.
+        """
+        pass
+
     @abstractmethod
     def set_name(self):
         """
@@ -210,7 +323,9 @@ class PromptBase:
     @abstractmethod
     def set_associated_prompt(self):
         """
-        Subclass sets .associated_prompt (other PromptBase instances by key).
+        Subclass sets .associated_prompt: other prompts by key, given by name (bare or qualified,
+        resolved through the PromptManager registry, see get_associated_prompt) or as PromptBase
+        instances.
         """
         self.associated_prompt = {}
 
@@ -228,6 +343,32 @@ class PromptBase:
                     f"Prompt piece '{key}' in defaults, but not in prompt_pieces_available. Allowed: {self.prompt_pieces_available}"
                 )
 
+    def _check_repeat_pieces(self):
+        """
+        Ensure repeated pieces are available pieces with an item template.
+        """
+        for key, spec in self.prompt_pieces_repeat.items():
+            if key not in self.prompt_pieces_available:
+                raise ValueError(
+                    f"Repeated piece '{key}' is not in prompt_pieces_available. Allowed: {self.prompt_pieces_available}"
+                )
+            if not isinstance(spec, dict) or not isinstance(spec.get("item"), str):
+                raise ValueError(
+                    f"Repeated piece '{key}' must be a dict with an 'item' template string for '{self.name}'."
+                )
+
+    def _compile_piece_validators(self):
+        """
+        Compile the piece schemas of expected_config["pieces"] and check the defaults against them.
+        """
+        schemas = self.expected_config.get("pieces") if isinstance(self.expected_config, dict) else None
+        if not schemas:
+            return
+        self._piece_validators = compile_piece_validators(
+            schemas, self.prompt_pieces_available, self.name
+        )
+        self.validate_pieces(self.prompt_pieces_default_value)
+
     def _check_required_fields(self):
         """
         Ensure all mandatory fields are set.
@@ -244,6 +385,49 @@ class PromptBase:
                 f"At least one of 'prompt_chat' or 'prompt_system' must be set for '{self.name}'."
             )
 
+    def _encode_definition(self) -> str:
+        """
+        JSON encoding of the parts of the definition that determine what this prompt renders.
+        Volatile macros are left out, so e.g. <<DATETIME>> does not change the fingerprint.
+        """
+        definition = {
+            "name": self.name,
+            "version": self.version,
+            "prompt_chat": self.prompt_chat,
+            "prompt_system": self.prompt_system,
+            "prompt_pieces_available": list(self.prompt_pieces_available),
+            "prompt_pieces_default_value": self.prompt_pieces_default_value,
+            "prompt_predefine_value": {
+                key: value
+                for key, value in self.prompt_predefine_value.items()
+                if key not in self.volatile_predefine_keys
+            },
+            "prompt_pieces_repeat": self.prompt_pieces_repeat,
+            "bound_prompt_pieces": self._bound_pieces,
+            "example_bank": self.example_bank,
+            "tools": self.tools,
+            "expected_config": self.expected_config,
+            "associated_prompt": {
+                key: value if isinstance(value, str) else value.fingerprint
+                for key, value in self.associated_prompt.items()
+            },
+        }
+        return json.dumps(definition, sort_keys=True, default=str, ensure_ascii=False)
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Stable content fingerprint (SHA-256 hex) of this prompt definition: templates, pieces,
+        defaults, static macros, repeated pieces, examples, piece schemas, tools and version.
+        The definition is re-encoded on every access, so changes made in place (e.g. to a nested
+        default or a repeat separator) are picked up; it is only hashed again if it changed.
+        """
+        encoded = self._encode_definition()
+        if self._fingerprint is None or encoded != self._fingerprint_inputs:
+            self._fingerprint = hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+            self._fingerprint_inputs = encoded
+        return self._fingerprint
+
     ###### API #######
 
     def get_metadata(self) -> dict:
@@ -278,58 +462,327 @@ class PromptBase:
             "tools": self.tools,
             "expected_config": self.expected_config,
             "example": self.example,
+            "example_bank_size": len(self.example_bank),
             "associated_prompt_names": list(self.associated_prompt.keys()),
+            "repeat_prompt_pieces": self.prompt_pieces_repeat,
+            "bound_prompt_pieces": dict(self._bound_pieces),
+            "fingerprint": self.fingerprint,
         }
 
-    def _get_prompt(
-        self, base: str, prompt_pieces: dict = None, no_warning: bool = False
-    ) -> str:
+    def to_definition(self) -> dict:
         """
-        Fill the prompt_chat string's placeholders with provided (or default) prompt_pieces and predef macros.
+        Return the (JSON serializable) constructor arguments that recreate this prompt with
+        PromptBase.from_definition, e.g. to store it in a PromptStore. Volatile macros are left out;
+        they get fresh values when the prompt is recreated.
+
+        Raises:
+            ValueError: If the prompt has bound pieces or an associated prompt given as an instance
+                instead of by name.
+        """
+        if self._bound_pieces:
+            raise ValueError(f"Cannot export bound prompt '{self.name}'; export the unbound prompt.")
+        instances = [
+            key for key, value in self.associated_prompt.items() if not isinstance(value, str)
+        ]
+        if instances:
+            raise ValueError(
+                f"Cannot export '{self.name}': associated prompts {instances} are instances; "
+                "refer to them by name."
+            )
+        return {
+            "name": self.name,
+            "version": self.version,
+            "description": self.description,
+            "description_long": self.description_long,
+            "prompt_chat": self.prompt_chat,
+            "prompt_system": self.prompt_system,
+            "prompt_pieces_available": list(self.prompt_pieces_available),
+            "prompt_pieces_default_value": dict(self.prompt_pieces_default_value),
+            "prompt_predefine_value": {
+                key: value
+                for key, value in self.prompt_predefine_value.items()
+                if key not in self.volatile_predefine_keys
+            },
+            "prompt_pieces_repeat": dict(self.prompt_pieces_repeat),
+            "tags": list(self.tags),
+            "author": self.author,
+            "timestamp": self.timestamp,
+            "tools": list(self.tools),
+            "expected_config": self.expected_config,
+            "example": self.example,
+            "example_bank": list(self.example_bank),
+            "associated_prompt": dict(self.associated_prompt),
+        }
+
+    @classmethod
+    def from_definition(cls, definition: dict) -> "PromptBase":
+        """
+        Create a prompt from a definition returned by to_definition.
+
+        Args:
+            definition: dict
+                Constructor arguments; unknown keys are ignored.
+
+        Returns:
+            PromptBase: The prompt, with fresh values for the volatile macros.
+        """
+        import inspect
+
+        parameters = inspect.signature(PromptBase.__init__).parameters
+        prompt = cls(**{key: value for key, value in definition.items() if key in parameters})
+        for key, value in PromptBase.set_prompt_predefine_value(prompt).items():
+            if key in cls.volatile_predefine_keys:
+                prompt.prompt_predefine_value.setdefault(key, value)
+        return prompt
+
+    def _template_signature(self) -> tuple:
+        """
+        The inputs a compiled template depends on besides the template string itself.
+        """
+        return (
+            tuple(self.prompt_pieces_available),
+            tuple(self.prompt_predefine_value.items()),
+            self.volatile_predefine_keys,
+        )
+
+    def _compile_template(self, base: str) -> CompiledTemplate:
+        """
+        Return the compiled form of a template, recompiling only if the pieces or macros changed.
+        """
+        signature = self._template_signature()
+        cached = self._compiled_templates.get(base)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        compiled = CompiledTemplate.compile(
+            base,
+            list(self.prompt_pieces_available) + list(self._bound_pieces),
+            self.prompt_predefine_value,
+            self.volatile_predefine_keys,
+        )
+        if self._bound_pieces:
+            compiled = compiled.bind(self._bound_pieces)
+        self._compiled_templates[base] = (signature, compiled)
+        return compiled
+
+    def get_associated_prompt(self, key: str) -> "PromptBase":
+        """
+        Return an associated prompt. Names are resolved on every call through the registry of the
+        PromptManager that loaded this prompt, so all prompts naming the same prompt share its
+        single instance, and a reload is picked up without touching the referring prompts.
+
+        Args:
+            key: str
+                Key in associated_prompt.
+
+        Returns:
+            PromptBase: The associated prompt.
+
+        Raises:
+            ValueError: If the key is unknown, or a name cannot be resolved.
+        """
+        if key not in self.associated_prompt:
+            raise ValueError(
+                f"No associated prompt '{key}' in {self.name}. Available: {self.associated_prompt_names}"
+            )
+        value = self.associated_prompt[key]
+        if not isinstance(value, str):
+            return value
+        if self._prompt_resolver is None:
+            raise ValueError(
+                f"Associated prompt '{key}' of {self.name} names '{value}'; "
+                "load the prompt through a PromptManager to resolve names."
+            )
+        return self._prompt_resolver(value)
+
+    def get_associated_references(self) -> dict:
+        """
+        Return the associated prompts given by name, as {key: prompt name}.
+        """
+        return {
+            key: value for key, value in self.associated_prompt.items() if isinstance(value, str)
+        }
+
+    def precompile(self) -> None:
+        """
+        Compile both templates and compute the fingerprint, prefix hashes and JSON-encoded
+        static text now, instead of lazily on first use (e.g. before forking worker processes).
+        """
+        for base in (self.prompt_chat, self.prompt_system):
+            if base:
+                compiled = self._compile_template(base)
+                compiled.prefix_hash
+                compiled.json_literals
+        self.fingerprint
+
+    def validate_pieces(self, prompt_pieces: dict = None) -> None:
+        """
+        Check the given piece values against the piece schemas of expected_config["pieces"].
+        The cost depends on the number of pieces with a schema, not on the template.
+
+        Args:
+            prompt_pieces: dict, optional
+                Piece values; missing and None values are not checked.
+
+        Raises:
+            ValueError: If a value violates its piece's schema.
+        """
+        if not prompt_pieces:
+            return
+        for key, validator in self._piece_validators.items():
+            value = prompt_pieces.get(key)
+            if value is not None:
+                validator(value)
+
+    def _resolve_pieces(
+        self, prompt_pieces: dict = None, no_warning: bool = False, validate: bool = True
+    ) -> dict:
+        """
+        Validate the input keys and return the final string value of every available piece,
+        taken from prompt_pieces or the defaults, with predef macros substituted.
         """
         prompt_pieces = prompt_pieces or {}
+        available = self.prompt_pieces_available
+        macros = self.prompt_predefine_value
 
-        # Validate prompt input keys
-        for key in prompt_pieces:
-            if key not in self.prompt_pieces_available:
-                error_message = (
-                    f"Unknown piece '{key}' in prompt input for {self.name}. \n"
-                    f"Allowed: {list(self.prompt_pieces_available)}"
-                )
-                logger.warning(
-                    error_message,
-                )
+        # Validate prompt input keys; the aggregator only counts repeats
+        if prompt_pieces:
+            for key in prompt_pieces.keys() - available:
+                self.warning_aggregator.record(self.name, UNKNOWN_PIECE, key, available)
+
+        if validate and self._piece_validators:
+            self.validate_pieces(prompt_pieces)
+
+        values = {}
+        for key in available:
+            values[key] = self._resolve_piece(key, prompt_pieces.get(key), no_warning, False)
 
-        result = base
-
-        # Substitute all {var}
-        for key in self.prompt_pieces_available:
-            if key in prompt_pieces and prompt_pieces[key] is not None:
-                value = str(prompt_pieces[key])
-            elif (
-                key in self.prompt_pieces_default_value
-                and self.prompt_pieces_default_value[key] is not None
-            ):
-                value = str(self.prompt_pieces_default_value[key])
-            else:
+        # Volatile macros are slots of the compiled template
+        for key in self.volatile_predefine_keys:
+            if key in macros:
+                values[key] = str(macros[key])
+        return values
+
+    def _resolve_piece(
+        self, key: str, value, no_warning: bool = False, validate: bool = True
+    ) -> SlotValue:
+        """
+        Return the final value of one piece: the given value, or its default if None.
+        A list value of a repeated piece resolves to its list of rendered segments.
+        """
+        if validate and value is not None:
+            validator = self._piece_validators.get(key)
+            if validator is not None:
+                validator(value)
+        if value is None:
+            value = self.prompt_pieces_default_value.get(key)
+            if value is None:
                 error_message = f"Prompt piece '{key}' required in prompt input for {self.name}; none given and no default."
 
                 logger.error(error_message, exc_info=True)
                 raise ValueError(error_message)
-            result = result.replace(f"{{{key}}}", value)
-
-        # Substitute all <<VAR>>
-        for key, v in self.prompt_predefine_value.items():
-            result = result.replace(key, str(v))
+        if key in self.prompt_pieces_repeat and isinstance(value, (list, tuple)):
+            return self._render_repeat(key, value, no_warning)
+        return self._resolve_text(str(value), no_warning)
 
-        # Warn about remaining <<VAR>>
+    def _resolve_text(self, value: str, no_warning: bool = False) -> str:
+        """
+        Substitute predef macros in a piece value and report unresolved ones.
+        """
+        macros = self.prompt_predefine_value
+        if macros:
+            value = substitute_macros(value, macros)
         if not no_warning:
-            for unmatched in regex.findall(r"<<(.*?)>>", result):
-                if f"<<{unmatched}>>" not in self.prompt_predefine_value:
-                    logger.warning(
-                        f"Unresolved macro '<<{unmatched}>>' in rendered prompt for {self.name}."
+            for macro in find_unresolved_macros(value, macros):
+                self.warning_aggregator.record(self.name, UNRESOLVED_MACRO, macro)
+        return value
+
+    def _compile_repeat(self, key: str) -> CompiledTemplate:
+        """
+        Return the compiled item template of a repeated piece.
+        """
+        item = self.prompt_pieces_repeat[key]["item"]
+        signature = (item, tuple(self.prompt_predefine_value.items()))
+        cached = self._compiled_repeats.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        compiled = CompiledTemplate.compile(
+            item, _PIECE_PATTERN.findall(item), self.prompt_predefine_value
+        )
+        self._compiled_repeats[key] = (signature, compiled)
+        return compiled
+
+    def _render_repeat(self, key: str, items, no_warning: bool = False) -> list:
+        """
+        Render a list value of a repeated piece into a flat list of output segments
+        (item text and separators), which the compiled template writes out without joining first.
+        """
+        compiled = self._compile_repeat(key)
+        separator = self.prompt_pieces_repeat[key].get("separator", "\n")
+        literals = compiled.literals
+        slots = compiled.slots
+        parts = []
+        append = parts.append
+        for index, item in enumerate(items):
+            if index and separator:
+                append(separator)
+            append(literals[0])
+            if not slots:
+                continue
+            fields = item if isinstance(item, dict) else {"item": item}
+            for slot, literal in zip(slots, literals[1:]):
+                value = fields.get(slot)
+                if value is None:
+                    raise ValueError(
+                        f"Item {index} of repeated piece '{key}' has no value for '{slot}' in {self.name}."
                     )
-        return result
+                append(self._resolve_text(str(value), no_warning))
+                append(literal)
+        return parts
+
+    def _render_resolved(self, base: str, values: dict, no_warning: bool = False) -> str:
+        """
+        Render a template from already resolved piece values.
+        """
+        compiled = self._compile_template(base)
+        if not no_warning:
+            for macro in compiled.unresolved_macros:
+                self.warning_aggregator.record(self.name, UNRESOLVED_MACRO, macro)
+        return compiled.render(values)
+
+    def _get_prompt(
+        self,
+        base: str,
+        prompt_pieces: dict = None,
+        no_warning: bool = False,
+        template: str = "chat",
+    ) -> str:
+        """
+        Fill the prompt_chat string's placeholders with provided (or default) prompt_pieces and predef macros.
+        With a render_cache, a render another process (or call) already produced is reused.
+        """
+        cache = self.render_cache
+        if cache is None:
+            values = self._resolve_pieces(prompt_pieces, no_warning=no_warning)
+            return self._render_resolved(base, values, no_warning=no_warning)
+
+        # volatile macros are slots, so their current values are part of the input
+        slots = self._compile_template(base).slots
+        macros = self.prompt_predefine_value
+        volatile = {
+            key: str(macros[key])
+            for key in self.volatile_predefine_keys
+            if key in macros and key in slots
+        }
+        self.validate_pieces(prompt_pieces)
+        key = cache.make_key(
+            self.fingerprint, template, {"pieces": prompt_pieces or {}, "volatile": volatile}
+        )
+        rendered = cache.get(key)
+        if rendered is None:
+            values = self._resolve_pieces(prompt_pieces, no_warning=no_warning, validate=False)
+            rendered = self._render_resolved(base, values, no_warning=no_warning)
+            cache.set(key, rendered)
+        return rendered
 
     def get_prompt_chat(
         self, prompt_pieces: dict = None, no_warning: bool = False
@@ -346,9 +799,506 @@ class PromptBase:
         Get the filled prompt_system string with provided (or default) prompt_pieces and predef macros.
         """
         return self._get_prompt(
-            self.prompt_system, prompt_pieces, no_warning=no_warning
+            self.prompt_system, prompt_pieces, no_warning=no_warning, template="system"
         )
 
+    def render_many(
+        self,
+        prompt_pieces: Iterable[dict],
+        template: str = "chat",
+        no_warning: bool = False,
+    ) -> List[str]:
+        """
+        Render a template for a batch of piece sets. The whole batch is validated against the
+        piece schemas first, so an invalid item fails the batch before anything is rendered.
+
+        Args:
+            prompt_pieces: Iterable[dict]
+                One dict of piece values per render.
+            template: str
+                "chat" or "system".
+            no_warning: bool
+                If True, do not report unresolved macros.
+
+        Returns:
+            List[str]: The rendered prompts, in input order.
+
+        Raises:
+            ValueError: If an item violates a piece schema (the message names the item index),
+                or a required piece is missing.
+        """
+        batch = list(prompt_pieces)
+        if self._piece_validators:
+            for index, pieces in enumerate(batch):
+                try:
+                    self.validate_pieces(pieces)
+                except ValueError as e:
+                    raise ValueError(f"Item {index} of render_many batch: {e}") from e
+        base = self._get_template(template)
+        compiled = self._compile_template(base)
+        if not no_warning:
+            for macro in compiled.unresolved_macros:
+                self.warning_aggregator.record(self.name, UNRESOLVED_MACRO, macro)
+        render = compiled.render
+        resolve = self._resolve_pieces
+        return [render(resolve(pieces, no_warning=no_warning, validate=False)) for pieces in batch]
+
+    def bind(self, **prompt_pieces) -> "PromptBase":
+        """
+        Return a specialized copy of this prompt with some pieces fixed, e.g. per tenant or session.
+        The bound values (and static macros) are folded into the compiled templates once, so later
+        renders only resolve and fill the remaining pieces. The copy has its own pieces, defaults,
+        macros, repeat specs, validators and compiled templates, so changing either prompt does not
+        affect the other; it can be cached, and binding a bound prompt again is allowed.
+
+        Args:
+            **prompt_pieces: Values for the pieces to fix.
+
+        Returns:
+            PromptBase: The specialized prompt; its prompt_pieces_available no longer lists the bound pieces.
+
+        Raises:
+            ValueError: If a piece is not available or its value is None.
+        """
+        bound_values = {}
+        for key, value in prompt_pieces.items():
+            if key not in self.prompt_pieces_available:
+                raise ValueError(
+                    f"Cannot bind unknown piece '{key}' for {self.name}. Allowed: {self.prompt_pieces_available}"
+                )
+            if value is None:
+                raise ValueError(f"Cannot bind piece '{key}' to None for {self.name}.")
+            bound_values[key] = join_value(self._resolve_piece(key, value))
+
+        bound = copy.copy(self)
+        bound._bound_pieces = dict(self._bound_pieces)
+        bound._bound_pieces.update(bound_values)
+        bound.prompt_pieces_available = [
+            key for key in self.prompt_pieces_available if key not in bound_values
+        ]
+        bound.prompt_pieces_default_value = {
+            key: value
+            for key, value in self.prompt_pieces_default_value.items()
+            if key not in bound_values
+        }
+        bound.prompt_predefine_value = dict(self.prompt_predefine_value)
+        bound.prompt_pieces_repeat = {
+            key: dict(spec) for key, spec in self.prompt_pieces_repeat.items()
+        }
+        bound._compiled_repeats = dict(self._compiled_repeats)
+        bound._piece_validators = dict(self._piece_validators)
+        bound._fingerprint = None
+
+        # Derive the compiled templates from ours instead of compiling from scratch
+        bound._compiled_templates = {}
+        for base in (self.prompt_chat, self.prompt_system):
+            if base and base not in bound._compiled_templates:
+                compiled = self._compile_template(base).bind(bound_values)
+                bound._compiled_templates[base] = (
+                    bound._template_signature(),
+                    compiled,
+                )
+        return bound
+
+    def render_handle(
+        self,
+        prompt_pieces: dict = None,
+        template: str = "chat",
+        no_warning: bool = False,
+    ) -> RenderHandle:
+        """
+        Render a template into a stateful handle for multi-turn use. `handle.update(pieces)`
+        re-resolves only the given pieces and replaces only the slots whose value changed,
+        reusing every other rendered segment.
+
+        Args:
+            prompt_pieces: dict, optional
+                Initial values for the prompt pieces; defaults are used for missing ones.
+            template: str
+                "chat" or "system".
+            no_warning: bool
+                If True, do not report unresolved macros.
+
+        Returns:
+            RenderHandle: The handle; `handle.text` is the current rendered prompt.
+        """
+        base = self._get_template(template)
+        values = self._resolve_pieces(prompt_pieces, no_warning=no_warning)
+        compiled = self._compile_template(base)
+        if not no_warning:
+            for macro in compiled.unresolved_macros:
+                self.warning_aggregator.record(self.name, UNRESOLVED_MACRO, macro)
+        return RenderHandle(self, compiled, values, no_warning=no_warning)
+
+    async def render_stream(
+        self,
+        prompt_pieces: dict = None,
+        template: str = "chat",
+        no_warning: bool = False,
+    ):
+        """
+        Render a template asynchronously, yielding output chunks in template order.
+        Piece values may be awaitables or async iterables (their items are streamed as chunks;
+        items of a repeated piece are rendered with its item template). All asynchronous pieces are
+        resolved concurrently, and text is yielded as soon as everything before it is ready.
+        Macros are substituted per chunk, so a macro split across two chunks is not replaced.
+
+        Args:
+            prompt_pieces: dict, optional
+                Values for the prompt pieces; defaults are used for missing ones.
+            template: str
+                "chat" or "system".
+            no_warning: bool
+                If True, do not report unresolved macros.
+
+        Yields:
+            str: Consecutive chunks of the rendered prompt.
+
+        Raises:
+            ValueError: As get_prompt_chat; errors of an asynchronous piece are raised when its slot is reached.
+        """
+        import inspect
+
+        prompt_pieces = prompt_pieces or {}
+        asynchronous = {
+            key: value
+            for key, value in prompt_pieces.items()
+            if key in self.prompt_pieces_available
+            and (inspect.isawaitable(value) or hasattr(value, "__aiter__"))
+        }
+        compiled = self._compile_template(self._get_template(template))
+        streams = {}
+        try:
+            plain = dict(prompt_pieces)
+            for key in asynchronous:
+                del plain[key]
+            self.validate_pieces(plain)
+            # placeholders; asynchronous values are validated once they resolve
+            plain.update((key, "") for key in asynchronous)
+            values = self._resolve_pieces(plain, no_warning=no_warning, validate=False)
+            if not no_warning:
+                for macro in compiled.unresolved_macros:
+                    self.warning_aggregator.record(self.name, UNRESOLVED_MACRO, macro)
+            for key, value in asynchronous.items():
+                if key in compiled.slots:
+                    streams[key] = PieceStream(
+                        value, functools.partial(self._resolve_stream_chunk, key, no_warning)
+                    )
+
+            pending = [compiled.literals[0]]
+            for slot, literal in zip(compiled.slots, compiled.literals[1:]):
+                stream = streams.get(slot)
+                if stream is None:
+                    value = values[slot]
+                    if value.__class__ is list:
+                        pending.extend(value)
+                    else:
+                        pending.append(value)
+                else:
+                    position = 0
+                    while True:
+                        if position < len(stream.chunks):
+                            pending.extend(stream.chunks[position:])
+                            position = len(stream.chunks)
+                        elif stream.done:
+                            if stream.error is not None:
+                                raise stream.error
+                            break
+                        else:
+                            text = "".join(pending)
+                            if text:
+                                yield text
+                            pending = []
+                            await stream.wait(position)
+                pending.append(literal)
+            text = "".join(pending)
+            if text:
+                yield text
+        finally:
+            for stream in streams.values():
+                stream.task.cancel()
+            for key, value in asynchronous.items():
+                if key not in streams and inspect.iscoroutine(value):
+                    value.close()
+
+    def _resolve_stream_chunk(self, key: str, no_warning: bool, item, index) -> list:
+        """
+        Turn the awaited value (index None) or the index-th streamed item of a piece into output chunks.
+        """
+        if index is None:
+            value = self._resolve_piece(key, item, no_warning)
+            return value if value.__class__ is list else [value]
+        if key in self.prompt_pieces_repeat:
+            chunks = self._render_repeat(key, [item], no_warning)
+            separator = self.prompt_pieces_repeat[key].get("separator", "\n")
+            return [separator] + chunks if index and separator else chunks
+        return [self._resolve_text(str(item), no_warning)]
+
+    async def render_async(
+        self,
+        prompt_pieces: dict = None,
+        template: str = "chat",
+        no_warning: bool = False,
+    ) -> str:
+        """
+        Render a template whose pieces may be awaitables or async iterables; see render_stream.
+
+        Returns:
+            str: The rendered prompt.
+        """
+        return "".join(
+            [
+                chunk
+                async for chunk in self.render_stream(
+                    prompt_pieces, template=template, no_warning=no_warning
+                )
+            ]
+        )
+
+    def get_prompt_split(
+        self,
+        prompt_pieces: dict = None,
+        template: str = "chat",
+        no_warning: bool = False,
+    ) -> PrefixRender:
+        """
+        Render a template split into its longest static prefix (with a stable content hash)
+        and the dynamic tail, e.g. to mark the cacheable part for provider prompt caching.
+
+        Args:
+            prompt_pieces: dict, optional
+                Values for the prompt pieces; defaults are used for missing ones.
+            template: str
+                "chat" or "system".
+            no_warning: bool
+                If True, do not report unresolved macros.
+
+        Returns:
+            PrefixRender: prefix, prefix_hash and tail; `.text` is the full prompt.
+        """
+        base = self._get_template(template)
+        values = self._resolve_pieces(prompt_pieces, no_warning=no_warning)
+        compiled = self._compile_template(base)
+        if not no_warning:
+            for macro in compiled.unresolved_macros:
+                self.warning_aggregator.record(self.name, UNRESOLVED_MACRO, macro)
+        return PrefixRender(
+            compiled.prefix, compiled.prefix_hash, compiled.render_tail(values)
+        )
+
+    def lint_prefix_cache(self, min_static_chars: int = 200) -> list:
+        """
+        Find dynamic slots that needlessly shorten the cacheable prefix, i.e. slots followed by
+        at least `min_static_chars` of static text. The system template is followed by the chat
+        template, as in a chat request.
+
+        Args:
+            min_static_chars: int
+                Amount of static text after a slot that makes it worth reporting.
+
+        Returns:
+            List[dict]: One record per offending slot with "template", "slot",
+            "prefix_chars", "static_chars_after" and a human readable "message".
+        """
+        segments = []
+        for template in ("system", "chat"):
+            base = self._get_template(template)
+            if not base:
+                continue
+            compiled = self._compile_template(base)
+            segments.append((template, None, compiled.literals[0]))
+            for slot, literal in zip(compiled.slots, compiled.literals[1:]):
+                segments.append((template, slot, literal))
+
+        issues = []
+        static_after = 0
+        prefix_chars = 0
+        for template, slot, literal in segments:
+            if slot is not None:
+                break
+            prefix_chars += len(literal)
+        for template, slot, literal in reversed(segments):
+            static_after += len(literal)
+            if slot is not None and static_after >= min_static_chars:
+                issues.append(
+                    {
+                        "template": template,
+                        "slot": slot,
+                        "prefix_chars": prefix_chars,
+                        "static_chars_after": static_after,
+                        "message": (
+                            f"Dynamic slot '{slot}' in the {template} template of {self.name} is followed by "
+                            f"{static_after} characters of static text; moving it towards the end would "
+                            f"extend the cacheable prefix ({prefix_chars} characters now)."
+                        ),
+                    }
+                )
+        issues.reverse()
+        return issues
+
+    def select_examples(self, query, k: int = 3, piece: str = None):
+        """
+        Select the examples of example_bank most relevant to a query (lexical TF-IDF similarity).
+        A list of queries is scored in one batch.
+
+        Args:
+            query: str or List[str]
+                The query text, e.g. the user's question, or a list of them.
+            k: int
+                Number of examples to select per query.
+            piece: str, optional
+                If given, return prompt pieces {piece: examples} (or a list of them) instead,
+                ready to merge into the pieces of get_prompt_chat; usually a repeated piece.
+
+        Returns:
+            list or dict: The selected examples, best first.
+
+        Raises:
+            ValueError: If the prompt has no example bank or `piece` is not available.
+        """
+        if self.example_selector is None:
+            raise ValueError(f"Prompt '{self.name}' has no example_bank to select from.")
+        if piece is not None and piece not in self.prompt_pieces_available:
+            raise ValueError(
+                f"Piece '{piece}' is not in prompt_pieces_available for {self.name}. Allowed: {self.prompt_pieces_available}"
+            )
+        if isinstance(query, str):
+            selected = self.example_selector.select(query, k)
+            return {piece: selected} if piece is not None else selected
+        selected = self.example_selector.select_batch(list(query), k)
+        return [{piece: examples} for examples in selected] if piece is not None else selected
+
+    def _get_template(self, template: str) -> str:
+        """
+        Return the template string for "chat" or "system".
+        """
+        if template == "chat":
+            return self.prompt_chat
+        if template == "system":
+            return self.prompt_system
+        raise ValueError(f"template must be 'chat' or 'system', got '{template}'.")
+
+    def get_messages(
+        self,
+        prompt_pieces: dict = None,
+        no_warning: bool = False,
+        as_json: bool = False,
+    ):
+        """
+        Get a ready-to-send chat message list (system message first, then the user message),
+        resolving the prompt pieces and macros once for both templates.
+
+        Args:
+            prompt_pieces: dict, optional
+                Values for the prompt pieces; defaults are used for missing ones.
+            no_warning: bool
+                If True, do not report unresolved macros.
+            as_json: bool
+                If True, return a JSON-encoded request body {"messages": [...]} instead of a list.
+
+        Returns:
+            List[dict] or str: [{"role": ..., "content": ...}, ...], or its JSON encoding.
+        """
+        if as_json:
+            return self.get_request_body(
+                prompt_pieces, no_warning=no_warning, include_tools=False
+            ).decode("utf-8")
+        values = self._resolve_pieces(prompt_pieces, no_warning=no_warning)
+        messages = []
+        if self.prompt_system:
+            messages.append(
+                {
+                    "role": "system",
+                    "content": self._render_resolved(
+                        self.prompt_system, values, no_warning=no_warning
+                    ),
+                }
+            )
+        if self.prompt_chat:
+            messages.append(
+                {
+                    "role": "user",
+                    "content": self._render_resolved(
+                        self.prompt_chat, values, no_warning=no_warning
+                    ),
+                }
+            )
+        return messages
+
+    @property
+    def tool_set(self):
+        """
+        The resolved tools of this prompt (a ToolSet with .definitions and the encoded .json),
+        or None if the prompt was not loaded by a PromptManager with a tool registry.
+        """
+        return self._tool_set
+
+    def get_tools(self) -> list:
+        """
+        Return the resolved tool definitions of this prompt, see tool_set. Empty if the tools
+        were not resolved. The dicts are shared; do not modify them.
+        """
+        return self._tool_set.definitions if self._tool_set is not None else []
+
+    def get_request_body(
+        self,
+        prompt_pieces: dict = None,
+        no_warning: bool = False,
+        include_tools: bool = True,
+        **extra,
+    ) -> bytes:
+        """
+        Render the system and user messages straight into a UTF-8 encoded JSON chat request body
+        {"messages": [...], **extra}, equal to json.dumps(..., ensure_ascii=False).encode("utf-8").
+        The static template text is escaped and encoded once per compiled template;
+        each call only escapes the piece values, and the body is joined in a single copy.
+
+        Args:
+            prompt_pieces: dict, optional
+                Values for the prompt pieces; defaults are used for missing ones.
+            no_warning: bool
+                If True, do not report unresolved macros.
+            include_tools: bool
+                If True and the tools are resolved (see tool_set), add them as "tools" from
+                the pre-encoded bytes, unless `extra` has "tools".
+            **extra:
+                Further top-level fields of the body, e.g. model="...", temperature=0.
+
+        Returns:
+            bytes: The encoded request body.
+
+        Raises:
+            ValueError: If `extra` contains "messages".
+        """
+        if "messages" in extra:
+            raise ValueError("'messages' is set by get_request_body and cannot be passed as extra field.")
+        values = self._resolve_pieces(prompt_pieces, no_warning=no_warning)
+        parts = [b'{"messages": [']
+        append = parts.append
+        for role, base in (("system", self.prompt_system), ("user", self.prompt_chat)):
+            if not base:
+                continue
+            if len(parts) > 1:
+                append(b", ")
+            append(_MESSAGE_OPENERS[role])
+            compiled = self._compile_template(base)
+            if not no_warning:
+                for macro in compiled.unresolved_macros:
+                    self.warning_aggregator.record(self.name, UNRESOLVED_MACRO, macro)
+            compiled.render_json(values, parts)
+            append(b'"}')
+        append(b"]")
+        if include_tools and self._tool_set is not None and "tools" not in extra:
+            append(b', "tools": ')
+            append(self._tool_set.json)
+        for key, value in extra.items():
+            append(b", ")
+            append(json.dumps(key, ensure_ascii=False).encode("utf-8"))
+            append(b": ")
+            append(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+        append(b"}")
+        return b"".join(parts)
+
     def __str__(self) -> str:
         return self.get_prompt_chat() if self.prompt_chat else self.get_prompt_system()
 
@@ -358,8 +1308,8 @@ class PromptBase:
         Make unmatched { or } into double braces for safe formatting.
         """
         # Replace single {, unless already part of {{
-        escaped = regex.sub(r"(?<!{){(?!{)", "{{", line)
-        escaped = regex.sub(r"(?<!})}(?!})", "}}", escaped)
+        escaped = re.sub(r"(?<!{){(?!{)", "{{", line)
+        escaped = re.sub(r"(?<!})}(?!})", "}}", escaped)
         return escaped
 
     ###### Example MVP usage/test #######
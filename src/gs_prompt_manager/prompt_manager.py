@@ -1,14 +1,82 @@
 import os
+import sys
+import bisect
+import gc
+import functools
+import hashlib
+import importlib
 import importlib.util
-import inspect
-from typing import Dict, List, Type, Optional, Union
+import itertools
+import json
+import posixpath
+import threading
+import types
+from collections import deque
+from typing import (
+    IO, TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Tuple, Type, Optional, Union
+)
 from gs_prompt_manager.prompt_base import PromptBase
+from gs_prompt_manager.tool_registry import ToolRegistry
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Imported on use to keep `import gs_prompt_manager` cheap
+if TYPE_CHECKING:
+    import zipfile
+    from gs_prompt_manager.prompt_store import PromptStore
+
 logger = logging.getLogger(__name__)
 
+# (source, stamp, scan) triples yielded by the PromptManager._iter_*_sources methods
+_SourceIterator = Iterator[
+    Tuple[str, Optional[tuple], Callable[[], Optional[Dict[str, Type[PromptBase]]]]]
+]
+
+# Number of neighbours on each side of a missing name compared by suggest_names
+_SUGGESTION_WINDOW = 32
+
+# Process-wide cache of imported prompt modules shared by all PromptManager instances:
+# source identity (real path, or archive path + member) -> (stamp, prompt classes)
+_module_cache: Dict[str, Tuple[Optional[tuple], Dict[str, Type[PromptBase]]]] = {}
+_module_cache_lock = threading.RLock()
+# Real path of each archive whose package was prepared -> its stamp, see _prepare_archive
+_archive_stamps: Dict[str, Optional[tuple]] = {}
+
+
+def _qualified_module_name(identity: str) -> str:
+    """
+    Module name for a prompt source, unique per path so same-named files in different folders do not collide.
+    """
+    stem = os.path.splitext(os.path.basename(identity))[0]
+    digest = hashlib.sha1(identity.encode("utf-8")).hexdigest()[:12]
+    return f"_gs_prompt_{digest}_{stem}"
+
+
+def _is_zipfile(path: str) -> bool:
+    import zipfile
+
+    return zipfile.is_zipfile(path)
+
+
+# Registry of a render_parallel worker process, loaded once by the pool initializer
+_worker_manager: Optional["PromptManager"] = None
+
+
+def _init_render_worker(sources: dict) -> None:
+    """
+    Pool initializer: load the prompt registry once per worker process.
+    """
+    global _worker_manager
+    _worker_manager = PromptManager(**sources)
+
+
+def _render_chunk(name: str, template: str, chunk: List[dict]) -> List[str]:
+    """
+    Render a chunk of prompt pieces inside a worker process.
+    """
+    prompt = _worker_manager.get_prompt(name)
+    render = prompt.get_prompt_chat if template == "chat" else prompt.get_prompt_system
+    return [render(pieces) for pieces in chunk]
+
 
 class PromptManager:
     """
@@ -17,28 +85,76 @@ class PromptManager:
     """
 
     def __init__(
-        self, prompt_paths: Optional[Union[str, List[str]]] = None, verbose: bool = False
+        self,
+        prompt_paths: Optional[Union[str, List[str]]] = None,
+        verbose: bool = False,
+        prompt_packages: Optional[Union[str, List[str]]] = None,
+        entry_point_group: Optional[str] = None,
+        prompt_store: Optional[Union[str, "PromptStore"]] = None,
+        tool_registry: Optional[Union[ToolRegistry, Dict[str, dict]]] = None,
     ) -> None:
         """
         Initialize the PromptManager, searching for subclasses of PromptBase in the provided path(s).
 
         Args:
             prompt_path: str or List[str], optional
-                Path(s) to the directory/directories containing prompt implementations.
-                If None, uses the directory containing the instantiation file.
+                Path(s) to the directory/directories or zip/wheel archives containing prompt implementations.
+                If None, uses the directory containing the instantiation file, unless
+                prompt_packages or entry_point_group is given.
             verbose: bool
                 If True, prints summary information after initialization.
+            prompt_packages: str or List[str], optional
+                Importable (installed or zip-imported) packages or modules whose modules contain prompts.
+            entry_point_group: str, optional
+                Entry point group whose entry points name prompt modules or prompt classes.
+            prompt_store: str or PromptStore, optional
+                SQLite prompt store (or its path). Stored prompts are materialized on first
+                get_prompt; prompts loaded from files take precedence over stored ones.
+            tool_registry: ToolRegistry or Dict[str, dict], optional
+                Tool definitions by identifier. The tools of every prompt are resolved and encoded
+                at load and reload, see PromptBase.tool_set.
         """
         self.verbose = verbose
         self.prompt_paths: List[str] = []
+        if isinstance(prompt_packages, str):
+            prompt_packages = [prompt_packages]
+        self.prompt_packages: List[str] = list(prompt_packages or [])
+        self.entry_point_group = entry_point_group
+        if isinstance(prompt_store, str):
+            from gs_prompt_manager.prompt_store import PromptStore
+
+            prompt_store = PromptStore(prompt_store)
+        self.prompt_store: Optional["PromptStore"] = prompt_store
+        if isinstance(tool_registry, dict):
+            tool_registry = ToolRegistry(tool_registry)
+        self.tool_registry: Optional[ToolRegistry] = tool_registry
+        # Prompts materialized from the prompt store, by name
+        self._store_instances: Dict[str, PromptBase] = {}
+        # The stored definitions they were materialized from, compared on reload
+        self._store_definitions: Dict[str, dict] = {}
         self.prompt_objects: Dict[str, Type[PromptBase]] = {}
         self.prompt_instances: Dict[str, PromptBase] = {}
+        # Every loaded prompt by qualified name, e.g. "support.billing.refund.RefundPrompt";
+        # prompt_instances maps each bare class name to the first of them
+        self.qualified_instances: Dict[str, PromptBase] = {}
+        # Qualified names, each after the prompts it names in associated_prompt
+        self._dependency_order: List[str] = []
+        self._name_index: List[str] = []
+        self._suggestion_index: List[str] = []
+        self._reversed_index: List[str] = []
+        # Per source file: (mtime_ns, size) when it was imported, and the prompt classes found in it
+        self._file_stamps: Dict[str, tuple] = {}
+        self._file_prompts: Dict[str, Dict[str, Type[PromptBase]]] = {}
+        self.frozen = False
 
         try:
-            if prompt_paths is None:
-                # stack()[1] is the immediate caller
-                caller_frame = inspect.stack()[1]
-                caller_filename = caller_frame.filename
+            if prompt_paths is None and (
+                self.prompt_packages or entry_point_group or prompt_store is not None
+            ):
+                self.prompt_paths = []
+            elif prompt_paths is None:
+                # _getframe(1) is the immediate caller; inspect.stack() would read the source of every frame
+                caller_filename = sys._getframe(1).f_code.co_filename
                 self.prompt_paths = [os.path.dirname(os.path.abspath(caller_filename))]
             elif isinstance(prompt_paths, list):
                 self.prompt_paths = prompt_paths
@@ -47,24 +163,7 @@ class PromptManager:
             else:
                 raise ValueError("prompt_path must be a str, List[str], or None.")
 
-            for path in self.prompt_paths:
-                if not os.path.isdir(path):
-                    raise ValueError(f"Provided path is not a directory: {path}")
-                self.prompt_objects.update(
-                    self.search_available_prompts(path, black_list=[])
-                )
-
-            # Instantiate each prompt class
-            for prompt_name, prompt_class in self.prompt_objects.items():
-                if prompt_name in self.prompt_instances:
-                    raise ValueError(f"Duplicate prompt name found: {prompt_name}")
-                try:
-                    self.prompt_instances[prompt_name] = prompt_class()
-                except Exception as e:
-                    logger.error(
-                        f"Error instantiating prompt '{prompt_name}': {e}",
-                        exc_info=True,
-                    )
+            self._load()
 
             if self.verbose:
                 logger.info(
@@ -75,6 +174,727 @@ class PromptManager:
             logger.error("An error occurred during initialization", exc_info=True)
             raise e
 
+    def _load(self) -> Dict[str, List[str]]:
+        """
+        Discover and instantiate the prompts in self.prompt_paths. Files whose (mtime, size) did not
+        change since the previous load are not re-imported, and prompts whose fingerprint did not
+        change keep their existing instance.
+
+        Returns:
+            Dict[str, List[str]]: Prompt names that were "added", "updated", "removed" or "unchanged".
+        """
+        for path in self.prompt_paths:
+            if not os.path.isdir(path) and not _is_zipfile(path):
+                raise ValueError(
+                    f"Provided path is not a directory or zip archive: {path}"
+                )
+
+        # (root path or None, sources); the root namespaces the prompts of a path
+        source_groups: List[Tuple[Optional[str], _SourceIterator]] = [
+            (path, self._iter_path_sources(path)) for path in self.prompt_paths
+        ]
+        source_groups += [
+            (None, self._iter_package_sources(package)) for package in self.prompt_packages
+        ]
+        if self.entry_point_group:
+            source_groups.append(
+                (None, self._iter_entry_point_sources(self.entry_point_group))
+            )
+        # A qualified name already taken by an earlier source is prefixed with the root's label
+        root_labels = self._root_labels(self.prompt_paths)
+
+        file_stamps: Dict[str, tuple] = {}
+        file_prompts: Dict[str, Dict[str, Type[PromptBase]]] = {}
+        prompt_objects: Dict[str, Type[PromptBase]] = {}
+        qualified_objects: Dict[str, Type[PromptBase]] = {}
+        # bare name -> qualified name of the class it resolves to
+        bare_to_qualified: Dict[str, str] = {}
+        for root, sources in source_groups:
+            found: Dict[str, Type[PromptBase]] = {}
+            found_qualified: Dict[str, str] = {}
+            for source, stamp, scan in sources:
+                if stamp is not None and self._file_stamps.get(source) == stamp:
+                    classes = self._file_prompts[source]
+                else:
+                    classes = scan()
+                    if classes is None:
+                        continue
+                file_stamps[source] = stamp
+                file_prompts[source] = classes
+                namespace = self._source_namespace(source, root)
+                for name, candidate in classes.items():
+                    qualified = self._claim_qualified(
+                        qualified_objects, f"{namespace}.{name}", candidate, source,
+                        root_labels.get(root),
+                    )
+                    if qualified is None:
+                        continue
+                    if name in found:
+                        logger.warning(
+                            f"Prompt name '{name}' in {source} already refers to "
+                            f"'{found_qualified[name]}'; use '{qualified}' for this class."
+                        )
+                    else:
+                        found[name] = candidate
+                        found_qualified[name] = qualified
+            prompt_objects.update(found)
+            bare_to_qualified.update(found_qualified)
+
+        # Instantiate each prompt class, reusing the instances of classes that were not re-imported.
+        # A re-imported class always gets a new instance: its schema, metadata or methods may have
+        # changed even if the fingerprint did not.
+        qualified_instances: Dict[str, PromptBase] = {}
+        for qualified, prompt_class in qualified_objects.items():
+            previous = self.qualified_instances.get(qualified)
+            if previous is not None and type(previous) is prompt_class:
+                qualified_instances[qualified] = previous
+                continue
+            try:
+                instance = prompt_class()
+            except Exception as e:
+                logger.error(
+                    f"Error instantiating prompt '{qualified}': {e}",
+                    exc_info=True,
+                )
+                continue
+            qualified_instances[qualified] = instance
+
+        report: Dict[str, List[str]] = {
+            "added": [],
+            "updated": [],
+            "removed": [],
+            "unchanged": [],
+        }
+        prompt_instances: Dict[str, PromptBase] = {}
+        for prompt_name, qualified in bare_to_qualified.items():
+            instance = qualified_instances.get(qualified)
+            if instance is None:
+                continue
+            prompt_instances[prompt_name] = instance
+            previous = self.prompt_instances.get(prompt_name)
+            if previous is instance or (
+                previous is not None and previous.fingerprint == instance.fingerprint
+            ):
+                report["unchanged"].append(prompt_name)
+            else:
+                report["updated" if previous is not None else "added"].append(
+                    prompt_name
+                )
+        report["removed"] = [
+            name for name in self.prompt_instances if name not in prompt_instances
+        ]
+        dependency_order = self._order_by_associations(qualified_instances, bare_to_qualified)
+
+        self._file_stamps = file_stamps
+        self._file_prompts = file_prompts
+        self.prompt_objects = prompt_objects
+        self.prompt_instances = prompt_instances
+        self.qualified_instances = qualified_instances
+        self._dependency_order = dependency_order
+        resolver = self.get_prompt
+        for qualified, instance in qualified_instances.items():
+            instance._prompt_resolver = resolver
+            self._attach_tools(instance, qualified)
+        self._build_name_index()
+        return report
+
+    def _attach_tools(self, instance: PromptBase, name: str) -> None:
+        """
+        Resolve the tools of a prompt against the tool registry, if there is one.
+        """
+        if self.tool_registry is None:
+            return
+        instance._tool_set = None
+        if not instance.tools:
+            return
+        try:
+            instance._tool_set = self.tool_registry.resolve(instance.tools, name)
+        except ValueError as e:
+            logger.error(f"Error resolving tools of prompt '{name}': {e}")
+
+    def _order_by_associations(
+        self,
+        qualified_instances: Dict[str, PromptBase],
+        bare_to_qualified: Dict[str, str],
+    ) -> List[str]:
+        """
+        Order the qualified prompt names so that every prompt comes after the prompts its
+        associated_prompt names (depth-first, without recursion).
+
+        Raises:
+            ValueError: If associated prompts refer to each other in a cycle.
+        """
+        edges: Dict[str, List[str]] = {}
+        for qualified, instance in qualified_instances.items():
+            targets = []
+            for key, name in instance.get_associated_references().items():
+                target = name if name in qualified_instances else bare_to_qualified.get(name)
+                if target in qualified_instances:
+                    targets.append(target)
+                elif self.prompt_store is None or name not in self.prompt_store:
+                    logger.error(
+                        f"Associated prompt '{key}' of '{qualified}' names unknown prompt '{name}'."
+                    )
+            edges[qualified] = targets
+
+        order: List[str] = []
+        # 1: on the current path, 2: ordered
+        state: Dict[str, int] = {}
+        for root in edges:
+            if root in state:
+                continue
+            state[root] = 1
+            path = [root]
+            stack = [iter(edges[root])]
+            while stack:
+                for target in stack[-1]:
+                    if state.get(target) == 1:
+                        cycle = path[path.index(target):] + [target]
+                        raise ValueError(
+                            f"Associated prompts form a cycle: {' -> '.join(cycle)}"
+                        )
+                    if target not in state:
+                        state[target] = 1
+                        path.append(target)
+                        stack.append(iter(edges[target]))
+                        break
+                else:
+                    stack.pop()
+                    node = path.pop()
+                    state[node] = 2
+                    order.append(node)
+        return order
+
+    @staticmethod
+    def _claim_qualified(
+        qualified_objects: Dict[str, Type[PromptBase]],
+        qualified: str,
+        candidate: Type[PromptBase],
+        source: str,
+        label: Optional[str],
+    ) -> Optional[str]:
+        """
+        Register `candidate` under `qualified`. If an earlier source took that name, a class
+        from a prompt path is registered under "<root label>.<qualified>" instead.
+
+        Returns:
+            Optional[str]: The qualified name used, or None if the class was skipped.
+        """
+        if qualified_objects.setdefault(qualified, candidate) is candidate:
+            return qualified
+        if label is not None:
+            prefixed = f"{label}.{qualified}"
+            if qualified_objects.setdefault(prefixed, candidate) is candidate:
+                logger.warning(
+                    f"Qualified prompt name '{qualified}' in {source} is already taken; "
+                    f"registered as '{prefixed}'."
+                )
+                return prefixed
+            qualified = prefixed
+        logger.warning(
+            f"Qualified prompt name '{qualified}' in {source} is already taken. Skipping."
+        )
+        return None
+
+    @staticmethod
+    def _root_labels(paths: List[str]) -> Dict[str, str]:
+        """
+        Label of each prompt path, used to prefix qualified names that collide with an earlier
+        source: its base name without extension, with dots replaced, and an index appended
+        when two paths share a base name (e.g. "prompts", "prompts_2").
+        """
+        labels: Dict[str, str] = {}
+        used = set()
+        for path in paths:
+            base = os.path.splitext(os.path.basename(os.path.normpath(path)))[0]
+            base = base.replace(".", "_") or "root"
+            label, index = base, 1
+            while label in used:
+                index += 1
+                label = f"{base}_{index}"
+            used.add(label)
+            labels[path] = label
+        return labels
+
+    @staticmethod
+    def _source_namespace(source: str, root: Optional[str]) -> str:
+        """
+        Namespace of the prompts found in a source: the dotted module path relative to the
+        prompt path (e.g. "support.billing.refund"), the module name of a package source, or
+        the entry point name.
+        """
+        if source.startswith("package:"):
+            return source[len("package:"):]
+        if source.startswith("entry_point:"):
+            return source.split(":", 2)[2]
+        relative = os.path.splitext(os.path.relpath(source, root))[0]
+        return ".".join(part for part in relative.split(os.sep) if part)
+
+    def _build_name_index(self) -> None:
+        """
+        Rebuild the sorted name indexes used by iter_names, list_names and suggest_names.
+        """
+        self._name_index: List[str] = sorted(self.qualified_instances)
+        names = set(self.prompt_instances)
+        names.update(self._name_index)
+        self._suggestion_index: List[str] = sorted(names)
+        self._reversed_index: List[str] = sorted(name[::-1] for name in names)
+
+    def freeze(self) -> None:
+        """
+        Finalize the registry before forking worker processes (e.g. in a gunicorn master with
+        preload), so the loaded prompts stay in pages shared copy-on-write with the workers:
+
+        - every prompt is precompiled, so rendering in a worker does not write to shared objects,
+        - the registry dicts are replaced by read-only mappings and reload() is disabled,
+        - a full garbage collection is run and all objects alive in the process are moved to the
+          permanent generation (gc.freeze), so later collections never touch their headers.
+
+        gc.freeze() applies to the whole process; call freeze() once, right before forking.
+        Use memory_sharing_stats() in a worker to check how much memory stays shared.
+        """
+        for qualified in self._dependency_order:
+            self.qualified_instances[qualified].precompile()
+        for instance in self._store_instances.values():
+            instance.precompile()
+        self.prompt_instances = types.MappingProxyType(dict(self.prompt_instances))
+        self.qualified_instances = types.MappingProxyType(dict(self.qualified_instances))
+        self.prompt_objects = types.MappingProxyType(dict(self.prompt_objects))
+        self.prompt_paths = list(self.prompt_paths)
+        self.frozen = True
+        gc.collect()
+        gc.freeze()
+
+    @staticmethod
+    def memory_sharing_stats(pid: Optional[int] = None) -> Optional[Dict[str, float]]:
+        """
+        Report how much of a process's memory is shared with other processes (Linux only),
+        read from /proc/<pid>/smaps_rollup.
+
+        Args:
+            pid: int, optional
+                Process to inspect. Defaults to the current process.
+
+        Returns:
+            Dict[str, float]: rss_kb, pss_kb, shared_clean_kb, shared_dirty_kb, private_clean_kb,
+            private_dirty_kb and shared_fraction (shared / rss), or None if unavailable.
+        """
+        path = f"/proc/{pid or 'self'}/smaps_rollup"
+        fields = {
+            "Rss": "rss_kb",
+            "Pss": "pss_kb",
+            "Shared_Clean": "shared_clean_kb",
+            "Shared_Dirty": "shared_dirty_kb",
+            "Private_Clean": "private_clean_kb",
+            "Private_Dirty": "private_dirty_kb",
+        }
+        stats: Dict[str, float] = {}
+        try:
+            with open(path, "r") as f:
+                for line in f:
+                    key, _, rest = line.partition(":")
+                    if key in fields:
+                        stats[fields[key]] = float(rest.split()[0])
+        except (OSError, ValueError, IndexError):
+            return None
+        if "rss_kb" not in stats:
+            return None
+        shared = stats.get("shared_clean_kb", 0.0) + stats.get("shared_dirty_kb", 0.0)
+        stats["shared_fraction"] = shared / stats["rss_kb"] if stats["rss_kb"] else 0.0
+        return stats
+
+    def _source_arguments(self) -> dict:
+        """
+        Keyword arguments that make a new PromptManager load the same prompt sources.
+        """
+        return {
+            "prompt_paths": list(self.prompt_paths),
+            "prompt_packages": list(self.prompt_packages),
+            "entry_point_group": self.entry_point_group,
+            "prompt_store": self.prompt_store.path if self.prompt_store is not None else None,
+        }
+
+    def reload(self) -> Dict[str, List[str]]:
+        """
+        Re-scan the prompt paths. Only new or modified files are imported again; prompts from
+        unmodified files keep their existing instance (and its compiled templates). A prompt is
+        reported "updated" if its content fingerprint changed.
+
+        Returns:
+            Dict[str, List[str]]: Prompt names that were "added", "updated", "removed" or "unchanged".
+        """
+        if self.frozen:
+            raise ValueError("Cannot reload a frozen PromptManager.")
+        report = self._load()
+        # materialized store prompts are dropped if their stored definition changed
+        for name in list(self._store_instances):
+            definition = self.prompt_store.get_definition(name)
+            if definition == self._store_definitions[name] and name not in self.prompt_instances:
+                # kept, but its tools are resolved again like those of loaded prompts
+                self._attach_tools(self._store_instances[name], name)
+                report["unchanged"].append(name)
+                continue
+            del self._store_instances[name]
+            del self._store_definitions[name]
+            if definition is None:
+                report["removed"].append(name)
+            elif name not in self.prompt_instances:
+                report["updated"].append(name)
+        if self.verbose:
+            logger.info(
+                f"PromptManager: Reloaded; added {report['added']}, updated {report['updated']}, removed {report['removed']}"
+            )
+        return report
+
+    def fingerprints(self) -> Dict[str, str]:
+        """
+        Get the content fingerprint of every loaded prompt.
+
+        Returns:
+            Dict[str, str]: Mapping from prompt key (see _iter_loaded) to fingerprint.
+        """
+        return {name: instance.fingerprint for name, instance in self._iter_loaded()}
+
+    def _iter_loaded(self) -> Iterator[Tuple[str, PromptBase]]:
+        """
+        Yield (key, instance) for every loaded prompt. The key is the bare class name if it
+        resolves to that prompt, otherwise the qualified name, so same-named classes are
+        not left out.
+        """
+        for qualified, instance in list(self.qualified_instances.items()):
+            name = qualified.rsplit(".", 1)[-1]
+            yield (name if self.prompt_instances.get(name) is instance else qualified), instance
+
+    def _iter_path_sources(self, path: str) -> _SourceIterator:
+        """
+        Yield (source, stamp, scan) for every prompt module in a directory or zip/wheel archive.
+        `scan()` imports the module and returns its prompt classes; it is only called if the
+        stamp changed since the previous load.
+        """
+        if os.path.isdir(path):
+            for file_path in self._iter_prompt_files(path):
+                yield (
+                    file_path,
+                    self._file_stamp(file_path),
+                    functools.partial(self._scan_file, file_path),
+                )
+            return
+
+        import zipfile
+
+        # Members are imported again whenever the archive changes, since they may import siblings
+        archive_stamp = self._file_stamp(path)
+        # Read the module list straight from the archive index
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                member = info.filename
+                if (
+                    not member.endswith(".py")
+                    or posixpath.basename(member) == "__init__.py"
+                    or ".dist-info/" in member
+                    or ".egg-info/" in member
+                ):
+                    continue
+                source = os.path.join(path, *member.split("/"))
+                yield (
+                    source,
+                    (archive_stamp, info.CRC, info.file_size),
+                    functools.partial(
+                        self._scan_archive_member, archive, info, source
+                    ),
+                )
+
+    def _iter_package_sources(self, package: str) -> _SourceIterator:
+        """
+        Yield (source, stamp, scan) for an importable package and all of its submodules.
+        Imported modules are cached in sys.modules, so a reload does not re-execute them.
+        """
+        import pkgutil
+
+        try:
+            module = importlib.import_module(package)
+        except Exception as e:
+            logger.error(f"Error importing package '{package}': {e}", exc_info=True)
+            return
+        module_names = [module.__name__]
+        if hasattr(module, "__path__"):
+            module_names += [
+                info.name
+                for info in pkgutil.walk_packages(
+                    module.__path__,
+                    module.__name__ + ".",
+                    onerror=lambda name: logger.error(
+                        f"Error importing package '{name}'", exc_info=True
+                    ),
+                )
+            ]
+        for module_name in module_names:
+            yield (
+                f"package:{module_name}",
+                None,
+                functools.partial(self._scan_module_name, module_name),
+            )
+
+    def _iter_entry_point_sources(self, group: str) -> _SourceIterator:
+        """
+        Yield (source, stamp, scan) for the entry points of a group. An entry point may name a
+        module (scanned for prompt classes) or a single PromptBase subclass.
+        """
+        import importlib.metadata
+
+        entry_points = importlib.metadata.entry_points()
+        if hasattr(entry_points, "select"):
+            selected = entry_points.select(group=group)
+        else:
+            selected = entry_points.get(group, [])
+        for entry_point in selected:
+            yield (
+                f"entry_point:{group}:{entry_point.name}",
+                None,
+                functools.partial(self._scan_entry_point, entry_point),
+            )
+
+    @staticmethod
+    def _scan_archive_member(
+        archive: "zipfile.ZipFile", info: "zipfile.ZipInfo", source: str
+    ) -> Optional[Dict[str, Type[PromptBase]]]:
+        """
+        Import one module of an archive and return the prompt classes defined in it. The module
+        is imported by zipimport inside the archive's package (see _prepare_archive), so it can
+        import its siblings relatively or by their absolute package names.
+        """
+        archive_path = os.path.realpath(archive.filename or "")
+        identity = archive_path + "!" + info.filename
+        archive_stamp = PromptManager._file_stamp(archive_path)
+        stamp = (archive_stamp, info.CRC, info.file_size)
+
+        def load(module_name: str) -> types.ModuleType:
+            root = PromptManager._prepare_archive(archive_path, archive_stamp)
+            parts = info.filename[: -len(".py")].split("/")
+            package = root
+            for index, part in enumerate(parts[:-1]):
+                package = f"{package}.{part}"
+                if package in sys.modules:
+                    continue
+                try:
+                    importlib.import_module(package)
+                except ModuleNotFoundError as e:
+                    if e.name != package:
+                        raise
+                    # a folder without __init__.py and without a directory entry in the archive
+                    namespace = types.ModuleType(package)
+                    namespace.__path__ = [os.path.join(archive_path, *parts[: index + 1])]
+                    sys.modules[package] = namespace
+            name = f"{package}.{parts[-1]}"
+            # executed again if it was imported before, e.g. as a sibling of another member
+            sys.modules.pop(name, None)
+            try:
+                module = importlib.import_module(name)
+            except BaseException:
+                sys.modules.pop(name, None)
+                raise
+            sys.modules[module_name] = module
+            return module
+
+        return PromptManager._import_cached(identity, stamp, load, source)
+
+    @staticmethod
+    def _prepare_archive(archive_path: str, stamp: Optional[tuple]) -> str:
+        """
+        Register a package whose __path__ is the archive root (named after the archive, see
+        _qualified_module_name) and append the archive to sys.path, so archive modules import
+        their siblings relatively or by absolute name. If the archive changed, the modules
+        imported from it before are dropped. Call with _module_cache_lock held.
+
+        Returns:
+            str: Name of the archive's package.
+        """
+        root = _qualified_module_name(archive_path)
+        if _archive_stamps.get(archive_path) == stamp and root in sys.modules:
+            return root
+        inside = archive_path + os.sep
+        for name, module in list(sys.modules.items()):
+            module_file = getattr(module, "__file__", None) or ""
+            if name == root or name.startswith(root + ".") or module_file.startswith(inside):
+                del sys.modules[name]
+        # zipimport caches the archive index; re-read it
+        importlib.invalidate_caches()
+        package = types.ModuleType(root)
+        package.__path__ = [archive_path]
+        package.__package__ = root
+        sys.modules[root] = package
+        if archive_path not in sys.path:
+            sys.path.append(archive_path)
+        _archive_stamps[archive_path] = stamp
+        return root
+
+    @staticmethod
+    def _scan_module_name(module_name: str) -> Optional[Dict[str, Type[PromptBase]]]:
+        """
+        Import a module by name and return the prompt classes defined in it.
+        """
+        try:
+            module = importlib.import_module(module_name)
+        except Exception as e:
+            logger.error(f"Error importing '{module_name}': {e}", exc_info=True)
+            return None
+        return PromptManager._collect_prompt_classes(module)
+
+    @staticmethod
+    def _scan_entry_point(entry_point) -> Optional[Dict[str, Type[PromptBase]]]:
+        """
+        Load an entry point and return the prompt classes it names.
+        """
+        try:
+            loaded = entry_point.load()
+        except Exception as e:
+            logger.error(
+                f"Error loading entry point '{entry_point.name}': {e}", exc_info=True
+            )
+            return None
+        if isinstance(loaded, types.ModuleType):
+            return PromptManager._collect_prompt_classes(loaded)
+        if (
+            isinstance(loaded, type)
+            and issubclass(loaded, PromptBase)
+            and loaded is not PromptBase
+        ):
+            return {loaded.__name__: loaded}
+        logger.warning(
+            f"Entry point '{entry_point.name}' is neither a module nor a PromptBase subclass. Skipping."
+        )
+        return None
+
+    @staticmethod
+    def _iter_prompt_files(path: str) -> Iterator[str]:
+        """
+        Yield the Python files below `path` that may contain prompts.
+        """
+        for root, _, files in os.walk(path):
+            for filename in files:
+                if filename.endswith(".py") and filename != "__init__.py":
+                    yield os.path.join(root, filename)
+
+    @staticmethod
+    def _file_stamp(file_path: str) -> Optional[tuple]:
+        """
+        Return (mtime_ns, size) of a file, or None if it cannot be read.
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    def _scan_file(
+        file_path: str, black_list: Optional[List[Type[PromptBase]]] = None
+    ) -> Optional[Dict[str, Type[PromptBase]]]:
+        """
+        Import one Python file and return the PromptBase subclasses defined in it,
+        or None if it cannot be imported. Uses the process-wide module cache.
+        """
+        identity = os.path.realpath(file_path)
+
+        def load(module_name: str) -> Optional[types.ModuleType]:
+            spec = importlib.util.spec_from_file_location(module_name, identity)
+            if not spec or not spec.loader:
+                return None
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            spec.loader.exec_module(module)
+            return module
+
+        classes = PromptManager._import_cached(
+            identity, PromptManager._file_stamp(identity), load, file_path
+        )
+        if classes and black_list:
+            classes = {
+                name: candidate
+                for name, candidate in classes.items()
+                if candidate not in black_list
+            }
+        return classes
+
+    @staticmethod
+    def _import_cached(
+        identity: str,
+        stamp: Optional[tuple],
+        load: Callable[[str], Optional[types.ModuleType]],
+        source: str,
+    ) -> Optional[Dict[str, Type[PromptBase]]]:
+        """
+        Return the prompt classes of a source module from the process-wide cache, or import it
+        with `load(module_name)` if it is not cached or its stamp changed. The module is registered
+        in sys.modules under a name qualified by its identity (see _qualified_module_name).
+        """
+        with _module_cache_lock:
+            cached = _module_cache.get(identity)
+            if stamp is not None and cached is not None and cached[0] == stamp:
+                return cached[1]
+
+            module_name = _qualified_module_name(identity)
+            try:
+                module = load(module_name)
+            except Exception as e:
+                sys.modules.pop(module_name, None)
+                logger.error(f"Error importing '{source}': {e}", exc_info=True)
+                return None
+            if module is None:
+                return None
+            classes = PromptManager._collect_prompt_classes(module)
+            _module_cache[identity] = (stamp, classes)
+            return classes
+
+    @staticmethod
+    def clear_module_cache() -> None:
+        """
+        Forget all modules imported by any PromptManager, so the next load imports them again.
+        """
+        with _module_cache_lock:
+            for identity in _module_cache:
+                sys.modules.pop(_qualified_module_name(identity), None)
+            _module_cache.clear()
+            _archive_stamps.clear()
+
+    @staticmethod
+    def _collect_prompt_classes(
+        module: types.ModuleType, black_list: Optional[List[Type[PromptBase]]] = None
+    ) -> Dict[str, Type[PromptBase]]:
+        """
+        Return the PromptBase subclasses defined (not just imported) in a module.
+        """
+        # Inspect module members, filter classes
+        classes: Dict[str, Type[PromptBase]] = {}
+        for name, candidate in sorted(vars(module).items()):
+            if not isinstance(candidate, type):
+                continue
+            if candidate.__module__ != module.__name__:
+                continue
+            if issubclass(candidate, PromptBase) and candidate is not PromptBase:
+                if black_list and candidate in black_list:
+                    continue
+                classes[candidate.__name__] = candidate
+        return classes
+
+    @staticmethod
+    def _merge_found(
+        found: Dict[str, Type[PromptBase]],
+        classes: Dict[str, Type[PromptBase]],
+        file_path: str,
+    ) -> None:
+        """
+        Add the classes of one file to `found`, keeping the first class of each name.
+        """
+        for name, candidate in classes.items():
+            # if duplicate, throw a warning
+            if name in found:
+                logger.warning(
+                    f"Duplicate prompt class '{name}' found in {file_path}. Skipping."
+                )
+            else:
+                found[name] = candidate
+
     @staticmethod
     def search_available_prompts(
         path: str, black_list: Optional[List[Type[PromptBase]]] = None
@@ -91,51 +911,15 @@ class PromptManager:
         Returns:
             Dictionary mapping class name to class object (subclasses of PromptBase).
         """
-        if black_list is None:
-            black_list = []
-
         if not os.path.isdir(path):
             logger.error(f"Provided path is not a directory: {path}")
             raise ValueError(f"Provided path is not a directory: {path}")
 
         found: Dict[str, Type[PromptBase]] = {}
-
-        for root, _, files in os.walk(path):
-            for filename in files:
-                if filename.endswith(".py") and filename != "__init__.py":
-                    file_path = os.path.join(root, filename)
-                    try:
-                        module_name = os.path.splitext(os.path.basename(file_path))[0]
-                        spec = importlib.util.spec_from_file_location(
-                            module_name, file_path
-                        )
-                        if not spec or not spec.loader:
-                            continue
-                        module = importlib.util.module_from_spec(spec)
-                        spec.loader.exec_module(module)
-                    except Exception as e:
-                        logger.error(
-                            f"Error importing '{file_path}': {e}", exc_info=True
-                        )
-                        continue
-
-                    # Inspect module members, filter classes
-                    for name, candidate in inspect.getmembers(module, inspect.isclass):
-                        if candidate.__module__ != module.__name__:
-                            continue
-                        if (
-                            issubclass(candidate, PromptBase)
-                            and candidate is not PromptBase
-                        ):
-                            if candidate in black_list:
-                                continue
-                            # if duplicate, throw a warning
-                            if candidate.__name__ in found:
-                                logger.warning(
-                                    f"Duplicate prompt class '{candidate.__name__}' found in {file_path}. Skipping."
-                                )
-                            else:
-                                found[candidate.__name__] = candidate
+        for file_path in PromptManager._iter_prompt_files(path):
+            classes = PromptManager._scan_file(file_path, black_list)
+            if classes:
+                PromptManager._merge_found(found, classes, file_path)
         return found
 
     @staticmethod
@@ -176,6 +960,103 @@ class PromptManager:
 
         return metadata_dict
 
+    def iter_metadata(
+        self, fields: Optional[Iterable[str]] = None
+    ) -> Iterator[Tuple[str, dict]]:
+        """
+        Stream the metadata of the whole catalog, one prompt at a time: the loaded prompts (keyed
+        as in fingerprints), then the stored prompts not shadowed by them. Loaded instances are reused; stored prompts that
+        were not requested yet are materialized only for their record and not kept.
+
+        Args:
+            fields: Iterable[str], optional
+                Metadata keys to include (e.g. leave out "prompt_chat" / "prompt_system").
+                Defaults to all of them.
+
+        Returns:
+            Iterator[Tuple[str, dict]]: (prompt key, metadata) pairs.
+
+        Raises:
+            ValueError: If a field is not a metadata key.
+        """
+        selected = list(fields) if fields is not None else None
+        checked = False
+        for key, instance in self._iter_catalog():
+            metadata = instance.get_metadata()
+            if selected is not None:
+                if not checked:
+                    unknown = [field for field in selected if field not in metadata]
+                    if unknown:
+                        raise ValueError(
+                            f"Unknown metadata fields {unknown}. Available: {list(metadata)}"
+                        )
+                    checked = True
+                metadata = {field: metadata[field] for field in selected}
+            yield key, metadata
+
+    def _iter_catalog(self) -> Iterator[Tuple[str, PromptBase]]:
+        yield from self._iter_loaded()
+        if self.prompt_store is None:
+            return
+        for definition in self.prompt_store.iter_latest_definitions():
+            name = definition["name"]
+            if name in self.prompt_instances:
+                continue
+            instance = self._store_instances.get(name)
+            if instance is None:
+                try:
+                    instance = PromptBase.from_definition(definition)
+                except Exception as e:
+                    logger.error(f"Error materializing stored prompt '{name}': {e}", exc_info=True)
+                    continue
+            yield name, instance
+
+    def export_metadata(
+        self,
+        fp: IO[str],
+        format: str = "jsonl",
+        fields: Optional[Iterable[str]] = None,
+    ) -> int:
+        """
+        Write the catalog metadata to a text file while streaming it, so memory stays bounded
+        by the largest single prompt.
+
+        Args:
+            fp: IO[str]
+                Text file to write to.
+            format: str
+                "jsonl": one {"key": ..., **metadata} object per line;
+                "json": a single object mapping prompt keys to metadata, like get_all_prompt_metadata.
+            fields: Iterable[str], optional
+                Metadata keys to include, see iter_metadata.
+
+        Returns:
+            int: Number of exported prompts.
+
+        Raises:
+            ValueError: If the format or a field is unknown.
+        """
+        if format not in ("jsonl", "json"):
+            raise ValueError(f"format must be 'jsonl' or 'json', got '{format}'.")
+        count = 0
+        if format == "json":
+            fp.write("{")
+        for key, metadata in self.iter_metadata(fields):
+            if format == "jsonl":
+                record = {"key": key}
+                record.update(metadata)
+                fp.write(json.dumps(record, ensure_ascii=False, default=str))
+                fp.write("\n")
+            else:
+                fp.write(",\n" if count else "\n")
+                fp.write(json.dumps(key, ensure_ascii=False))
+                fp.write(": ")
+                fp.write(json.dumps(metadata, ensure_ascii=False, default=str))
+            count += 1
+        if format == "json":
+            fp.write("\n}\n" if count else "}\n")
+        return count
+
     def get_prompt_instances(self) -> Dict[str, PromptBase]:
         """
         Returns all instantiated prompt objects.
@@ -189,11 +1070,12 @@ class PromptManager:
         self, name: str, no_warning: bool = False
     ) -> PromptBase:
         """
-        Get an instantiated prompt by its class name.
+        Get an instantiated prompt by its class name or qualified name.
 
         Args:
             name: str
-                Name of the prompt class.
+                Name of the prompt class (the first one loaded with that name), or its
+                qualified name, e.g. "support.billing.refund.RefundPrompt".
 
         Returns:
             PromptBase: The instance of the specified prompt.
@@ -201,20 +1083,218 @@ class PromptManager:
         Raises:
             ValueError: If the prompt is not found.
         """
-        if name not in self.prompt_instances:
-            raise ValueError((
-                f"Prompt '{name}' not found.\n" 
-                f"  Available: {list(self.prompt_instances.keys())}\n"
-                f"  Loaded from paths: {self.prompt_paths}\n"
-                )
+        instance = self.prompt_instances.get(name)
+        if instance is None:
+            instance = self.qualified_instances.get(name)
+        if instance is not None:
+            return instance
+        if self.prompt_store is not None:
+            instance = self._get_stored_prompt(name)
+            if instance is not None:
+                return instance
+        raise ValueError((
+            f"Prompt '{name}' not found.\n"
+            f"  Did you mean: {self.suggest_names(name)}\n"
+            f"  Loaded from paths: {self.prompt_paths}\n"
             )
-        return self.prompt_instances[name]
+        )
+
+    def _get_stored_prompt(self, name: str) -> Optional[PromptBase]:
+        """
+        Materialize a prompt from the prompt store once, or return None if it is not stored.
+        """
+        instance = self._store_instances.get(name)
+        if instance is None:
+            definition = self.prompt_store.get_definition(name)
+            if definition is None:
+                return None
+            instance = PromptBase.from_definition(definition)
+            instance._prompt_resolver = self.get_prompt
+            self._attach_tools(instance, name)
+            if self._store_instances.setdefault(name, instance) is instance:
+                self._store_definitions[name] = definition
+            instance = self._store_instances[name]
+        return instance
 
     def get_prompt_names(self) -> List[str]:
         """
-        Get the names of all available prompt classes.
+        Get the names of all available prompt classes (and stored prompts).
+        Builds a new list on every call; use iter_names or list_names to query large registries.
 
         Returns:
             List[str]: List of prompt names.
         """
-        return list(self.prompt_instances.keys())
+        names = list(self.prompt_instances.keys())
+        if self.prompt_store is not None:
+            names.extend(
+                name for name in self.prompt_store.names() if name not in self.prompt_instances
+            )
+        return names
+
+    def iter_names(self, prefix: str = "") -> Iterator[str]:
+        """
+        Yield the qualified names of the loaded prompts that start with `prefix`, sorted.
+        The matches are found by bisecting the sorted name index, so the cost depends on the
+        number of matches, not on the size of the registry.
+
+        Args:
+            prefix: str
+                Namespace prefix, e.g. "support.billing.".
+
+        Returns:
+            Iterator[str]: Qualified prompt names.
+        """
+        index = self._name_index
+        for position in range(bisect.bisect_left(index, prefix), len(index)):
+            name = index[position]
+            if not name.startswith(prefix):
+                return
+            yield name
+
+    def list_names(
+        self, prefix: str = "", limit: int = 100, after: Optional[str] = None
+    ) -> List[str]:
+        """
+        One page of the qualified names starting with `prefix`. Pass the last name of a page
+        as `after` to get the next one.
+
+        Args:
+            prefix: str
+                Namespace prefix, e.g. "support.billing.".
+            limit: int
+                Maximum number of names on the page.
+            after: str, optional
+                Return only names sorted after this one.
+
+        Returns:
+            List[str]: Qualified prompt names, sorted; fewer than `limit` on the last page.
+
+        Raises:
+            ValueError: If limit is not positive.
+        """
+        if limit <= 0:
+            raise ValueError(f"limit must be positive, got {limit}.")
+        index = self._name_index
+        position = bisect.bisect_left(index, prefix)
+        if after is not None:
+            position = max(position, bisect.bisect_right(index, after))
+        page = []
+        for name in itertools.islice(index, position, position + limit):
+            if not name.startswith(prefix):
+                break
+            page.append(name)
+        return page
+
+    def suggest_names(self, name: str, n: int = 5) -> List[str]:
+        """
+        Names of loaded prompts (bare or qualified) close to `name`, best first. Only the
+        neighbours of `name` in the sorted index, and of its reversal in an index of reversed
+        names, are compared, so typos at either end are found without scanning the registry.
+
+        Args:
+            name: str
+                The name that was not found.
+            n: int
+                Maximum number of suggestions.
+
+        Returns:
+            List[str]: Suggested names.
+        """
+        candidates = set()
+        for index, key, restore in (
+            (self._suggestion_index, name, False),
+            (self._reversed_index, name[::-1], True),
+        ):
+            position = bisect.bisect_left(index, key)
+            for candidate in index[
+                max(0, position - _SUGGESTION_WINDOW):position + _SUGGESTION_WINDOW
+            ]:
+                candidates.add(candidate[::-1] if restore else candidate)
+        import difflib
+
+        return difflib.get_close_matches(name, sorted(candidates), n=n)
+
+    def render_parallel(
+        self,
+        name: str,
+        prompt_pieces: Iterable[dict],
+        workers: Optional[int] = None,
+        chunksize: int = 256,
+        template: str = "chat",
+    ) -> Iterator[str]:
+        """
+        Render a prompt for many sets of pieces across worker processes, yielding results in input order.
+
+        Each worker loads the registry once from this manager's prompt paths; only the pieces
+        and the rendered strings cross process boundaries. At most `2 * workers` chunks are in
+        flight, so memory stays bounded for arbitrarily long (lazy) inputs.
+
+        Args:
+            name: str
+                Name of the prompt class.
+            prompt_pieces: Iterable[dict]
+                Prompt pieces for each render; consumed lazily.
+            workers: int, optional
+                Number of worker processes. Defaults to the CPU count.
+            chunksize: int
+                Number of renders sent to a worker per task.
+            template: str
+                "chat" or "system".
+
+        Returns:
+            Iterator[str]: Rendered prompts in the order of `prompt_pieces`.
+
+        Raises:
+            ValueError: If the prompt is not found or the arguments are invalid.
+        """
+        self.get_prompt(name)
+        if template not in ("chat", "system"):
+            raise ValueError(f"template must be 'chat' or 'system', got '{template}'.")
+        if chunksize < 1:
+            raise ValueError("chunksize must be at least 1.")
+        from concurrent.futures import ProcessPoolExecutor
+
+        workers = workers or os.cpu_count() or 1
+        max_pending = 2 * workers
+
+        def chunks() -> Iterator[List[dict]]:
+            chunk = []
+            for pieces in prompt_pieces:
+                chunk.append(pieces)
+                if len(chunk) >= chunksize:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_render_worker,
+            initargs=(self._source_arguments(),),
+        ) as executor:
+            pending = deque()
+            for chunk in chunks():
+                pending.append(executor.submit(_render_chunk, name, template, chunk))
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    def lint_prefix_cache(self, min_static_chars: int = 200) -> Dict[str, List[dict]]:
+        """
+        Run PromptBase.lint_prefix_cache on every loaded prompt.
+
+        Args:
+            min_static_chars: int
+                Amount of static text after a slot that makes it worth reporting.
+
+        Returns:
+            Dict[str, List[dict]]: Issues per prompt key (see fingerprints), only for prompts
+                with issues.
+        """
+        report: Dict[str, List[dict]] = {}
+        for name, prompt in self._iter_loaded():
+            issues = prompt.lint_prefix_cache(min_static_chars=min_static_chars)
+            if issues:
+                report[name] = issues
+        return report
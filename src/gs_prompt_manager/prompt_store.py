@@ -0,0 +1,295 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import IO, Iterable, Iterator, List, Optional, Type, Union
+from gs_prompt_manager.prompt_base import PromptBase
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS prompts (
+    name TEXT NOT NULL,
+    version TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    definition TEXT NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (name, version)
+);
+CREATE INDEX IF NOT EXISTS prompts_latest ON prompts (name, updated);
+CREATE TABLE IF NOT EXISTS prompt_tags (
+    tag TEXT NOT NULL,
+    name TEXT NOT NULL,
+    version TEXT NOT NULL,
+    PRIMARY KEY (tag, name, version)
+);
+CREATE INDEX IF NOT EXISTS prompt_tags_prompt ON prompt_tags (name, version);
+"""
+
+_LATEST = (
+    "SELECT definition FROM prompts WHERE name = ? ORDER BY updated DESC, rowid DESC LIMIT 1"
+)
+
+
+class PromptStore:
+    """
+    Prompt definitions (see PromptBase.to_definition) stored in a SQLite database, with indexed
+    lookups by name, version and tag. Prompts are only materialized when asked for, so a store
+    can hold far more prompts than are worth importing as Python files.
+    Without an explicit version, the most recently stored version of a name is used.
+    """
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        """
+        Args:
+            path: str
+                Database file; created if missing.
+            timeout: float
+                Seconds to wait for a lock held by another process.
+        """
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connection()
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        The connection of the current thread, (re)opened after a fork.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is not None and self._local.pid == os.getpid():
+            return connection
+        connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(_SCHEMA)
+        self._local.connection = connection
+        self._local.pid = os.getpid()
+        return connection
+
+    @staticmethod
+    def _as_definition(prompt: Union[dict, PromptBase, Type[PromptBase]]) -> tuple:
+        """
+        Return (definition, fingerprint) of a prompt. The fingerprint is taken from the prompt
+        materialized from the definition, so it matches what get and PromptManager.reload see.
+        """
+        if isinstance(prompt, type):
+            prompt = prompt()
+        if isinstance(prompt, PromptBase):
+            definition = prompt.to_definition()
+        else:
+            definition = PromptBase.from_definition(prompt).to_definition()
+        return definition, PromptBase.from_definition(definition).fingerprint
+
+    def put_many(self, prompts: Iterable[Union[dict, PromptBase, Type[PromptBase]]]) -> int:
+        """
+        Store prompts in a single transaction, replacing stored (name, version) pairs.
+
+        Args:
+            prompts: Iterable of definitions, PromptBase instances or subclasses
+                Subclasses are instantiated to export them.
+
+        Returns:
+            int: Number of stored prompts.
+        """
+        rows = []
+        tag_rows = []
+        now = time.time()
+        for prompt in prompts:
+            definition, fingerprint = self._as_definition(prompt)
+            version = definition["version"]
+            rows.append(
+                (
+                    definition["name"],
+                    version,
+                    fingerprint,
+                    json.dumps(definition, ensure_ascii=False, default=str),
+                    now,
+                )
+            )
+            tag_rows.extend((tag, definition["name"], version) for tag in set(definition["tags"]))
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(
+                "DELETE FROM prompt_tags WHERE name = ? AND version = ?",
+                [(row[0], row[1]) for row in rows],
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO prompts (name, version, fingerprint, definition, updated) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            connection.executemany(
+                "INSERT OR IGNORE INTO prompt_tags (tag, name, version) VALUES (?, ?, ?)",
+                tag_rows,
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return len(rows)
+
+    def put(self, prompt: Union[dict, PromptBase, Type[PromptBase]]) -> None:
+        """
+        Store one prompt definition, PromptBase instance or subclass.
+        """
+        self.put_many([prompt])
+
+    def get_definition(self, name: str, version: Optional[str] = None) -> Optional[dict]:
+        """
+        Return a stored definition, or None if there is none.
+        """
+        connection = self._connection()
+        if version is None:
+            row = connection.execute(_LATEST, (name,)).fetchone()
+        else:
+            row = connection.execute(
+                "SELECT definition FROM prompts WHERE name = ? AND version = ?", (name, version)
+            ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def load(self, name: str, version: Optional[str] = None) -> PromptBase:
+        """
+        Materialize a stored prompt.
+
+        Raises:
+            ValueError: If the prompt (version) is not stored.
+        """
+        definition = self.get_definition(name, version)
+        if definition is None:
+            suffix = f" version '{version}'" if version is not None else ""
+            raise ValueError(f"Prompt '{name}'{suffix} not found in prompt store {self.path}.")
+        return PromptBase.from_definition(definition)
+
+    def fingerprint(self, name: str, version: Optional[str] = None) -> Optional[str]:
+        """
+        Return the fingerprint of a stored prompt without materializing it, or None.
+        """
+        connection = self._connection()
+        if version is None:
+            row = connection.execute(
+                "SELECT fingerprint FROM prompts WHERE name = ? "
+                "ORDER BY updated DESC, rowid DESC LIMIT 1",
+                (name,),
+            ).fetchone()
+        else:
+            row = connection.execute(
+                "SELECT fingerprint FROM prompts WHERE name = ? AND version = ?", (name, version)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def names(self, tag: Optional[str] = None) -> List[str]:
+        """
+        Return the stored prompt names (optionally only those with a tag), sorted.
+        """
+        if tag is None:
+            query, arguments = "SELECT DISTINCT name FROM prompts ORDER BY name", ()
+        else:
+            query = "SELECT DISTINCT name FROM prompt_tags WHERE tag = ? ORDER BY name"
+            arguments = (tag,)
+        return [row[0] for row in self._connection().execute(query, arguments)]
+
+    def versions(self, name: str) -> List[str]:
+        """
+        Return the stored versions of a prompt, oldest first.
+        """
+        return [
+            row[0]
+            for row in self._connection().execute(
+                "SELECT version FROM prompts WHERE name = ? ORDER BY updated, rowid", (name,)
+            )
+        ]
+
+    def delete(self, name: str, version: Optional[str] = None) -> int:
+        """
+        Delete a prompt version, or all versions of a prompt.
+
+        Returns:
+            int: Number of deleted versions.
+        """
+        connection = self._connection()
+        condition, arguments = "name = ?", (name,)
+        if version is not None:
+            condition, arguments = "name = ? AND version = ?", (name, version)
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(f"DELETE FROM prompt_tags WHERE {condition}", arguments)
+            deleted = connection.execute(
+                f"DELETE FROM prompts WHERE {condition}", arguments
+            ).rowcount
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return deleted
+
+    def iter_definitions(self, tag: Optional[str] = None) -> Iterator[dict]:
+        """
+        Stream the stored definitions (all versions), ordered by name and version age.
+        """
+        if tag is None:
+            query, arguments = "SELECT definition FROM prompts ORDER BY name, updated, rowid", ()
+        else:
+            query = (
+                "SELECT p.definition FROM prompt_tags t JOIN prompts p "
+                "ON p.name = t.name AND p.version = t.version WHERE t.tag = ? "
+                "ORDER BY p.name, p.updated, p.rowid"
+            )
+            arguments = (tag,)
+        for (definition,) in self._connection().execute(query, arguments):
+            yield json.loads(definition)
+
+    def iter_latest_definitions(self) -> Iterator[dict]:
+        """
+        Stream the latest stored definition of every prompt name, ordered by name.
+        """
+        query = (
+            "SELECT definition FROM prompts AS p WHERE rowid = ("
+            "SELECT rowid FROM prompts WHERE name = p.name "
+            "ORDER BY updated DESC, rowid DESC LIMIT 1) ORDER BY name"
+        )
+        for (definition,) in self._connection().execute(query):
+            yield json.loads(definition)
+
+    def export_jsonl(self, fp: IO[str], tag: Optional[str] = None) -> int:
+        """
+        Write the stored definitions as JSON lines.
+
+        Returns:
+            int: Number of written definitions.
+        """
+        count = 0
+        for definition in self.iter_definitions(tag):
+            fp.write(json.dumps(definition, ensure_ascii=False, default=str))
+            fp.write("\n")
+            count += 1
+        return count
+
+    def import_jsonl(self, fp: IO[str]) -> int:
+        """
+        Store the definitions of a JSON lines file written by export_jsonl.
+
+        Returns:
+            int: Number of stored definitions.
+        """
+        return self.put_many(json.loads(line) for line in fp if line.strip())
+
+    def __contains__(self, name: str) -> bool:
+        row = self._connection().execute(
+            "SELECT 1 FROM prompts WHERE name = ? LIMIT 1", (name,)
+        ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(DISTINCT name) FROM prompts").fetchone()[0]
+
+    def close(self) -> None:
+        """
+        Close the current thread's connection.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def __repr__(self) -> str:
+        return f"PromptStore(path='{self.path}')"
@@ -0,0 +1,388 @@
+import hashlib
+import re
+from json.encoder import encode_basestring
+from typing import Dict, List, Optional, Tuple, Union
+from gs_prompt_manager.warning_aggregator import UNKNOWN_PIECE
+
+_MACRO_PATTERN = re.compile(r"<<(.*?)>>")
+
+# A resolved slot value: a string, or the output segments of a repeated piece
+SlotValue = Union[str, List[str]]
+
+
+def join_value(value: SlotValue) -> str:
+    """
+    Return a resolved slot value as a single string.
+    """
+    return "".join(value) if value.__class__ is list else value
+
+
+def json_fragment(text: str) -> memoryview:
+    """
+    Return `text` JSON-escaped and UTF-8 encoded, without the surrounding quotes, as a view
+    (so the quotes are dropped without another copy). Escapes exactly like json.dumps(ensure_ascii=False).
+    """
+    return memoryview(encode_basestring(text).encode("utf-8"))[1:-1]
+
+
+def substitute_macros(text: str, macros: Dict[str, object]) -> str:
+    """
+    Replace every predefine macro key found in `text` with its value.
+    """
+    for key, value in macros.items():
+        if key in text:
+            text = text.replace(key, str(value))
+    return text
+
+
+def find_unresolved_macros(text: str, macros: Dict[str, object]) -> List[str]:
+    """
+    Return the <<MACRO>> occurrences in `text` that have no predefine value.
+    """
+    if "<<" not in text:
+        return []
+    found = []
+    for unmatched in _MACRO_PATTERN.findall(text):
+        macro = "<<" + unmatched + ">>"
+        if macro not in macros:
+            found.append(macro)
+    return found
+
+
+class CompiledTemplate:
+    """
+    A prompt template split once into static text and slots.
+    Slots are {piece} placeholders and volatile macros (whose value may differ between renders);
+    all other macros are substituted into the static text at compile time, so rendering is a single join.
+    `literals` always has one more element than `slots`: literal, slot, literal, ..., literal.
+    A piece slot is named by the piece, a volatile macro slot by the full macro key.
+    """
+
+    __slots__ = (
+        "source",
+        "literals",
+        "slots",
+        "unresolved_macros",
+        "_prefix_hash",
+        "_json_literals",
+    )
+
+    def __init__(
+        self,
+        source: str,
+        literals: Tuple[str, ...],
+        slots: Tuple[str, ...],
+        unresolved_macros: Tuple[str, ...] = (),
+    ):
+        self.source = source
+        self.literals = literals
+        self.slots = slots
+        self.unresolved_macros = unresolved_macros
+        self._prefix_hash: Optional[str] = None
+        self._json_literals: Optional[Tuple[bytes, ...]] = None
+
+    @classmethod
+    def compile(
+        cls,
+        source: str,
+        pieces: List[str],
+        macros: Dict[str, object],
+        volatile_macros: Tuple[str, ...] = (),
+    ) -> "CompiledTemplate":
+        """
+        Split `source` on the {piece} placeholders of `pieces` and the volatile macros,
+        and substitute the remaining `macros` in the static text.
+
+        Args:
+            source: str
+                The template string.
+            pieces: List[str]
+                Names of the available prompt pieces; other {...} text stays literal.
+            macros: Dict[str, object]
+                Predefine macro values.
+            volatile_macros: Tuple[str, ...]
+                Macro keys kept as slots instead of being folded into the static text.
+
+        Returns:
+            CompiledTemplate: The compiled template.
+        """
+        tokens = {"{" + name + "}": name for name in pieces}
+        for macro in volatile_macros:
+            if macro in macros:
+                tokens[macro] = macro
+        static_macros = {k: v for k, v in macros.items() if k not in tokens}
+
+        literals: List[str] = []
+        slots: List[str] = []
+        present = [token for token in tokens if token in source]
+        if present:
+            # longest tokens first, so that e.g. {ab} is never matched as {a}
+            present.sort(key=len, reverse=True)
+            pattern = re.compile("|".join(re.escape(token) for token in present))
+            position = 0
+            for match in pattern.finditer(source):
+                literals.append(source[position : match.start()])
+                slots.append(tokens[match.group()])
+                position = match.end()
+            literals.append(source[position:])
+        else:
+            literals.append(source)
+
+        if static_macros:
+            literals = [substitute_macros(literal, static_macros) for literal in literals]
+
+        unresolved: List[str] = []
+        for literal in literals:
+            unresolved.extend(find_unresolved_macros(literal, macros))
+        return cls(source, tuple(literals), tuple(slots), tuple(unresolved))
+
+    def bind(self, values: Dict[str, SlotValue]) -> "CompiledTemplate":
+        """
+        Return a new template with the slots named in `values` folded into the static text.
+        """
+        literals = [self.literals[0]]
+        slots: List[str] = []
+        for slot, literal in zip(self.slots, self.literals[1:]):
+            if slot in values:
+                literals[-1] = literals[-1] + join_value(values[slot]) + literal
+            else:
+                slots.append(slot)
+                literals.append(literal)
+        return CompiledTemplate(
+            self.source, tuple(literals), tuple(slots), self.unresolved_macros
+        )
+
+    @property
+    def prefix(self) -> str:
+        """
+        The longest static prefix: the text before the first slot.
+        """
+        return self.literals[0]
+
+    @property
+    def prefix_hash(self) -> str:
+        """
+        SHA-256 hex digest of the static prefix, computed once.
+        """
+        if self._prefix_hash is None:
+            self._prefix_hash = hashlib.sha256(self.literals[0].encode("utf-8")).hexdigest()
+        return self._prefix_hash
+
+    @property
+    def json_literals(self) -> Tuple[bytes, ...]:
+        """
+        The static text JSON-escaped and UTF-8 encoded, computed once.
+        """
+        if self._json_literals is None:
+            self._json_literals = tuple(bytes(json_fragment(literal)) for literal in self.literals)
+        return self._json_literals
+
+    def render_json(self, values: Dict[str, SlotValue], parts: list) -> None:
+        """
+        Append the rendering as JSON string content (escaped UTF-8, no quotes) to `parts`.
+        Only the slot values are escaped; the static text was escaped once.
+        """
+        literals = self.json_literals
+        append = parts.append
+        append(literals[0])
+        for slot, literal in zip(self.slots, literals[1:]):
+            value = values[slot]
+            if value.__class__ is list:
+                for segment in value:
+                    append(json_fragment(segment))
+            else:
+                append(json_fragment(value))
+            append(literal)
+
+    def render(self, values: Dict[str, SlotValue]) -> str:
+        """
+        Join the static text with the slot values. `values` must contain every slot name;
+        a value may be a string or a list of segments (a rendered repeated piece).
+        """
+        literals = self.literals
+        if not self.slots:
+            return literals[0]
+        parts = [literals[0]]
+        append = parts.append
+        extend = parts.extend
+        for slot, literal in zip(self.slots, literals[1:]):
+            value = values[slot]
+            if value.__class__ is list:
+                extend(value)
+            else:
+                append(value)
+            append(literal)
+        return "".join(parts)
+
+    def render_tail(self, values: Dict[str, SlotValue]) -> str:
+        """
+        Render everything after the static prefix.
+        """
+        parts = []
+        append = parts.append
+        extend = parts.extend
+        for slot, literal in zip(self.slots, self.literals[1:]):
+            value = values[slot]
+            if value.__class__ is list:
+                extend(value)
+            else:
+                append(value)
+            append(literal)
+        return "".join(parts)
+
+
+class RenderHandle:
+    """
+    Incrementally updatable rendering of one compiled template, created by PromptBase.render_handle.
+    Keeps the rendered segments; update() only re-resolves the given pieces and swaps the segments
+    of the slots whose value changed. The full text is joined lazily, once per change.
+    The handle renders against the prompt definition at the time it was created.
+    """
+
+    def __init__(
+        self,
+        prompt,
+        compiled: CompiledTemplate,
+        values: Dict[str, SlotValue],
+        no_warning: bool = False,
+    ):
+        self._prompt = prompt
+        self._no_warning = no_warning
+        self._values = {key: join_value(value) for key, value in values.items()}
+        parts = [compiled.literals[0]]
+        positions: Dict[str, List[int]] = {}
+        for slot, literal in zip(compiled.slots, compiled.literals[1:]):
+            positions.setdefault(slot, []).append(len(parts))
+            parts.append(self._values[slot])
+            parts.append(literal)
+        self._parts = parts
+        self._positions = positions
+        self._text: Optional[str] = None
+
+    @property
+    def parts(self) -> Tuple[str, ...]:
+        """
+        The rendered segments in order; joining them gives `text`.
+        """
+        return tuple(self._parts)
+
+    @property
+    def text(self) -> str:
+        """
+        The current rendered prompt.
+        """
+        if self._text is None:
+            self._text = "".join(self._parts)
+        return self._text
+
+    def update(self, prompt_pieces: Dict[str, object]) -> List[str]:
+        """
+        Change some pieces. A None value restores the piece's default.
+
+        Args:
+            prompt_pieces: Dict[str, object]
+                New values for a subset of the pieces.
+
+        Returns:
+            List[str]: The names of the pieces whose rendered value changed.
+        """
+        prompt = self._prompt
+        changed = []
+        for key, value in prompt_pieces.items():
+            if key not in self._values or key in prompt.volatile_predefine_keys:
+                prompt.warning_aggregator.record(
+                    prompt.name, UNKNOWN_PIECE, key, prompt.prompt_pieces_available
+                )
+                continue
+            resolved = join_value(prompt._resolve_piece(key, value, self._no_warning))
+            if resolved == self._values[key]:
+                continue
+            self._values[key] = resolved
+            for index in self._positions.get(key, ()):
+                self._parts[index] = resolved
+            changed.append(key)
+        if changed:
+            self._text = None
+        return changed
+
+    def __str__(self) -> str:
+        return self.text
+
+
+class PieceStream:
+    """
+    Collects the rendered chunks of one asynchronous piece value (an awaitable or an async
+    iterable) in a background task, created by PromptBase.render_stream. The chunks are kept,
+    so a piece used at several places in a template is replayed.
+    """
+
+    def __init__(self, source, resolve_chunk):
+        """
+        Args:
+            source: awaitable or async iterable
+                The piece value.
+            resolve_chunk: Callable[[object, Optional[int]], List[str]]
+                Turns the awaited value (index None) or the i-th iterated item into output chunks.
+        """
+        import asyncio
+
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self._changed = asyncio.Event()
+        self.task = asyncio.ensure_future(self._run(source, resolve_chunk))
+
+    async def _run(self, source, resolve_chunk) -> None:
+        try:
+            if hasattr(source, "__aiter__"):
+                index = 0
+                async for item in source:
+                    self.chunks.extend(resolve_chunk(item, index))
+                    index += 1
+                    self._changed.set()
+            else:
+                self.chunks.extend(resolve_chunk(await source, None))
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            self._changed.set()
+
+    async def wait(self, position: int) -> None:
+        """
+        Wait until there are more than `position` chunks or the source is exhausted.
+        """
+        while position >= len(self.chunks) and not self.done:
+            self._changed.clear()
+            await self._changed.wait()
+
+
+class PrefixRender:
+    """
+    A rendered prompt split into its longest static prefix and the dynamic tail.
+    The prefix (and its hash) is identical across renders of the same prompt definition,
+    which is what provider-side prompt caching keys on.
+    """
+
+    __slots__ = ("prefix", "prefix_hash", "tail")
+
+    def __init__(self, prefix: str, prefix_hash: str, tail: str):
+        self.prefix = prefix
+        self.prefix_hash = prefix_hash
+        self.tail = tail
+
+    @property
+    def text(self) -> str:
+        """
+        The full rendered prompt.
+        """
+        return self.prefix + self.tail
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        return (
+            f"PrefixRender(prefix_chars={len(self.prefix)}, "
+            f"prefix_hash='{self.prefix_hash[:12]}', tail_chars={len(self.tail)})"
+        )
@@ -0,0 +1,232 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS renders (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    expires REAL
+);
+CREATE INDEX IF NOT EXISTS renders_created ON renders (created);
+CREATE INDEX IF NOT EXISTS renders_expires ON renders (expires);
+CREATE TABLE IF NOT EXISTS totals (id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER NOT NULL);
+INSERT OR IGNORE INTO totals (id, bytes) VALUES (0, 0);
+CREATE TRIGGER IF NOT EXISTS renders_insert AFTER INSERT ON renders BEGIN
+    UPDATE totals SET bytes = bytes + new.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS renders_update AFTER UPDATE OF size ON renders BEGIN
+    UPDATE totals SET bytes = bytes + new.size - old.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS renders_delete AFTER DELETE ON renders BEGIN
+    UPDATE totals SET bytes = bytes - old.size WHERE id = 0;
+END;
+"""
+
+
+class RenderCache:
+    """
+    Render cache shared by all processes on a host, stored in one SQLite database in WAL mode
+    (concurrent readers, one writer at a time). Entries are keyed by prompt fingerprint, template
+    and a hash of the piece values; they expire after a TTL, and when the stored renders exceed
+    `max_bytes` the oldest are evicted. Hits, misses and lookup latency are counted per process.
+
+    Assign an instance to PromptBase.render_cache (for all prompts) or to a prompt's
+    render_cache attribute to cache its get_prompt_chat / get_prompt_system renders.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl: Optional[float] = None,
+        timeout: float = 5.0,
+    ):
+        """
+        Args:
+            path: str
+                Database file; created if missing. Every process opening the same file shares the cache.
+            max_bytes: int
+                Upper bound for the total size of the stored renders (UTF-8 bytes).
+            ttl: float, optional
+                Default lifetime of an entry in seconds. None keeps entries until evicted.
+            timeout: float
+                Seconds to wait for a lock held by another process.
+        """
+        if max_bytes <= 0:
+            raise ValueError(f"max_bytes must be positive, got {max_bytes}.")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.timeout = timeout
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._lookup_seconds = 0.0
+        self._evictions = 0
+        self._connection()
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        The connection of the current thread, (re)opened after a fork.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is not None and self._local.pid == os.getpid():
+            return connection
+        connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(_SCHEMA)
+        self._local.connection = connection
+        self._local.pid = os.getpid()
+        return connection
+
+    @staticmethod
+    def make_key(fingerprint: str, template: str, values: dict) -> str:
+        """
+        Cache key of a render: the prompt fingerprint, the template and a hash of the input values.
+        """
+        encoded = json.dumps(values, sort_keys=True, default=str, ensure_ascii=False)
+        digest = hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+        return f"{fingerprint}:{template}:{digest}"
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Return the cached render for `key`, or None if it is missing or expired.
+        """
+        start = time.perf_counter()
+        row = self._connection().execute(
+            "SELECT value FROM renders WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (key, time.time()),
+        ).fetchone()
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            self._lookup_seconds += elapsed
+            if row is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return row[0] if row is not None else None
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """
+        Store a render, then evict the oldest entries while the cache is over max_bytes.
+
+        Args:
+            key: str
+                Cache key, see make_key.
+            value: str
+                The rendered prompt.
+            ttl: float, optional
+                Lifetime in seconds; defaults to the cache's ttl.
+        """
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        expires = now + ttl if ttl is not None else None
+        connection = self._connection()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "INSERT INTO renders (key, value, size, created, expires) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, size = excluded.size, "
+                "created = excluded.created, expires = excluded.expires",
+                (key, value, size, now, expires),
+            )
+            self._evict(connection, now)
+            connection.execute("COMMIT")
+        except sqlite3.Error:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            logger.warning(f"RenderCache: could not store a render in {self.path}.", exc_info=True)
+
+    def _evict(self, connection: sqlite3.Connection, now: float) -> None:
+        (total,) = connection.execute("SELECT bytes FROM totals WHERE id = 0").fetchone()
+        if total <= self.max_bytes:
+            return
+        evicted = connection.execute(
+            "DELETE FROM renders WHERE expires IS NOT NULL AND expires <= ?", (now,)
+        ).rowcount
+        (total,) = connection.execute("SELECT bytes FROM totals WHERE id = 0").fetchone()
+        excess = total - self.max_bytes
+        if excess > 0:
+            victims = []
+            for key, size in connection.execute("SELECT key, size FROM renders ORDER BY created"):
+                victims.append((key,))
+                excess -= size
+                if excess <= 0:
+                    break
+            connection.executemany("DELETE FROM renders WHERE key = ?", victims)
+            evicted += len(victims)
+        with self._stats_lock:
+            self._evictions += evicted
+
+    def purge_expired(self) -> int:
+        """
+        Delete expired entries now (they are otherwise removed when space is needed).
+
+        Returns:
+            int: Number of deleted entries.
+        """
+        return self._connection().execute(
+            "DELETE FROM renders WHERE expires IS NOT NULL AND expires <= ?", (time.time(),)
+        ).rowcount
+
+    def clear(self) -> None:
+        """
+        Delete all entries, for every process sharing the file.
+        """
+        self._connection().execute("DELETE FROM renders")
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Hit/miss counters and mean lookup latency of this process, plus the size of the shared store.
+
+        Returns:
+            Dict[str, float]: hits, misses, hit_rate, mean_lookup_us, evictions, entries, bytes.
+        """
+        (entries,) = self._connection().execute("SELECT COUNT(*) FROM renders").fetchone()
+        (total,) = self._connection().execute("SELECT bytes FROM totals WHERE id = 0").fetchone()
+        with self._stats_lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "mean_lookup_us": self._lookup_seconds / lookups * 1e6 if lookups else 0.0,
+                "evictions": self._evictions,
+                "entries": entries,
+                "bytes": total,
+            }
+
+    def reset_stats(self) -> None:
+        """
+        Reset the per-process counters.
+        """
+        with self._stats_lock:
+            self._hits = self._misses = self._evictions = 0
+            self._lookup_seconds = 0.0
+
+    def close(self) -> None:
+        """
+        Close the current thread's connection.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def __repr__(self) -> str:
+        return f"RenderCache(path='{self.path}', max_bytes={self.max_bytes}, ttl={self.ttl})"
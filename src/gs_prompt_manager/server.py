@@ -0,0 +1,450 @@
+"""
+Local render server: one process hosts a PromptManager and serves render and metadata calls
+to other processes on the same host over a Unix domain socket.
+
+Protocol: every message is a frame of a 4-byte big-endian length followed by that many bytes
+of UTF-8 JSON. A request is {"id", "op", ...}; the response to it is {"id", "ok": true, "result"}
+or {"id", "ok": false, "error", "type"}. Responses on a connection come in request order,
+so a client may send many requests before reading (pipelining).
+
+Usage:
+    python -m gs_prompt_manager.server --socket /tmp/prompts.sock --prompt-path ./prompts
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import queue
+import socket
+import stat
+import struct
+import threading
+from typing import Iterable, List, Optional
+from gs_prompt_manager.prompt_manager import PromptManager
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">I")
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+
+def encode_frame(message: dict) -> bytes:
+    """
+    Encode a message as a length-prefixed JSON frame.
+    """
+    payload = json.dumps(message, ensure_ascii=False).encode("utf-8")
+    return _HEADER.pack(len(payload)) + payload
+
+
+def _remove_stale_socket(path: str) -> None:
+    """
+    Remove a socket file left behind by a server that is no longer running.
+
+    Raises:
+        ValueError: If `path` exists and is not a socket, or a server is listening on it.
+    """
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise ValueError(f"{path} exists and is not a socket; not replacing it.")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        pass
+    else:
+        raise ValueError(f"A server is already listening on {path}.")
+    finally:
+        probe.close()
+    os.unlink(path)
+
+
+class PromptServer:
+    """
+    Serves one PromptManager over a Unix domain socket with asyncio.
+    Renders run on the event loop: they are short and CPU bound, and the manager's
+    compiled templates and caches are shared by all clients.
+    """
+
+    def __init__(self, manager: PromptManager, path: str):
+        """
+        Args:
+            manager: PromptManager
+                The registry to serve.
+            path: str
+                Filesystem path of the Unix socket; a stale socket file is replaced.
+        """
+        self.manager = manager
+        self.path = path
+        self._server: Optional[asyncio.AbstractServer] = None
+        # (st_dev, st_ino) of the socket file this server created, see close
+        self._socket_id: Optional[tuple] = None
+        self._operations = {
+            "render": self._op_render,
+            "messages": self._op_messages,
+            "metadata": self._op_metadata,
+            "fingerprint": self._op_fingerprint,
+            "names": self._op_names,
+        }
+
+    async def start(self) -> None:
+        """
+        Start listening on the socket.
+
+        Raises:
+            ValueError: If the path exists and is not a socket, or another server is listening on it.
+        """
+        _remove_stale_socket(self.path)
+        self._server = await asyncio.start_unix_server(self._handle, path=self.path)
+        info = os.stat(self.path)
+        self._socket_id = (info.st_dev, info.st_ino)
+        logger.info(
+            f"PromptServer: serving {len(self.manager.prompt_instances)} prompts on {self.path}"
+        )
+
+    async def serve_forever(self) -> None:
+        """
+        Start (if needed) and serve until cancelled, then close.
+        """
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """
+        Stop listening and remove the socket file, if it is still the one this server created.
+        """
+        if self._server is None:
+            return
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+        try:
+            info = os.lstat(self.path)
+        except FileNotFoundError:
+            return
+        if (info.st_dev, info.st_ino) == self._socket_id:
+            os.unlink(self.path)
+        self._socket_id = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(_HEADER.size)
+                except asyncio.IncompleteReadError:
+                    break
+                (length,) = _HEADER.unpack(header)
+                if length > MAX_FRAME_BYTES:
+                    logger.error(
+                        f"PromptServer: frame of {length} bytes exceeds the limit, closing connection."
+                    )
+                    break
+                writer.write(self._dispatch(await reader.readexactly(length)))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _dispatch(self, payload: bytes) -> bytes:
+        """
+        Decode one request frame payload, run it and return the encoded response frame.
+        Malformed requests and unencodable results are answered with an error response.
+        """
+        request_id = None
+        try:
+            request = json.loads(payload)
+            if not isinstance(request, dict):
+                raise ValueError("A request must be a JSON object.")
+            request_id = request.get("id")
+            operation = self._operations.get(request.get("op"))
+            if operation is None:
+                raise ValueError(f"Unknown operation '{request.get('op')}'.")
+            return encode_frame({"id": request_id, "ok": True, "result": operation(request)})
+        except Exception as e:
+            return encode_frame(
+                {"id": request_id, "ok": False, "error": str(e), "type": type(e).__name__}
+            )
+
+    def _op_render(self, request: dict) -> str:
+        prompt = self.manager.get_prompt(request["name"])
+        template = request.get("template", "chat")
+        if template not in ("chat", "system"):
+            raise ValueError(f"template must be 'chat' or 'system', got '{template}'.")
+        render = prompt.get_prompt_chat if template == "chat" else prompt.get_prompt_system
+        return render(request.get("pieces"), no_warning=request.get("no_warning", False))
+
+    def _op_messages(self, request: dict) -> List[dict]:
+        prompt = self.manager.get_prompt(request["name"])
+        return prompt.get_messages(request.get("pieces"), no_warning=request.get("no_warning", False))
+
+    def _op_metadata(self, request: dict) -> dict:
+        return self.manager.get_prompt(request["name"]).get_metadata()
+
+    def _op_fingerprint(self, request: dict) -> str:
+        return self.manager.get_prompt(request["name"]).fingerprint
+
+    def _op_names(self, request: dict) -> List[str]:
+        return self.manager.get_prompt_names()
+
+
+class RemotePrompt:
+    """
+    Client-side stand-in for a prompt hosted by a PromptServer, returned by PromptClient.get_prompt.
+    """
+
+    def __init__(self, client: "PromptClient", name: str, fingerprint: str):
+        self.client = client
+        self.name = name
+        self.fingerprint = fingerprint
+
+    def get_prompt_chat(self, prompt_pieces: dict = None, no_warning: bool = False) -> str:
+        return self.client._call(
+            "render", name=self.name, template="chat", pieces=prompt_pieces, no_warning=no_warning
+        )
+
+    def get_prompt_system(self, prompt_pieces: dict = None, no_warning: bool = False) -> str:
+        return self.client._call(
+            "render", name=self.name, template="system", pieces=prompt_pieces, no_warning=no_warning
+        )
+
+    def get_messages(self, prompt_pieces: dict = None, no_warning: bool = False) -> List[dict]:
+        return self.client._call(
+            "messages", name=self.name, pieces=prompt_pieces, no_warning=no_warning
+        )
+
+    def get_metadata(self) -> dict:
+        return self.client._call("metadata", name=self.name)
+
+    def __repr__(self) -> str:
+        return f"RemotePrompt(name='{self.name}')"
+
+
+class PromptClient:
+    """
+    Synchronous client of a PromptServer. Mirrors PromptManager:
+    client.get_prompt(name).get_prompt_chat(pieces). Safe to share between threads.
+    After an I/O or protocol error (timeout, closed connection, undecodable or out-of-order
+    response) the connection is closed and every later call raises ConnectionError.
+    """
+
+    def __init__(self, path: str, timeout: Optional[float] = None, window: int = 64):
+        """
+        Args:
+            path: str
+                Filesystem path of the server's Unix socket.
+            timeout: float, optional
+                Socket timeout in seconds.
+            window: int
+                Maximum number of requests in flight during render_batch.
+        """
+        self.path = path
+        self.window = max(1, window)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(path)
+        self._file = self._socket.makefile("rb")
+        self._lock = threading.Lock()
+        self._next_id = 0
+        # The error that broke the connection, see _fail
+        self._failure: Optional[ConnectionError] = None
+
+    def close(self) -> None:
+        self._file.close()
+        self._socket.close()
+
+    def _fail(self, error: Exception) -> ConnectionError:
+        """
+        Close the connection after an I/O or protocol error, so no later call reads a stale
+        or partial response. Returns the ConnectionError to raise.
+        """
+        if self._failure is None:
+            if isinstance(error, ConnectionError):
+                self._failure = error
+            else:
+                self._failure = ConnectionError(
+                    f"Connection to PromptServer at {self.path} failed: {error!r}"
+                )
+            try:
+                # also interrupts a sendall blocked in another thread
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.close()
+        return self._failure
+
+    def __enter__(self) -> "PromptClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _send(self, op: str, **arguments) -> int:
+        if self._failure is not None:
+            raise self._failure
+        self._next_id += 1
+        arguments["id"] = self._next_id
+        arguments["op"] = op
+        frame = encode_frame(arguments)
+        try:
+            self._socket.sendall(frame)
+        except OSError as e:
+            raise self._fail(e) from e
+        return self._next_id
+
+    def _receive(self, request_id: int) -> dict:
+        """
+        Read the response to `request_id`.
+
+        Raises:
+            ConnectionError: On any I/O or decode error, or a response to another request;
+                the connection is closed.
+        """
+        if self._failure is not None:
+            raise self._failure
+        try:
+            header = self._file.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                raise ConnectionError(f"PromptServer at {self.path} closed the connection.")
+            (length,) = _HEADER.unpack(header)
+            payload = self._file.read(length)
+            if len(payload) < length:
+                raise ConnectionError(f"PromptServer at {self.path} closed the connection.")
+            response = json.loads(payload)
+            if not isinstance(response, dict) or response.get("id") != request_id:
+                raise ConnectionError(
+                    f"PromptServer at {self.path} sent a response to another request "
+                    f"(expected id {request_id})."
+                )
+        except (OSError, ValueError) as e:
+            raise self._fail(e) from e
+        return response
+
+    @staticmethod
+    def _result(response: dict):
+        """
+        Return the result of a response, or raise the error it reports.
+        """
+        if not response["ok"]:
+            if response.get("type") == "ValueError":
+                raise ValueError(response["error"])
+            raise RuntimeError(f"{response.get('type')}: {response['error']}")
+        return response["result"]
+
+    def _call(self, op: str, **arguments):
+        with self._lock:
+            return self._result(self._receive(self._send(op, **arguments)))
+
+    def get_prompt(self, name: str) -> RemotePrompt:
+        """
+        Get a handle of a served prompt.
+
+        Raises:
+            ValueError: If the prompt is not found.
+        """
+        return RemotePrompt(self, name, self._call("fingerprint", name=name))
+
+    def get_prompt_names(self) -> List[str]:
+        return self._call("names")
+
+    def render_batch(
+        self,
+        name: str,
+        prompt_pieces: Iterable[dict],
+        template: str = "chat",
+        no_warning: bool = False,
+    ) -> List[str]:
+        """
+        Render many sets of pieces, pipelining up to `window` requests on the connection.
+        Responses are read on a separate thread while requests are sent, so large requests
+        and responses cannot fill both socket buffers and block client and server.
+
+        Returns:
+            List[str]: Rendered prompts in input order.
+
+        Raises:
+            ValueError: If a render fails; the remaining responses are still read.
+            ConnectionError: If the connection fails.
+        """
+        results: List[Optional[str]] = []
+        errors: List[Exception] = []
+        # ids of sent requests, in order; None once everything was sent
+        pending: "queue.Queue[Optional[int]]" = queue.Queue()
+        slots = threading.Semaphore(self.window)
+
+        def read_responses() -> None:
+            while True:
+                request_id = pending.get()
+                if request_id is None:
+                    return
+                try:
+                    results.append(self._result(self._receive(request_id)))
+                except ConnectionError as e:
+                    errors.insert(0, e)
+                    return
+                except (ValueError, RuntimeError) as e:
+                    results.append(None)
+                    errors.append(e)
+                finally:
+                    slots.release()
+
+        with self._lock:
+            reader = threading.Thread(target=read_responses, daemon=True)
+            reader.start()
+            try:
+                for pieces in prompt_pieces:
+                    slots.acquire()
+                    pending.put(
+                        self._send(
+                            "render", name=name, template=template, pieces=pieces,
+                            no_warning=no_warning,
+                        )
+                    )
+            finally:
+                pending.put(None)
+                reader.join()
+        if errors:
+            raise errors[0]
+        return results
+
+
+def serve(manager: PromptManager, path: str) -> None:
+    """
+    Serve `manager` on the Unix socket `path` until interrupted.
+    """
+    server = PromptServer(manager, path)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Serve prompts over a Unix domain socket.")
+    parser.add_argument("--socket", required=True, help="Path of the Unix socket.")
+    parser.add_argument("--prompt-path", action="append", default=[], help="Prompt directory or archive.")
+    parser.add_argument("--prompt-package", action="append", default=[], help="Importable prompt package.")
+    parser.add_argument("--entry-point-group", help="Entry point group of prompt modules.")
+    args = parser.parse_args(argv)
+    if not (args.prompt_path or args.prompt_package or args.entry_point_group):
+        parser.error("give at least one of --prompt-path, --prompt-package or --entry-point-group")
+    logging.basicConfig(level=logging.INFO)
+    manager = PromptManager(
+        prompt_paths=args.prompt_path or None,
+        prompt_packages=args.prompt_package,
+        entry_point_group=args.entry_point_group,
+    )
+    manager.freeze()
+    serve(manager, args.socket)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
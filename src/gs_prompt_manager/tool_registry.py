@@ -0,0 +1,121 @@
+import copy
+import json
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class ToolSet:
+    """
+    The resolved tools of a prompt: definitions in PromptBase.tools order, as dicts and as the
+    encoded JSON array sent to the provider. Shared by all prompts with the same tool list;
+    treat it as read-only.
+    """
+
+    __slots__ = ("names", "definitions", "json")
+
+    def __init__(self, names: Tuple[str, ...], definitions: List[dict]):
+        self.names = names
+        self.definitions = definitions
+        self.json = json.dumps(definitions, ensure_ascii=False).encode("utf-8")
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __repr__(self) -> str:
+        return f"ToolSet(names={list(self.names)})"
+
+
+class ToolRegistry:
+    """
+    Tool definitions (the provider's tool JSON, e.g. {"type": "function", "function": {...}}) by
+    the identifiers used in PromptBase.tools. A PromptManager created with a registry resolves
+    every prompt's tools once at load and reload, so a request only appends pre-encoded bytes.
+    """
+
+    def __init__(self, tools: Optional[Dict[str, dict]] = None):
+        """
+        Args:
+            tools: Dict[str, dict], optional
+                Tool definitions by identifier.
+        """
+        self._tools: Dict[str, dict] = {}
+        # Resolved tool lists, shared by prompts with the same tools; cleared on register
+        self._tool_sets: Dict[Tuple[str, ...], ToolSet] = {}
+        self._lock = threading.Lock()
+        if tools:
+            self.register_many(tools)
+
+    def register(self, name: str, definition: dict) -> None:
+        """
+        Add or replace a tool definition. Prompts already loaded by a PromptManager keep the
+        previous definition until the manager is reloaded.
+
+        Raises:
+            ValueError: If the definition is not a JSON serializable dict.
+        """
+        self.register_many({name: definition})
+
+    def register_many(self, tools: Dict[str, dict]) -> None:
+        """
+        Add or replace several tool definitions, see register.
+        """
+        checked = {}
+        for name, definition in tools.items():
+            if not isinstance(definition, dict):
+                raise ValueError(f"Definition of tool '{name}' must be a dict.")
+            try:
+                json.dumps(definition, ensure_ascii=False)
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Definition of tool '{name}' is not JSON serializable: {e}") from e
+            # copied, so later changes by the caller do not leak into encoded tool sets
+            checked[name] = copy.deepcopy(definition)
+        with self._lock:
+            self._tools.update(checked)
+            self._tool_sets.clear()
+
+    def get(self, name: str) -> Optional[dict]:
+        """
+        Return the definition of a tool, or None if it is not registered.
+        """
+        return self._tools.get(name)
+
+    def names(self) -> List[str]:
+        return list(self._tools)
+
+    def resolve(self, names: Iterable[str], prompt_name: str = "") -> ToolSet:
+        """
+        Resolve tool identifiers to a ToolSet, encoded once per distinct list of identifiers.
+
+        Args:
+            names: Iterable[str]
+                Tool identifiers, e.g. PromptBase.tools.
+            prompt_name: str
+                Name of the prompt, used in error messages.
+
+        Returns:
+            ToolSet: The resolved tools.
+
+        Raises:
+            ValueError: If a tool is not registered.
+        """
+        key = tuple(names)
+        tool_set = self._tool_sets.get(key)
+        if tool_set is not None:
+            return tool_set
+        with self._lock:
+            missing = [name for name in key if name not in self._tools]
+            if missing:
+                raise ValueError(
+                    f"Unknown tools {missing} for {prompt_name or 'prompt'}. Registered: {list(self._tools)}"
+                )
+            tool_set = ToolSet(key, [self._tools[name] for name in key])
+            return self._tool_sets.setdefault(key, tool_set)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    def __len__(self) -> int:
+        return len(self._tools)
+
+    def __repr__(self) -> str:
+        return f"ToolRegistry(tools={len(self._tools)})"
@@ -0,0 +1,175 @@
+import atexit
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN_PIECE = "unknown_piece"
+UNRESOLVED_MACRO = "unresolved_macro"
+# Key under which warnings are counted once max_keys distinct keys are tracked
+OVERFLOW_KEY = "<other>"
+# Maximum number of entries listed in one summary record
+_SUMMARY_ENTRIES = 20
+
+_FIRST_MESSAGES = {
+    UNKNOWN_PIECE: "Unknown piece '%s' in prompt input for %s. \nAllowed: %s",
+    UNRESOLVED_MACRO: "Unresolved macro '%s' in rendered prompt for %s.",
+}
+
+
+class WarningAggregator:
+    """
+    Deduplicating, rate-limited sink for warnings raised while rendering prompts.
+    The first occurrence of every (prompt, kind, key) is logged in full, up to `max_first_logs`
+    per (prompt, kind) and summary interval; repeats and further new keys are only counted and
+    reported in a summary at most once per `interval` seconds. At most `max_keys` keys are
+    tracked; warnings for further keys are counted under OVERFLOW_KEY.
+    """
+
+    def __init__(
+        self,
+        interval: float = 60.0,
+        log: Optional[logging.Logger] = None,
+        max_keys: int = 10000,
+        max_first_logs: int = 10,
+    ):
+        """
+        Args:
+            interval: float
+                Minimum number of seconds between two summary log records.
+            log: logging.Logger, optional
+                Logger to write to. Defaults to this module's logger.
+            max_keys: int
+                Maximum number of distinct (prompt, kind, key) entries tracked.
+            max_first_logs: int
+                Maximum number of first occurrences logged in full per (prompt, kind)
+                between two summaries.
+        """
+        self.interval = interval
+        self.log = log if log is not None else logger
+        self.max_keys = max_keys
+        self.max_first_logs = max_first_logs
+        self._counts: Dict[Tuple[str, str, str], int] = {}
+        self._summarized: Dict[Tuple[str, str, str], int] = {}
+        # Full first-occurrence records logged per (prompt, kind) since the last summary
+        self._first_logs: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        self._next_summary = time.monotonic() + interval
+
+    def record(self, prompt: str, kind: str, key: str, detail=None) -> None:
+        """
+        Count one occurrence of a warning. Only the first occurrence is formatted and logged,
+        and a summary is logged if the interval has elapsed.
+
+        Args:
+            prompt: str
+                Name of the prompt the warning belongs to.
+            kind: str
+                Warning kind, e.g. UNKNOWN_PIECE or UNRESOLVED_MACRO.
+            key: str
+                The offending piece or macro.
+            detail: optional
+                Extra context for the first log record (e.g. allowed pieces). Not copied.
+        """
+        entry = (prompt, kind, key)
+        log_first = False
+        with self._lock:
+            count = self._counts.get(entry)
+            if count is None and len(self._counts) >= self.max_keys:
+                entry = (prompt, kind, OVERFLOW_KEY)
+                count = self._counts.get(entry)
+            if count is None:
+                logged = self._first_logs.get((prompt, kind), 0)
+                if logged < self.max_first_logs and entry[2] != OVERFLOW_KEY:
+                    self._first_logs[(prompt, kind)] = logged + 1
+                    log_first = True
+                else:
+                    # not logged in full, so the summary reports the first occurrence too
+                    self._summarized[entry] = 0
+                count = 0
+            self._counts[entry] = count + 1
+            due = time.monotonic() >= self._next_summary
+        if log_first:
+            self._log_first(entry, detail)
+        if due:
+            self.flush()
+
+    def _log_first(self, entry: Tuple[str, str, str], detail) -> None:
+        prompt, kind, key = entry
+        message = _FIRST_MESSAGES.get(kind, "Prompt warning '%s' for %s (%s).")
+        if kind == UNKNOWN_PIECE:
+            self.log.warning(message, key, prompt, list(detail or []))
+        elif kind == UNRESOLVED_MACRO:
+            self.log.warning(message, key, prompt)
+        else:
+            self.log.warning(message, key, prompt, kind)
+
+    def flush(self) -> None:
+        """
+        Log a summary of the warnings counted, but not logged, since the previous summary.
+        Called at exit for the process-wide aggregator, so the last burst is reported too.
+        """
+        with self._lock:
+            self._next_summary = time.monotonic() + self.interval
+            self._first_logs.clear()
+            repeated = []
+            for entry, count in self._counts.items():
+                new = count - self._summarized.get(entry, 1)
+                if new > 0:
+                    repeated.append((entry, new))
+                    self._summarized[entry] = count
+        if repeated:
+            repeated.sort(key=lambda item: item[1], reverse=True)
+            listed = "; ".join(
+                f"{kind} '{key}' in {prompt} x{n}"
+                for (prompt, kind, key), n in repeated[:_SUMMARY_ENTRIES]
+            )
+            if len(repeated) > _SUMMARY_ENTRIES:
+                listed += f"; and {len(repeated) - _SUMMARY_ENTRIES} more"
+            self.log.warning(
+                "Suppressed %d repeated prompt warning(s): %s",
+                sum(n for _, n in repeated),
+                listed,
+            )
+
+    def get_counts(self) -> Dict[Tuple[str, str, str], int]:
+        """
+        Return a copy of the occurrence counts keyed by (prompt, kind, key).
+        """
+        with self._lock:
+            return dict(self._counts)
+
+    def get_summary(self) -> List[dict]:
+        """
+        Return the occurrence counts as a (JSON serializable) list of records, most frequent first.
+        """
+        counts = self.get_counts()
+        return [
+            {"prompt": prompt, "kind": kind, "key": key, "count": count}
+            for (prompt, kind, key), count in sorted(
+                counts.items(), key=lambda item: item[1], reverse=True
+            )
+        ]
+
+    def reset(self) -> None:
+        """
+        Forget all counts, so the next occurrence of every warning is logged in full again.
+        """
+        with self._lock:
+            self._counts.clear()
+            self._summarized.clear()
+            self._first_logs.clear()
+            self._next_summary = time.monotonic() + self.interval
+
+
+_default_aggregator = WarningAggregator()
+atexit.register(_default_aggregator.flush)
+
+
+def get_warning_aggregator() -> WarningAggregator:
+    """
+    Return the process-wide aggregator used by PromptBase unless a prompt sets its own.
+    """
+    return _default_aggregator
@@ -3,6 +3,7 @@ Pytest configuration and shared fixtures for gs_prompt_manager tests.
 """
 import pytest
 import logging
+from gs_prompt_manager import get_warning_aggregator
 
 
 @pytest.fixture(autouse=True)
@@ -14,6 +15,14 @@ def setup_logging():
     )
 
 
+@pytest.fixture(autouse=True)
+def reset_warning_aggregator():
+    """Start every test with no deduplicated render warnings."""
+    get_warning_aggregator().reset()
+    yield
+    get_warning_aggregator().reset()
+
+
 @pytest.fixture
 def sample_prompt_pieces():
     """Provide sample prompt pieces for testing."""
@@ -0,0 +1,107 @@
+"""
+Tests for ExampleSelector and PromptBase example selection.
+"""
+import pytest
+
+pytest.importorskip("numpy")
+
+from gs_prompt_manager import ExampleSelector, PromptBase
+
+BANK = [
+    {"question": "How do I reverse a list in Python?", "answer": "Use list.reverse()."},
+    {"question": "What is the capital of France?", "answer": "Paris."},
+    {"question": "How do I sort a list in Python?", "answer": "Use sorted(list)."},
+    {"question": "Who wrote Hamlet?", "answer": "Shakespeare."},
+]
+
+
+class SelectingPrompt(PromptBase):
+    """Prompt with an example bank rendered through a repeated piece."""
+
+    example_fields = ("question",)
+
+    def set_prompt_chat(self):
+        return "{examples}\n\nQ: {question}\nA:"
+
+    def set_prompt_pieces_available(self):
+        self.prompt_pieces_available = ["examples", "question"]
+
+    def set_prompt_pieces_repeat(self):
+        return {"examples": {"item": "Q: {question}\nA: {answer}", "separator": "\n\n"}}
+
+    def set_example_bank(self):
+        return list(BANK)
+
+    def set_name(self):
+        self.name = "SelectingPrompt"
+
+
+class TestExampleSelector:
+    """Test suite for ExampleSelector."""
+
+    def test_select_most_similar_first(self):
+        """Test that the best lexical match comes first."""
+        selector = ExampleSelector(BANK)
+        assert selector.select("capital city of France", k=1) == [BANK[1]]
+
+    def test_select_batch_matches_single(self):
+        """Test that batched selection equals per-query selection."""
+        selector = ExampleSelector(BANK)
+        queries = ["sort a Python list", "Hamlet author", "unrelated words"]
+        assert selector.select_batch(queries, k=2) == [
+            selector.select(query, k=2) for query in queries
+        ]
+
+    def test_ties_keep_bank_order(self):
+        """Test that a query without known terms returns the bank in order."""
+        selector = ExampleSelector(BANK)
+        assert selector.select("zzz", k=3) == BANK[:3]
+
+    def test_k_larger_than_bank_and_fields(self):
+        """Test k capping and restricting the indexed fields."""
+        selector = ExampleSelector(BANK, fields=["answer"])
+        assert len(selector.select("Paris", k=10)) == len(BANK)
+        assert selector.select("Paris", k=1) == [BANK[1]]
+        assert selector.select("France", k=1) == [BANK[0]]
+
+    def test_non_dict_examples_and_empty_bank(self):
+        """Test plain string examples and an empty bank."""
+        assert ExampleSelector(["red apple", "blue sky"]).select("sky", k=1) == ["blue sky"]
+        assert ExampleSelector([]).select("anything") == []
+
+    def test_negative_k_raises(self):
+        """Test that a negative k raises."""
+        with pytest.raises(ValueError, match="k must be non-negative"):
+            ExampleSelector(BANK).select("x", k=-1)
+
+
+class TestPromptBaseSelectExamples:
+    """Test suite for PromptBase.select_examples."""
+
+    def test_selector_built_at_load(self):
+        """Test that the index is built when the prompt is instantiated."""
+        prompt = SelectingPrompt()
+        assert len(prompt.example_selector) == len(BANK)
+        assert prompt.get_metadata()["example_bank_size"] == len(BANK)
+
+    def test_select_examples_as_pieces(self):
+        """Test that selected examples plug into a repeated piece."""
+        prompt = SelectingPrompt()
+        pieces = prompt.select_examples("sort a list", k=2, piece="examples")
+        pieces["question"] = "How do I sort a dict?"
+        result = prompt.get_prompt_chat(pieces)
+        assert result.startswith("Q: How do I sort a list in Python?\nA: Use sorted(list).")
+
+    def test_select_examples_batch(self):
+        """Test that a list of queries returns one selection per query."""
+        prompt = SelectingPrompt()
+        selected = prompt.select_examples(["France", "Hamlet"], k=1, piece="examples")
+        assert selected == [{"examples": [BANK[1]]}, {"examples": [BANK[3]]}]
+
+    def test_errors(self):
+        """Test selecting without a bank and for an unknown piece."""
+        prompt = PromptBase(prompt_chat="{a}", prompt_pieces_available=["a"], name="NoBank")
+        with pytest.raises(ValueError, match="has no example_bank"):
+            prompt.select_examples("x")
+        with pytest.raises(ValueError, match="not in prompt_pieces_available"):
+            SelectingPrompt().select_examples("x", piece="other")
@@ -0,0 +1,95 @@
+"""
+Tests for the import-time cost and side effects of the package.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import gs_prompt_manager
+
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(gs_prompt_manager.__file__)))
+
+# Generous enough for a cold interpreter on a slow CI machine
+IMPORT_SECONDS_BUDGET = 0.5
+PACKAGE_MODULES_BUDGET = 10
+MANAGER_MODULES_BUDGET = 60
+# Only imported when the feature that needs them is used
+LAZY_MODULES = [
+    "regex",
+    "asyncio",
+    "inspect",
+    "importlib.metadata",
+    "zipfile",
+    "pkgutil",
+    "sqlite3",
+    "difflib",
+    "concurrent.futures",
+    "gs_prompt_manager.prompt_store",
+    "gs_prompt_manager.render_cache",
+]
+
+PROBE = """
+import json, logging, sys, time
+before = set(sys.modules)
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "modules": sorted(set(sys.modules) - before),
+    "root_handlers": len(logging.getLogger().handlers),
+    "root_level": logging.getLogger().level,
+}}))
+"""
+
+
+def probe(statement):
+    """Run an import statement in a fresh interpreter and report what it cost."""
+    env = {
+        key: value for key, value in os.environ.items() if not key.startswith("COV_CORE")
+    }
+    env["PYTHONPATH"] = SRC + os.pathsep + env.get("PYTHONPATH", "")
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(statement=statement)],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+class TestImportBudget:
+    """Test suite for the import-time budget."""
+
+    def test_package_import_is_lazy(self):
+        """Test that importing the package alone imports almost nothing."""
+        result = probe("import gs_prompt_manager")
+        assert len(result["modules"]) <= PACKAGE_MODULES_BUDGET, result["modules"]
+        assert "gs_prompt_manager.prompt_manager" not in result["modules"]
+
+    def test_manager_import_budget(self):
+        """Test the module count and time of importing PromptManager."""
+        result = probe("from gs_prompt_manager import PromptManager")
+        assert len(result["modules"]) <= MANAGER_MODULES_BUDGET, result["modules"]
+        assert result["seconds"] < IMPORT_SECONDS_BUDGET
+        for module in LAZY_MODULES:
+            assert module not in result["modules"]
+
+    def test_import_does_not_configure_logging(self):
+        """Test that importing leaves the root logger alone."""
+        result = probe("import gs_prompt_manager.prompt_manager")
+        assert result["root_handlers"] == 0
+        assert result["root_level"] == 30
+
+    def test_lazy_exports(self):
+        """Test that the exported names resolve and are listed."""
+        from gs_prompt_manager.prompt_store import PromptStore
+
+        assert gs_prompt_manager.PromptStore is PromptStore
+        assert set(gs_prompt_manager.__all__) <= set(dir(gs_prompt_manager))
+        with pytest.raises(AttributeError, match="Missing"):
+            gs_prompt_manager.Missing
@@ -0,0 +1,116 @@
+"""
+Tests for piece schemas from expected_config and PromptBase.render_many.
+"""
+import pytest
+
+from gs_prompt_manager import PromptBase
+from gs_prompt_manager.piece_schema import compile_piece_validator
+
+
+class ValidatedPrompt(PromptBase):
+    """Prompt with piece schemas."""
+
+    def set_prompt_chat(self):
+        return "Answer in {language} within {limit} words: {question}"
+
+    def set_prompt_pieces_available(self):
+        self.prompt_pieces_available = ["language", "limit", "question"]
+
+    def set_prompt_pieces_default_value(self):
+        self.prompt_pieces_default_value = {"language": "en", "limit": 100}
+
+    def set_expected_config(self):
+        return {
+            "pieces": {
+                "language": {"allowed": ["en", "fr"]},
+                "limit": {"type": "int"},
+                "question": {"type": "str", "max_length": 20, "regex": r"[^<>]*"},
+            }
+        }
+
+    def set_name(self):
+        self.name = "ValidatedPrompt"
+
+
+class TestCompilePieceValidator:
+    """Test suite for compile_piece_validator."""
+
+    def test_type_checks(self):
+        """Test type checks, including that bool is not an int."""
+        validate = compile_piece_validator("n", {"type": "int"}, "P")
+        validate(3)
+        with pytest.raises(ValueError, match="must be of type int, got str"):
+            validate("3")
+        with pytest.raises(ValueError, match="got bool"):
+            validate(True)
+        compile_piece_validator("x", {"type": "number"}, "P")(1.5)
+
+    def test_length_allowed_and_regex(self):
+        """Test min/max length, allowed values and regex checks."""
+        validate = compile_piece_validator(
+            "code", {"min_length": 2, "max_length": 3, "regex": "[a-z]+"}, "P"
+        )
+        validate("ab")
+        with pytest.raises(ValueError, match="too long"):
+            validate("abcd")
+        with pytest.raises(ValueError, match="too short"):
+            validate("a")
+        with pytest.raises(ValueError, match="does not match"):
+            validate("AB")
+        with pytest.raises(ValueError, match="must be one of"):
+            compile_piece_validator("c", {"allowed": ["a"]}, "P")(["unhashable"])
+
+    def test_invalid_schema(self):
+        """Test that unknown schema keys and types are rejected."""
+        with pytest.raises(ValueError, match="Unknown schema keys"):
+            compile_piece_validator("x", {"maxlen": 3}, "P")
+        with pytest.raises(ValueError, match="Unknown type"):
+            compile_piece_validator("x", {"type": "text"}, "P")
+
+
+class TestPromptBasePieceSchemas:
+    """Test suite for piece validation in the render path."""
+
+    def test_valid_render(self):
+        """Test that valid pieces render normally."""
+        prompt = ValidatedPrompt()
+        assert prompt.get_prompt_chat({"question": "Why?"}) == "Answer in en within 100 words: Why?"
+
+    def test_invalid_pieces_raise_in_every_render_path(self):
+        """Test that invalid values are rejected by the render methods."""
+        prompt = ValidatedPrompt()
+        bad = {"question": "x" * 21}
+        for render in (prompt.get_prompt_chat, prompt.get_messages, prompt.get_request_body):
+            with pytest.raises(ValueError, match="too long"):
+                render(bad)
+        with pytest.raises(ValueError, match="must be one of"):
+            prompt.bind(language="de")
+        handle = prompt.render_handle({"question": "ok"})
+        with pytest.raises(ValueError, match="must be of type int"):
+            handle.update({"limit": "many"})
+
+    def test_schema_for_unknown_piece_or_bad_default(self):
+        """Test that schemas are checked when the prompt is loaded."""
+        with pytest.raises(ValueError, match="not in prompt_pieces_available"):
+            PromptBase(
+                prompt_chat="{a}",
+                prompt_pieces_available=["a"],
+                expected_config={"pieces": {"b": {"type": "str"}}},
+                name="BadSchema",
+            )
+        with pytest.raises(ValueError, match="must be of type str"):
+            PromptBase(
+                prompt_chat="{a}",
+                prompt_pieces_available=["a"],
+                prompt_pieces_default_value={"a": 1},
+                expected_config={"pieces": {"a": {"type": "str"}}},
+                name="BadDefault",
+            )
+
+    def test_render_many(self):
+        """Test that render_many renders a batch and fails fast on an invalid item."""
+        prompt = ValidatedPrompt()
+        batch = [{"question": "A?"}, {"question": "B?", "language": "fr"}]
+        assert prompt.render_many(batch) == [prompt.get_prompt_chat(pieces) for pieces in batch]
+        with pytest.raises(ValueError, match="Item 1 of render_many batch"):
+            prompt.render_many([{"question": "A?"}, {"question": "<b>"}])
@@ -368,3 +368,619 @@ class TestPromptBaseValidation:
         prompt = InvalidMetadataPrompt()
         with pytest.raises(ValueError, match="tools must be of type list"):
             prompt.get_metadata()
+
+
+class TestPromptBaseMessages:
+    """Test chat message assembly with get_messages."""
+
+    def test_messages_system_then_user(self):
+        """Test that both templates are rendered into role/content messages."""
+        prompt = SimplePrompt()
+        messages = prompt.get_messages({"input_text": "hi"})
+        assert messages == [
+            {"role": "system", "content": "You are a helpful assistant."},
+            {"role": "user", "content": "Simple prompt: hi"},
+        ]
+
+    def test_messages_skip_empty_template(self):
+        """Test that an empty system template produces no system message."""
+        prompt = PromptWithMacros()
+        messages = prompt.get_messages({"user_name": "Alice"})
+        assert len(messages) == 1
+        assert messages[0]["role"] == "user"
+        assert "Alice" in messages[0]["content"]
+
+    def test_messages_as_json(self):
+        """Test rendering straight to a JSON request body."""
+        import json
+
+        prompt = SimplePrompt()
+        body = prompt.get_messages({"input_text": "quote \" and ünïcode"}, as_json=True)
+        assert json.loads(body) == {"messages": prompt.get_messages({"input_text": "quote \" and ünïcode"})}
+
+    def test_messages_match_single_renders(self):
+        """Test that get_messages matches get_prompt_system/get_prompt_chat."""
+        prompt = PromptBase(
+            prompt_chat="Q: {question} <<DATE>>",
+            prompt_system="Persona: {persona}",
+            prompt_pieces_available=["question", "persona"],
+            prompt_pieces_default_value={"persona": "tutor"},
+            prompt_predefine_value={"<<DATE>>": "today"},
+            name="TwoTemplates",
+            version="1",
+        )
+        pieces = {"question": "why?"}
+        system, user = prompt.get_messages(pieces)
+        assert system["content"] == prompt.get_prompt_system(pieces)
+        assert user["content"] == prompt.get_prompt_chat(pieces)
+
+    def test_messages_missing_piece_raises(self):
+        """Test that a missing required piece raises once for both templates."""
+        prompt = PromptWithMacros()
+        with pytest.raises(ValueError, match="Prompt piece 'user_name' required"):
+            prompt.get_messages({})
+
+
+class BodyPrompt(PromptBase):
+    """A prompt with characters that need JSON escaping."""
+
+    def set_prompt_chat(self):
+        return "Q: \"{question}\"\n<<DATE>> ünï"
+
+    def set_prompt_system(self):
+        return "Persona: {persona}\t"
+
+    def set_prompt_pieces_available(self):
+        self.prompt_pieces_available = ["question", "persona"]
+
+    def set_prompt_pieces_default_value(self):
+        self.prompt_pieces_default_value = {"persona": "tutor"}
+
+    def set_prompt_predefine_value(self):
+        self.prompt_predefine_value = {"<<DATE>>": "to\\day"}
+
+    def set_name(self):
+        self.name = "BodyPrompt"
+
+
+class TestPromptBaseRequestBody:
+    """Test suite for PromptBase.get_request_body."""
+
+    def test_body_equals_json_dumps(self):
+        """Test that the body is byte-identical to json.dumps of the messages."""
+        import json
+
+        prompt = BodyPrompt()
+        pieces = {"question": 'say "hi"\n\u2028 \x00 ✓'}
+        expected = json.dumps(
+            {"messages": prompt.get_messages(pieces), "model": "m", "temperature": 0.5},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        assert prompt.get_request_body(pieces, model="m", temperature=0.5) == expected
+
+    def test_body_with_repeated_piece(self):
+        """Test that list values of repeated pieces are escaped segment by segment."""
+        import json
+
+        prompt = FewShotPrompt()
+        pieces = {"examples": [{"question": 'a"b', "answer": "c\\d"}], "question": "q"}
+        body = json.loads(prompt.get_request_body(pieces))
+        assert body["messages"][0]["content"] == prompt.get_prompt_chat(pieces)
+
+    def test_messages_key_in_extra_raises(self):
+        """Test that 'messages' cannot be overridden."""
+        with pytest.raises(ValueError, match="'messages'"):
+            BodyPrompt().get_request_body(messages=[])
+
+    def test_static_text_encoded_once(self):
+        """Test that the encoded static text is cached on the compiled template."""
+        prompt = BodyPrompt()
+        prompt.get_request_body({"question": "x"})
+        compiled = prompt._compile_template(prompt.prompt_chat)
+        literals = compiled.json_literals
+        prompt.get_request_body({"question": "y"})
+        assert compiled.json_literals is literals
+
+
+class TestPromptBaseCompiledRendering:
+    """Test the compiled template rendering path."""
+
+    def test_macro_inside_piece_value_is_substituted(self):
+        """Test that macros inside piece values are still replaced."""
+        prompt = PromptWithMacros()
+        prompt.prompt_predefine_value = {"<<DATETIME>>": "now"}
+        assert prompt.get_prompt_chat({"user_name": "<<DATETIME>>"}) == "Date: now, User: now"
+
+    def test_changed_macro_invalidates_compiled_template(self):
+        """Test that adding a macro after a render takes effect."""
+        prompt = PromptBase(
+            prompt_chat="Hello <<WHO>>",
+            name="MacroLater",
+            version="1",
+        )
+        assert prompt.get_prompt_chat(no_warning=True) == "Hello <<WHO>>"
+        prompt.add_prompt_predefine_value("<<WHO>>", "World")
+        assert prompt.get_prompt_chat() == "Hello World"
+
+    def test_unavailable_braces_stay_literal(self):
+        """Test that {text} not naming an available piece is left untouched."""
+        prompt = PromptBase(
+            prompt_chat='JSON: {"a": 1} and {name}',
+            prompt_pieces_available=["name"],
+            name="Braces",
+            version="1",
+        )
+        assert prompt.get_prompt_chat({"name": "x"}) == 'JSON: {"a": 1} and x'
+
+
+class CachePrompt(PromptBase):
+    """A prompt with a fixed <<DATETIME>>; tests pass the template as prompt_chat."""
+
+    def set_prompt_pieces_available(self):
+        self.prompt_pieces_available = ["question"]
+
+    def set_prompt_predefine_value(self):
+        self.prompt_predefine_value = {"<<DATETIME>>": "2024-01-01", "<<ORG>>": "ACME"}
+
+    def set_name(self):
+        self.name = "CachePrompt"
+
+
+class TestPromptBasePrefixCache:
+    """Test prefix-cache friendly rendering and linting."""
+
+    def test_split_prefix_and_tail(self):
+        """Test that the static prefix stops at the first dynamic slot."""
+        prompt = CachePrompt(prompt_chat="Rules for <<ORG>>. Q: {question}. Now: <<DATETIME>>")
+        first = prompt.get_prompt_split({"question": "a"})
+        second = prompt.get_prompt_split({"question": "b"})
+        assert first.prefix == "Rules for ACME. Q: "
+        assert first.tail == "a. Now: 2024-01-01"
+        assert first.text == prompt.get_prompt_chat({"question": "a"})
+        assert first.prefix_hash == second.prefix_hash
+        assert len(first.prefix_hash) == 64
+
+    def test_volatile_macro_ends_prefix(self):
+        """Test that <<DATETIME>> is treated as dynamic."""
+        prompt = CachePrompt(prompt_chat="<<DATETIME>> Rules {question}")
+        assert prompt.get_prompt_split({"question": "q"}).prefix == ""
+        prompt.volatile_predefine_keys = ()
+        assert prompt.get_prompt_split({"question": "q"}).prefix == "2024-01-01 Rules "
+
+    def test_lint_flags_early_slot(self):
+        """Test that a slot before a long static body is reported."""
+        prompt = CachePrompt(prompt_chat="Now: <<DATETIME>>\n" + "static rules. " * 50 + "{question}")
+        issues = prompt.lint_prefix_cache(min_static_chars=100)
+        assert [issue["slot"] for issue in issues] == ["<<DATETIME>>"]
+        assert issues[0]["template"] == "chat"
+        assert issues[0]["prefix_chars"] == len("Now: ")
+
+    def test_lint_clean_template(self):
+        """Test that a template with dynamic parts at the end is clean."""
+        prompt = CachePrompt(prompt_chat="static rules. " * 50 + "{question} <<DATETIME>>")
+        assert prompt.lint_prefix_cache(min_static_chars=100) == []
+
+    def test_invalid_template_name(self):
+        """Test that an unknown template name raises."""
+        prompt = CachePrompt(prompt_chat="x")
+        with pytest.raises(ValueError, match="template must be"):
+            prompt.get_prompt_split(template="assistant")
+
+
+class TenantPrompt(PromptBase):
+    """A prompt whose system message is shared by the turns of one tenant."""
+
+    def set_prompt_chat(self):
+        return "{question}"
+
+    def set_prompt_system(self):
+        return "You are {persona}. Rules: {rules}. <<ORG>>"
+
+    def set_prompt_pieces_available(self):
+        self.prompt_pieces_available = ["persona", "rules", "question"]
+
+    def set_prompt_pieces_default_value(self):
+        self.prompt_pieces_default_value = {"rules": "be nice", "question": ""}
+
+    def set_prompt_predefine_value(self):
+        self.prompt_predefine_value = {"<<ORG>>": "ACME"}
+
+    def set_name(self):
+        self.name = "TenantPrompt"
+
+
+class TestPromptBaseBind:
+    """Test partial application with bind."""
+
+    def test_bound_render_matches_full_render(self):
+        """Test that a bound prompt renders like passing all pieces."""
+        prompt = TenantPrompt()
+        bound = prompt.bind(persona="a pirate", rules="arr")
+        full = {"persona": "a pirate", "rules": "arr", "question": "where?"}
+        assert bound.get_prompt_system({"question": "where?"}) == prompt.get_prompt_system(full)
+        assert bound.get_prompt_chat({"question": "where?"}) == "where?"
+
+    def test_bound_pieces_folded_into_template(self):
+        """Test that the bound values are part of the static text."""
+        bound = TenantPrompt().bind(persona="a pirate", rules="arr")
+        split = bound.get_prompt_split(template="system", prompt_pieces={"question": "q"})
+        assert split.prefix == "You are a pirate. Rules: arr. ACME"
+        assert split.tail == ""
+        assert bound.prompt_pieces_available == ["question"]
+        assert list(bound.prompt_pieces_default_value) == ["question"]
+
+    def test_original_prompt_unchanged(self):
+        """Test that binding does not modify the original prompt."""
+        prompt = TenantPrompt()
+        prompt.bind(persona="a pirate")
+        assert prompt.prompt_pieces_available == ["persona", "rules", "question"]
+        assert prompt.get_prompt_system({"persona": "x"}) == "You are x. Rules: be nice. ACME"
+
+    def test_bind_twice(self):
+        """Test binding a bound prompt."""
+        bound = TenantPrompt().bind(persona="p").bind(rules="r")
+        assert bound.get_prompt_system() == "You are p. Rules: r. ACME"
+        assert bound.get_metadata()["bound_prompt_pieces"] == {"persona": "p", "rules": "r"}
+
+    def test_bound_piece_in_input_warns(self, caplog):
+        """Test that passing a bound piece again is reported as unknown."""
+        bound = TenantPrompt().bind(persona="p")
+        bound.get_prompt_system({"persona": "other"})
+        assert "Unknown piece 'persona'" in caplog.text
+
+    def test_bind_unknown_piece_raises(self):
+        """Test that binding an unavailable piece raises."""
+        with pytest.raises(ValueError, match="Cannot bind unknown piece"):
+            TenantPrompt().bind(missing="x")
+
+    def test_bound_prompt_recompiles_after_macro_change(self):
+        """Test that a bound prompt keeps its bound values when recompiled."""
+        bound = TenantPrompt().bind(persona="p")
+        bound.add_prompt_predefine_value("<<ORG>>", "Initech")
+        assert bound.get_prompt_system() == "You are p. Rules: be nice. Initech"
+
+    def test_bound_repeat_state_not_shared(self):
+        """Test that repeat specs and compiled item templates are not shared with the original."""
+        prompt = FewShotPrompt()
+        bound = prompt.bind(question="q")
+        examples = [{"question": "a", "answer": "b"}, {"question": "c", "answer": "d"}]
+        before = bound.get_prompt_chat({"examples": examples})
+        prompt.prompt_pieces_repeat["examples"]["separator"] = " | "
+        prompt.add_prompt_predefine_value("<<SUFFIX>>", "!")
+        assert prompt.get_prompt_chat({"examples": examples, "question": "q"}) != before
+        assert bound.get_prompt_chat({"examples": examples}) == before
+        assert bound._compiled_repeats is not prompt._compiled_repeats
+
+
+class AgentPrompt(PromptBase):
+    """A system prompt re-rendered on every agent turn."""
+
+    def set_prompt_system(self):
+        return "Big static rules. Turn {turn}. Scratchpad: {scratchpad}. Turn again {turn}."
+
+    def set_prompt_pieces_available(self):
+        self.prompt_pieces_available = ["turn", "scratchpad"]
+
+    def set_prompt_pieces_default_value(self):
+        self.prompt_pieces_default_value = {"scratchpad": "(empty)"}
+
+    def set_name(self):
+        self.name = "AgentPrompt"
+
+
+class TestPromptBaseRenderHandle:
+    """Test incremental re-rendering with render_handle."""
+
+    def test_initial_text_matches_render(self):
+        """Test that the handle starts with the normal rendering."""
+        prompt = AgentPrompt()
+        handle = prompt.render_handle({"turn": 1}, template="system")
+        assert handle.text == prompt.get_prompt_system({"turn": 1})
+
+    def test_update_changes_only_given_slots(self):
+        """Test that update swaps every occurrence of the changed piece."""
+        prompt = AgentPrompt()
+        handle = prompt.render_handle({"turn": 1}, template="system")
+        assert handle.update({"turn": 2}) == ["turn"]
+        assert handle.text == prompt.get_prompt_system({"turn": 2})
+        assert handle.update({"turn": 2, "scratchpad": "(empty)"}) == []
+
+    def test_update_none_restores_default(self):
+        """Test that None restores the default value."""
+        prompt = AgentPrompt()
+        handle = prompt.render_handle({"turn": 1, "scratchpad": "notes"}, template="system")
+        handle.update({"scratchpad": None})
+        assert "Scratchpad: (empty)." in handle.text
+
+    def test_update_unknown_piece_warns(self, caplog):
+        """Test that unknown pieces are reported and ignored."""
+        handle = AgentPrompt().render_handle({"turn": 1}, template="system")
+        assert handle.update({"nope": "x"}) == []
+        assert "Unknown piece 'nope'" in caplog.text
+
+    def test_parts_join_to_text(self):
+        """Test that the segments join to the full text."""
+        handle = AgentPrompt().render_handle({"turn": 1}, template="system")
+        assert "".join(handle.parts) == handle.text == str(handle)
+
+
+class TestPromptBaseFingerprint:
+    """Test content fingerprints."""
+
+    def test_fingerprint_stable_across_instances(self):
+        """Test that equal definitions have equal fingerprints."""
+        assert SimplePrompt().fingerprint == SimplePrompt().fingerprint
+        assert len(SimplePrompt().fingerprint) == 64
+
+    def test_fingerprint_ignores_volatile_macros(self):
+        """Test that <<DATETIME>> does not change the fingerprint."""
+        first = PromptWithMacros()
+        second = PromptWithMacros()
+        second.prompt_predefine_value["<<DATETIME>>"] = "1999-01-01 00:00:00"
+        second._fingerprint = None
+        assert first.fingerprint == second.fingerprint
+
+    def test_fingerprint_changes_with_definition(self):
+        """Test that template, default and macro changes change the fingerprint."""
+        prompt = SimplePrompt()
+        before = prompt.fingerprint
+        prompt.add_prompt_piece_default_value("input_text", "other")
+        after_default = prompt.fingerprint
+        prompt.add_prompt_predefine_value("<<X>>", "y")
+        assert len({before, after_default, prompt.fingerprint}) == 3
+
+    def test_fingerprint_follows_direct_changes(self):
+        """Test that attributes changed without add_* still change the fingerprint."""
+        prompt = SimplePrompt()
+        before = prompt.fingerprint
+        prompt.prompt_pieces_default_value["input_text"] = "other"
+        after_default = prompt.fingerprint
+        prompt.prompt_predefine_value = {"<<ORG>>": "ACME"}
+        assert len({before, after_default, prompt.fingerprint}) == 3
+
+    def test_fingerprint_in_metadata(self):
+        """Test that the fingerprint is part of the metadata."""
+        prompt = SimplePrompt()
+        assert prompt.get_metadata()["fingerprint"] == prompt.fingerprint
+
+    def test_bound_prompt_has_own_fingerprint(self):
+        """Test that binding pieces changes the fingerprint."""
+        prompt = SimplePrompt()
+        assert prompt.bind(input_text="x").fingerprint != prompt.fingerprint
+
+
+class FewShotPrompt(PromptBase):
+    """Prompt with a repeated examples piece."""
+
+    def set_prompt_chat(self):
+        return "Examples:\n{examples}\n\nQ: {question}\nA:"
+
+    def set_prompt_pieces_available(self):
+        self.prompt_pieces_available = ["examples", "question"]
+
+    def set_prompt_pieces_default_value(self):
+        self.prompt_pieces_default_value = {"examples": "(none)"}
+
+    def set_prompt_pieces_repeat(self):
+        return {
+            "examples": {"item": "Q: {question}\nA: {answer} <<SUFFIX>>", "separator": "\n\n"}
+        }
+
+    def set_prompt_predefine_value(self):
+        return {"<<SUFFIX>>": "."}
+
+    def set_name(self):
+        self.name = "FewShotPrompt"
+
+
+class TestPromptBaseRepeatPieces:
+    """Test suite for list valued (repeated) prompt pieces."""
+
+    examples = [
+        {"question": "1+1?", "answer": "2"},
+        {"question": "2+2?", "answer": "4"},
+    ]
+
+    def test_list_value_rendered_with_item_template(self):
+        """Test that every item is rendered with the item template and separator."""
+        prompt = FewShotPrompt()
+        result = prompt.get_prompt_chat({"examples": self.examples, "question": "3+3?"})
+        assert result == (
+            "Examples:\nQ: 1+1?\nA: 2 .\n\nQ: 2+2?\nA: 4 .\n\nQ: 3+3?\nA:"
+        )
+
+    def test_string_value_and_default_unchanged(self):
+        """Test that a plain string value is rendered as before."""
+        prompt = FewShotPrompt()
+        assert prompt.get_prompt_chat({"question": "x"}).startswith("Examples:\n(none)\n")
+
+    def test_empty_list_renders_nothing(self):
+        """Test that an empty list renders an empty piece."""
+        prompt = FewShotPrompt()
+        assert prompt.get_prompt_chat({"examples": [], "question": "x"}).startswith(
+            "Examples:\n\n\nQ: x"
+        )
+
+    def test_non_dict_items_use_item_field(self):
+        """Test that non-dict items fill the {item} field."""
+        prompt = PromptBase(
+            prompt_chat="Rules:\n{rules}",
+            prompt_pieces_available=["rules"],
+            prompt_pieces_repeat={"rules": {"item": "- {item}"}},
+            name="RulesPrompt",
+        )
+        assert prompt.get_prompt_chat({"rules": ["a", "b"]}) == "Rules:\n- a\n- b"
+
+    def test_missing_item_field_raises(self):
+        """Test that an item without a field of the item template raises."""
+        prompt = FewShotPrompt()
+        with pytest.raises(ValueError, match="has no value for 'answer'"):
+            prompt.get_prompt_chat({"examples": [{"question": "q"}], "question": "x"})
+
+    def test_unknown_repeat_piece_raises(self):
+        """Test that a repeat spec for a piece that is not available raises at init."""
+        with pytest.raises(ValueError, match="not in prompt_pieces_available"):
+            PromptBase(
+                prompt_chat="{a}",
+                prompt_pieces_available=["a"],
+                prompt_pieces_repeat={"b": {"item": "{item}"}},
+                name="BadRepeat",
+            )
+
+    def test_split_bind_and_handle_support_lists(self):
+        """Test that the prefix split, bind and render handles accept list values."""
+        prompt = FewShotPrompt()
+        pieces = {"examples": self.examples, "question": "3+3?"}
+        expected = prompt.get_prompt_chat(pieces)
+        assert prompt.get_prompt_split(pieces).text == expected
+        assert prompt.bind(examples=self.examples).get_prompt_chat({"question": "3+3?"}) == expected
+        handle = prompt.render_handle(pieces)
+        assert handle.text == expected
+        assert handle.update({"examples": self.examples[:1]}) == ["examples"]
+        assert "2+2?" not in handle.text
+
+    def test_repeat_spec_in_metadata_and_fingerprint(self):
+        """Test that the repeat spec is reported and part of the fingerprint."""
+        prompt = FewShotPrompt()
+        assert "examples" in prompt.get_metadata()["repeat_prompt_pieces"]
+        other = FewShotPrompt()
+        other.prompt_pieces_repeat = {"examples": {"item": "{question}"}}
+        other._fingerprint = None
+        assert other.fingerprint != prompt.fingerprint
+
+
+class StreamPrompt(PromptBase):
+    """A prompt whose pieces may be awaitables or async iterables."""
+
+    def set_prompt_chat(self):
+        return "Context:\n{context}\nQuestion: {question}\nTools: {tools}"
+
+    def set_prompt_pieces_available(self):
+        self.prompt_pieces_available = ["context", "question", "tools"]
+
+    def set_prompt_pieces_default_value(self):
+        self.prompt_pieces_default_value = {"tools": "none"}
+
+    def set_name(self):
+        self.name = "StreamPrompt"
+
+
+class TestPromptBaseRenderStream:
+    """Test suite for PromptBase.render_stream and render_async."""
+
+    def test_render_async_matches_sync(self):
+        """Test that awaitable and async iterable pieces render like plain values."""
+        import asyncio
+
+        prompt = StreamPrompt()
+
+        async def fetch():
+            await asyncio.sleep(0)
+            return "doc"
+
+        async def chunks():
+            for part in ("a", "b"):
+                await asyncio.sleep(0)
+                yield part
+
+        async def run():
+            return await prompt.render_async({"context": chunks(), "question": fetch()})
+
+        assert asyncio.run(run()) == prompt.get_prompt_chat(
+            {"context": "ab", "question": "doc"}
+        )
+
+    def test_stream_yields_before_slow_piece(self):
+        """Test that text before a pending piece is yielded first, and pieces resolve concurrently."""
+        import asyncio
+
+        prompt = StreamPrompt()
+        order = []
+
+        async def slow(value, delay):
+            await asyncio.sleep(delay)
+            order.append(value)
+            return value
+
+        async def run():
+            stream = prompt.render_stream(
+                {"context": slow("ctx", 0.05), "question": slow("q", 0.01)}
+            )
+            first = await stream.__anext__()
+            rest = [chunk async for chunk in stream]
+            return first, rest
+
+        first, rest = asyncio.run(run())
+        assert first == "Context:\n"
+        assert "".join([first] + rest).endswith("Question: q\nTools: none")
+        assert order == ["q", "ctx"]
+
+    def test_streamed_repeat_piece_items(self):
+        """Test that items of an async iterable repeated piece use the item template."""
+        import asyncio
+
+        prompt = FewShotPrompt()
+        examples = [{"question": "1+1?", "answer": "2"}, {"question": "2+2?", "answer": "4"}]
+
+        async def items():
+            for example in examples:
+                yield example
+
+        async def run():
+            return await prompt.render_async({"examples": items(), "question": "3+3?"})
+
+        assert asyncio.run(run()) == prompt.get_prompt_chat(
+            {"examples": examples, "question": "3+3?"}
+        )
+
+    def test_error_in_piece_is_raised(self):
+        """Test that an exception of an asynchronous piece propagates."""
+        import asyncio
+
+        prompt = StreamPrompt()
+
+        async def failing():
+            raise RuntimeError("retrieval failed")
+
+        async def run():
+            return await prompt.render_async({"context": failing(), "question": "q"})
+
+        with pytest.raises(RuntimeError, match="retrieval failed"):
+            asyncio.run(run())
+
+
+class ParentPrompt(PromptBase):
+    """A prompt whose associated prompts are given as a constructor argument."""
+
+    def set_prompt_chat(self):
+        return "Parent"
+
+    def set_name(self):
+        self.name = "ParentPrompt"
+
+
+class TestPromptBaseAssociatedPrompts:
+    """Test associated prompts given by instance or by name."""
+
+    def test_instance_value_returned(self):
+        """Test that an associated instance is returned as is."""
+        child = SimplePrompt()
+        prompt = ParentPrompt(associated_prompt={"child": child})
+        assert prompt.get_associated_prompt("child") is child
+        assert prompt.get_associated_references() == {}
+
+    def test_name_needs_a_manager(self):
+        """Test that a name cannot be resolved outside a PromptManager."""
+        prompt = ParentPrompt(associated_prompt={"footer": "FooterPrompt"})
+        assert prompt.associated_prompt_names == ["footer"]
+        assert prompt.get_associated_references() == {"footer": "FooterPrompt"}
+        with pytest.raises(ValueError, match="load the prompt through a PromptManager"):
+            prompt.get_associated_prompt("footer")
+        with pytest.raises(ValueError, match="No associated prompt 'missing'"):
+            prompt.get_associated_prompt("missing")
+
+    def test_names_in_fingerprint(self):
+        """Test that the associated names are part of the fingerprint."""
+        first = ParentPrompt(associated_prompt={"footer": "FooterPrompt"})
+        second = ParentPrompt(associated_prompt={"footer": "OtherFooter"})
+        assert first.fingerprint != second.fingerprint
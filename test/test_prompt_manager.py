@@ -401,3 +401,705 @@ class TestPromptManagerIntegration:
             prompt = manager.get_prompt("PromptHelloWorld")
             result = prompt.get_prompt_chat()
             assert result == "Hello, World!"
+
+
+@pytest.fixture
+def piece_prompt_dir():
+    """Create a temporary directory with a prompt that takes a piece."""
+    temp_dir = tempfile.mkdtemp()
+    with open(os.path.join(temp_dir, "echo_prompt.py"), "w") as f:
+        f.write("""
+from gs_prompt_manager import PromptBase
+
+class EchoPrompt(PromptBase):
+    def set_prompt_chat(self):
+        return "Echo: {text}"
+
+    def set_prompt_system(self):
+        return "System for {text}"
+
+    def set_prompt_pieces_available(self):
+        self.prompt_pieces_available = ["text"]
+
+    def set_prompt_pieces_default_value(self):
+        self.prompt_pieces_default_value = {"text": ""}
+
+    def set_name(self):
+        self.name = "EchoPrompt"
+""")
+
+    yield temp_dir
+
+    shutil.rmtree(temp_dir)
+
+
+class TestPromptManagerRenderParallel:
+    """Tests for PromptManager.render_parallel."""
+
+    def test_results_in_input_order(self, piece_prompt_dir):
+        """Test that results stream back in input order across workers."""
+        manager = PromptManager(prompt_paths=piece_prompt_dir)
+        pieces = ({"text": str(i)} for i in range(50))
+        results = list(
+            manager.render_parallel("EchoPrompt", pieces, workers=2, chunksize=4)
+        )
+        assert results == [f"Echo: {i}" for i in range(50)]
+
+    def test_system_template(self, piece_prompt_dir):
+        """Test rendering the system template."""
+        manager = PromptManager(prompt_paths=piece_prompt_dir)
+        results = list(
+            manager.render_parallel(
+                "EchoPrompt", [{"text": "a"}], workers=1, template="system"
+            )
+        )
+        assert results == ["System for a"]
+
+    def test_invalid_arguments(self, piece_prompt_dir):
+        """Test that unknown prompts and templates are rejected up front."""
+        manager = PromptManager(prompt_paths=piece_prompt_dir)
+        with pytest.raises(ValueError, match="not found"):
+            list(manager.render_parallel("Missing", [{}]))
+        with pytest.raises(ValueError, match="template must be"):
+            list(manager.render_parallel("EchoPrompt", [{}], template="user"))
+
+    def test_lint_prefix_cache(self, piece_prompt_dir):
+        """Test that the manager-level lint only reports prompts with issues."""
+        manager = PromptManager(prompt_paths=piece_prompt_dir)
+        assert manager.lint_prefix_cache() == {}
+        report = manager.lint_prefix_cache(min_static_chars=1)
+        assert [issue["slot"] for issue in report["EchoPrompt"]] == ["text"]
+
+
+class TestPromptManagerReload:
+    """Tests for fingerprints and PromptManager.reload."""
+
+    def write_prompt(self, directory, filename, class_name, text):
+        with open(os.path.join(directory, filename), "w") as f:
+            f.write(f"""
+from gs_prompt_manager import PromptBase
+
+class {class_name}(PromptBase):
+    def set_prompt_chat(self):
+        return "{text}"
+""")
+
+    def test_fingerprints(self, multi_prompt_dir):
+        """Test that fingerprints are reported for every prompt."""
+        manager = PromptManager(prompt_paths=multi_prompt_dir)
+        fingerprints = manager.fingerprints()
+        assert set(fingerprints) == set(manager.get_prompt_names())
+        assert len(set(fingerprints.values())) == 3
+
+    def test_reload_unchanged_keeps_instances(self, multi_prompt_dir):
+        """Test that unchanged files are neither re-imported nor re-instantiated."""
+        manager = PromptManager(prompt_paths=multi_prompt_dir)
+        before = dict(manager.get_prompt_instances())
+        report = manager.reload()
+        assert sorted(report["unchanged"]) == sorted(before)
+        assert report["added"] == report["updated"] == report["removed"] == []
+        for name, instance in manager.get_prompt_instances().items():
+            assert instance is before[name]
+
+    def test_reload_detects_changes(self):
+        """Test added, updated, removed and touched-but-identical files."""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            self.write_prompt(temp_dir, "a.py", "PromptA", "A")
+            self.write_prompt(temp_dir, "b.py", "PromptB", "B")
+            self.write_prompt(temp_dir, "c.py", "PromptC", "C")
+            manager = PromptManager(prompt_paths=temp_dir)
+            instance_c = manager.get_prompt("PromptC")
+
+            self.write_prompt(temp_dir, "a.py", "PromptA", "A changed")
+            os.remove(os.path.join(temp_dir, "b.py"))
+            self.write_prompt(temp_dir, "d.py", "PromptD", "D")
+            # rewrite with identical content but a new mtime
+            self.write_prompt(temp_dir, "c.py", "PromptC", "C")
+            stat = os.stat(os.path.join(temp_dir, "c.py"))
+            os.utime(
+                os.path.join(temp_dir, "c.py"),
+                ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9),
+            )
+
+            report = manager.reload()
+            assert report["updated"] == ["PromptA"]
+            assert report["removed"] == ["PromptB"]
+            assert report["added"] == ["PromptD"]
+            assert report["unchanged"] == ["PromptC"]
+            assert manager.get_prompt("PromptA").get_prompt_chat() == "A changed"
+            # the re-imported class gets a new instance with the same fingerprint
+            assert manager.get_prompt("PromptC") is not instance_c
+            assert manager.get_prompt("PromptC").fingerprint == instance_c.fingerprint
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_reload_picks_up_schema_changes(self, tmp_path):
+        """Test that a changed piece schema is enforced after reload."""
+        source = """
+from gs_prompt_manager import PromptBase
+
+class SchemaPrompt(PromptBase):
+    def set_prompt_chat(self):
+        return "Q: {{question}}"
+
+    def set_prompt_pieces_available(self):
+        self.prompt_pieces_available = ["question"]
+
+    def set_expected_config(self):
+        return {{"pieces": {{"question": {{"max_length": {limit}}}}}}}
+"""
+        path = tmp_path / "schema.py"
+        path.write_text(source.format(limit=100))
+        manager = PromptManager(prompt_paths=str(tmp_path))
+        assert manager.get_prompt("SchemaPrompt").get_prompt_chat({"question": "long"}) == "Q: long"
+        path.write_text(source.format(limit=3))
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert manager.reload()["updated"] == ["SchemaPrompt"]
+        with pytest.raises(ValueError, match="too long"):
+            manager.get_prompt("SchemaPrompt").get_prompt_chat({"question": "long"})
+
+
+PACKAGED_PROMPT = """
+from gs_prompt_manager import PromptBase
+
+class {name}(PromptBase):
+    def set_prompt_chat(self):
+        return "{name} says {{word}}"
+
+    def set_prompt_pieces_available(self):
+        self.prompt_pieces_available = ["word"]
+
+    def set_prompt_pieces_default_value(self):
+        self.prompt_pieces_default_value = {{"word": "hi"}}
+"""
+
+
+class TestPromptManagerArchivesAndPackages:
+    """Tests for loading prompts from zip archives, packages and entry points."""
+
+    @pytest.fixture
+    def temp_dir(self):
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    def test_load_from_zip_archive(self, temp_dir):
+        """Test that prompts are read straight from a zip archive."""
+        import zipfile
+
+        archive_path = os.path.join(temp_dir, "prompts.zip")
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            archive.writestr("bundle/__init__.py", "")
+            archive.writestr("bundle/a.py", PACKAGED_PROMPT.format(name="ZipPromptA"))
+            archive.writestr("bundle/deep/b.py", PACKAGED_PROMPT.format(name="ZipPromptB"))
+            archive.writestr("bundle-0.1.dist-info/skip.py", "raise RuntimeError()")
+
+        manager = PromptManager(prompt_paths=archive_path)
+        assert sorted(manager.get_prompt_names()) == ["ZipPromptA", "ZipPromptB"]
+        assert manager.get_prompt("ZipPromptB").get_prompt_chat() == "ZipPromptB says hi"
+        assert manager.reload()["unchanged"] == ["ZipPromptA", "ZipPromptB"]
+
+    def test_archive_modules_import_siblings(self, temp_dir):
+        """Test that archive modules import siblings relatively and by absolute name."""
+        import sys
+        import zipfile
+
+        archive_path = os.path.join(temp_dir, "wheel.zip")
+        sibling_prompt = """
+from gs_prompt_manager import PromptBase
+{import_line}
+
+class {name}(PromptBase):
+    def set_prompt_chat(self):
+        return GREETING + " from {name}"
+"""
+
+        def write_archive(greeting):
+            with zipfile.ZipFile(archive_path, "w") as archive:
+                archive.writestr("gs_test_zip_bundle/__init__.py", "")
+                archive.writestr("gs_test_zip_bundle/common.py", f"GREETING = {greeting!r}\n")
+                archive.writestr(
+                    "gs_test_zip_bundle/relative.py",
+                    sibling_prompt.format(
+                        import_line="from .common import GREETING", name="RelativePrompt"
+                    ),
+                )
+                archive.writestr(
+                    "gs_test_zip_bundle/absolute.py",
+                    sibling_prompt.format(
+                        import_line="from gs_test_zip_bundle.common import GREETING",
+                        name="AbsolutePrompt",
+                    ),
+                )
+
+        write_archive("Hello")
+        try:
+            manager = PromptManager(prompt_paths=archive_path)
+            assert manager.get_prompt("RelativePrompt").get_prompt_chat() == "Hello from RelativePrompt"
+            assert manager.get_prompt("AbsolutePrompt").get_prompt_chat() == "Hello from AbsolutePrompt"
+
+            # a changed archive is imported again, siblings included
+            write_archive("Hi")
+            stat = os.stat(archive_path)
+            os.utime(archive_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            manager.reload()
+            assert manager.get_prompt("RelativePrompt").get_prompt_chat() == "Hi from RelativePrompt"
+            assert manager.get_prompt("AbsolutePrompt").get_prompt_chat() == "Hi from AbsolutePrompt"
+        finally:
+            PromptManager.clear_module_cache()
+            sys.path.remove(os.path.realpath(archive_path))
+            for name in list(sys.modules):
+                if name.startswith("gs_test_zip_bundle"):
+                    del sys.modules[name]
+
+    def test_invalid_archive_path(self, temp_dir):
+        """Test that a file that is not an archive is rejected."""
+        path = os.path.join(temp_dir, "not_an_archive.txt")
+        with open(path, "w") as f:
+            f.write("text")
+        with pytest.raises(ValueError, match="not a directory or zip archive"):
+            PromptManager(prompt_paths=path)
+
+    def test_load_from_zipimported_package(self, temp_dir, monkeypatch):
+        """Test that an importable package (here zip-imported) is walked for prompts."""
+        import sys
+        import zipfile
+
+        archive_path = os.path.join(temp_dir, "site.zip")
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            archive.writestr("gs_test_pkg_prompts/__init__.py", "")
+            archive.writestr(
+                "gs_test_pkg_prompts/one.py", PACKAGED_PROMPT.format(name="PackagePromptOne")
+            )
+            archive.writestr("gs_test_pkg_prompts/sub/__init__.py", "")
+            archive.writestr(
+                "gs_test_pkg_prompts/sub/two.py", PACKAGED_PROMPT.format(name="PackagePromptTwo")
+            )
+        monkeypatch.syspath_prepend(archive_path)
+        try:
+            manager = PromptManager(prompt_packages="gs_test_pkg_prompts")
+            assert manager.prompt_paths == []
+            assert sorted(manager.get_prompt_names()) == [
+                "PackagePromptOne",
+                "PackagePromptTwo",
+            ]
+        finally:
+            for name in list(sys.modules):
+                if name.startswith("gs_test_pkg_prompts"):
+                    del sys.modules[name]
+
+    def test_load_from_entry_point_group(self, temp_dir, monkeypatch):
+        """Test that entry points naming modules or classes are loaded."""
+        import sys
+
+        package_dir = os.path.join(temp_dir, "gs_test_ep_prompts")
+        os.makedirs(package_dir)
+        with open(os.path.join(package_dir, "__init__.py"), "w") as f:
+            f.write(PACKAGED_PROMPT.format(name="EntryPointClassPrompt"))
+        with open(os.path.join(package_dir, "more.py"), "w") as f:
+            f.write(PACKAGED_PROMPT.format(name="EntryPointModulePrompt"))
+        dist_info = os.path.join(temp_dir, "gs_test_ep_prompts-0.1.dist-info")
+        os.makedirs(dist_info)
+        with open(os.path.join(dist_info, "METADATA"), "w") as f:
+            f.write("Metadata-Version: 2.1\nName: gs-test-ep-prompts\nVersion: 0.1\n")
+        with open(os.path.join(dist_info, "entry_points.txt"), "w") as f:
+            f.write(
+                "[gs_test_prompt_group]\n"
+                "cls = gs_test_ep_prompts:EntryPointClassPrompt\n"
+                "mod = gs_test_ep_prompts.more\n"
+            )
+        monkeypatch.syspath_prepend(temp_dir)
+        try:
+            manager = PromptManager(entry_point_group="gs_test_prompt_group")
+            assert sorted(manager.get_prompt_names()) == [
+                "EntryPointClassPrompt",
+                "EntryPointModulePrompt",
+            ]
+        finally:
+            for name in list(sys.modules):
+                if name.startswith("gs_test_ep_prompts"):
+                    del sys.modules[name]
+
+
+class TestPromptManagerModuleCache:
+    """Tests for the process-wide module cache."""
+
+    @pytest.fixture
+    def counting_prompt_dir(self):
+        """A prompt directory whose module records every execution in a log file."""
+        temp_dir = tempfile.mkdtemp()
+        log_path = os.path.join(temp_dir, "imports.log")
+        with open(os.path.join(temp_dir, "counted.py"), "w") as f:
+            f.write(f"""
+from gs_prompt_manager import PromptBase
+
+with open({log_path!r}, "a") as log:
+    log.write("imported\\n")
+
+class CountedPrompt(PromptBase):
+    def set_prompt_chat(self):
+        return "counted"
+""")
+        yield temp_dir, log_path
+        shutil.rmtree(temp_dir)
+
+    def import_count(self, log_path):
+        with open(log_path) as f:
+            return len(f.readlines())
+
+    def test_second_manager_reuses_modules(self, counting_prompt_dir):
+        """Test that a second manager over the same files does not re-execute them."""
+        temp_dir, log_path = counting_prompt_dir
+        first = PromptManager(prompt_paths=temp_dir)
+        second = PromptManager(prompt_paths=temp_dir)
+        assert self.import_count(log_path) == 1
+        assert first.prompt_objects["CountedPrompt"] is second.prompt_objects["CountedPrompt"]
+        # instances stay per manager
+        assert first.get_prompt("CountedPrompt") is not second.get_prompt("CountedPrompt")
+
+    def test_clear_module_cache(self, counting_prompt_dir):
+        """Test that clearing the cache forces a re-import."""
+        temp_dir, log_path = counting_prompt_dir
+        PromptManager(prompt_paths=temp_dir)
+        PromptManager.clear_module_cache()
+        PromptManager(prompt_paths=temp_dir)
+        assert self.import_count(log_path) == 2
+
+    def test_modules_registered_with_qualified_names(self):
+        """Test that same-named files in different folders get distinct registered modules."""
+        import sys
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            for folder, class_name in (("x", "FolderXPrompt"), ("y", "FolderYPrompt")):
+                os.makedirs(os.path.join(temp_dir, folder))
+                with open(os.path.join(temp_dir, folder, "prompt.py"), "w") as f:
+                    f.write(f"""
+from gs_prompt_manager import PromptBase
+
+class {class_name}(PromptBase):
+    def set_prompt_chat(self):
+        return "{class_name}"
+""")
+            manager = PromptManager(prompt_paths=temp_dir)
+            module_x = manager.prompt_objects["FolderXPrompt"].__module__
+            module_y = manager.prompt_objects["FolderYPrompt"].__module__
+            assert module_x != module_y
+            assert module_x.endswith("_prompt") and module_y.endswith("_prompt")
+            assert sys.modules[module_x].FolderXPrompt is manager.prompt_objects["FolderXPrompt"]
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+class TestPromptManagerFreeze:
+    """Tests for PromptManager.freeze and memory_sharing_stats."""
+
+    @pytest.fixture(autouse=True)
+    def unfreeze_gc(self):
+        import gc
+
+        yield
+        gc.unfreeze()
+
+    def test_freeze_makes_registry_read_only(self, multi_prompt_dir):
+        """Test that the registry cannot be modified or reloaded after freeze."""
+        manager = PromptManager(prompt_paths=multi_prompt_dir)
+        manager.freeze()
+        assert manager.frozen
+        with pytest.raises(TypeError):
+            manager.prompt_instances["Other"] = None
+        with pytest.raises(ValueError, match="frozen"):
+            manager.reload()
+        assert manager.get_prompt("MultiPrompt0").get_prompt_chat() == "Prompt 0"
+        assert sorted(manager.get_prompt_names()) == [
+            "MultiPrompt0",
+            "MultiPrompt1",
+            "MultiPrompt2",
+        ]
+
+    def test_freeze_precompiles_templates(self, piece_prompt_dir):
+        """Test that templates are compiled before any render."""
+        manager = PromptManager(prompt_paths=piece_prompt_dir)
+        prompt = manager.get_prompt("EchoPrompt")
+        assert prompt._compiled_templates == {}
+        manager.freeze()
+        assert set(prompt._compiled_templates) == {prompt.prompt_chat, prompt.prompt_system}
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+    def test_render_in_forked_child(self, piece_prompt_dir):
+        """Test that a forked worker renders from the frozen registry."""
+        manager = PromptManager(prompt_paths=piece_prompt_dir)
+        manager.freeze()
+        pid = os.fork()
+        if pid == 0:
+            ok = manager.get_prompt("EchoPrompt").get_prompt_chat({"text": "x"}) == "Echo: x"
+            os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+        assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+
+    def test_memory_sharing_stats(self):
+        """Test the format of the memory sharing report."""
+        stats = PromptManager.memory_sharing_stats()
+        if not os.path.exists("/proc/self/smaps_rollup"):
+            assert stats is None
+            return
+        assert stats["rss_kb"] > 0
+        assert 0.0 <= stats["shared_fraction"] <= 1.0
+        assert PromptManager.memory_sharing_stats(pid=2**22 + 12345) is None
+
+
+class TestPromptManagerMetadataExport:
+    """Tests for PromptManager.iter_metadata and export_metadata."""
+
+    def test_iter_metadata_reuses_instances(self, multi_prompt_dir):
+        """Test that records come from the loaded instances, with field selection."""
+        manager = PromptManager(prompt_paths=multi_prompt_dir)
+        records = dict(manager.iter_metadata(fields=["name", "fingerprint"]))
+        assert sorted(records) == ["MultiPrompt0", "MultiPrompt1", "MultiPrompt2"]
+        instance = manager.get_prompt("MultiPrompt1")
+        assert records["MultiPrompt1"] == {"name": "MultiPrompt1", "fingerprint": instance.fingerprint}
+
+    def test_unknown_field_raises(self, multi_prompt_dir):
+        """Test that an unknown field is reported."""
+        manager = PromptManager(prompt_paths=multi_prompt_dir)
+        with pytest.raises(ValueError, match="Unknown metadata fields"):
+            list(manager.iter_metadata(fields=["nope"]))
+
+    def test_export_jsonl_and_json(self, multi_prompt_dir):
+        """Test both export formats."""
+        import io
+        import json
+
+        manager = PromptManager(prompt_paths=multi_prompt_dir)
+        buffer = io.StringIO()
+        assert manager.export_metadata(buffer, fields=["prompt_chat"]) == 3
+        lines = [json.loads(line) for line in buffer.getvalue().splitlines()]
+        assert {"key": "MultiPrompt0", "prompt_chat": "Prompt 0"} in lines
+
+        buffer = io.StringIO()
+        manager.export_metadata(buffer, format="json")
+        exported = json.loads(buffer.getvalue())
+        assert exported["MultiPrompt2"] == manager.get_prompt("MultiPrompt2").get_metadata()
+        with pytest.raises(ValueError, match="format must be"):
+            manager.export_metadata(buffer, format="csv")
+
+    def test_includes_stored_prompts_without_caching(self, multi_prompt_dir, tmp_path):
+        """Test that stored prompts are exported without being kept in memory."""
+        import io
+        from gs_prompt_manager import PromptStore
+
+        store = PromptStore(str(tmp_path / "prompts.db"))
+        store.put({"name": "Stored", "version": "1", "prompt_chat": "v1"})
+        store.put({"name": "Stored", "version": "2", "prompt_chat": "v2"})
+        manager = PromptManager(prompt_paths=multi_prompt_dir, prompt_store=store)
+        records = dict(manager.iter_metadata(fields=["version"]))
+        assert records["Stored"] == {"version": "2"}
+        assert manager._store_instances == {}
+        assert manager.export_metadata(io.StringIO(), format="json") == 4
+
+
+class TestPromptManagerNamespaces:
+    """Tests for qualified names and prefix queries."""
+
+    @pytest.fixture
+    def namespaced_dir(self, tmp_path):
+        files = {
+            ("support", "billing", "refund.py"): ["RefundPrompt", "Shared"],
+            ("support", "billing", "invoice.py"): ["InvoicePrompt"],
+            ("support", "triage.py"): ["TriagePrompt"],
+            ("sales", "outreach.py"): ["Shared"],
+        }
+        for parts, names in files.items():
+            directory = tmp_path.joinpath(*parts[:-1])
+            directory.mkdir(parents=True, exist_ok=True)
+            source = "".join(PACKAGED_PROMPT.format(name=name) for name in names)
+            directory.joinpath(parts[-1]).write_text(source)
+        return str(tmp_path)
+
+    def test_qualified_names(self, namespaced_dir):
+        """Test that prompts are reachable by bare and qualified name."""
+        manager = PromptManager(prompt_paths=namespaced_dir)
+        refund = manager.get_prompt("support.billing.refund.RefundPrompt")
+        assert manager.get_prompt("RefundPrompt") is refund
+        # both same-named classes stay reachable by their qualified names
+        first = manager.get_prompt("sales.outreach.Shared")
+        second = manager.get_prompt("support.billing.refund.Shared")
+        assert first is not second
+        assert manager.get_prompt("Shared") in (first, second)
+
+    def test_iter_names_by_prefix(self, namespaced_dir):
+        """Test prefix queries on the name index."""
+        manager = PromptManager(prompt_paths=namespaced_dir)
+        assert list(manager.iter_names("support.billing.")) == [
+            "support.billing.invoice.InvoicePrompt",
+            "support.billing.refund.RefundPrompt",
+            "support.billing.refund.Shared",
+        ]
+        assert len(list(manager.iter_names())) == 5
+        assert list(manager.iter_names("nope.")) == []
+
+    def test_list_names_pages(self, namespaced_dir):
+        """Test paginated listing."""
+        manager = PromptManager(prompt_paths=namespaced_dir)
+        first = manager.list_names("support.", limit=2)
+        assert first == [
+            "support.billing.invoice.InvoicePrompt",
+            "support.billing.refund.RefundPrompt",
+        ]
+        second = manager.list_names("support.", limit=2, after=first[-1])
+        assert second == ["support.billing.refund.Shared", "support.triage.TriagePrompt"]
+        assert manager.list_names("support.", limit=2, after=second[-1]) == []
+        with pytest.raises(ValueError, match="limit must be positive"):
+            manager.list_names(limit=0)
+
+    def test_not_found_suggests_names(self, namespaced_dir):
+        """Test that a failed lookup suggests close names."""
+        manager = PromptManager(prompt_paths=namespaced_dir)
+        assert manager.suggest_names("RefundPromt")[0] == "RefundPrompt"
+        assert manager.suggest_names("XefundPrompt")[0] == "RefundPrompt"
+        with pytest.raises(ValueError, match=r"Did you mean: \['TriagePrompt'"):
+            manager.get_prompt("TriagePromp")
+
+    def test_reload_keeps_index_current(self, namespaced_dir):
+        """Test that the index follows added files."""
+        manager = PromptManager(prompt_paths=namespaced_dir)
+        path = os.path.join(namespaced_dir, "support", "billing", "dispute.py")
+        with open(path, "w") as f:
+            f.write(PACKAGED_PROMPT.format(name="DisputePrompt"))
+        report = manager.reload()
+        assert report["added"] == ["DisputePrompt"]
+        assert "support.billing.dispute.DisputePrompt" in manager.list_names("support.billing.")
+
+    def test_same_module_path_under_two_roots(self, tmp_path, caplog):
+        """Test that a module path taken by an earlier root is prefixed with the root label."""
+        import logging
+
+        for root in ("a", "b", os.path.join("c", "a")):
+            tmp_path.joinpath(root).mkdir(parents=True)
+            tmp_path.joinpath(root, "x.py").write_text(PACKAGED_PROMPT.format(name="Shared"))
+        roots = [str(tmp_path / "a"), str(tmp_path / "b"), str(tmp_path / "c" / "a")]
+        with caplog.at_level(logging.WARNING):
+            manager = PromptManager(prompt_paths=roots)
+        assert "'x.Shared'" in caplog.text and "registered as 'b.x.Shared'" in caplog.text
+        assert list(manager.iter_names()) == ["a_2.x.Shared", "b.x.Shared", "x.Shared"]
+        assert manager.get_prompt("x.Shared") is not manager.get_prompt("b.x.Shared")
+        # as for bare names across paths, the last root wins
+        assert manager.get_prompt("Shared") is manager.get_prompt("a_2.x.Shared")
+
+    def test_names_do_not_depend_on_other_sources(self, namespaced_dir):
+        """Test that adding a source without collisions keeps the qualified names."""
+        alone = list(PromptManager(prompt_paths=namespaced_dir).iter_names())
+        combined = PromptManager(prompt_paths=namespaced_dir, prompt_packages=["json"])
+        assert list(combined.iter_names()) == alone
+
+    def test_catalog_includes_shadowed_classes(self, namespaced_dir):
+        """Test that a class whose bare name refers to another one is still exported."""
+        manager = PromptManager(prompt_paths=namespaced_dir)
+        keys = [key for key, _ in manager.iter_metadata(fields=["name"])]
+        assert len(keys) == 5
+        assert "Shared" in keys
+        assert len(manager.fingerprints()) == 5
+        shadowed = next(key for key in keys if key.endswith(".Shared"))
+        assert manager.get_prompt(shadowed) is not manager.get_prompt("Shared")
+
+    def test_duplicate_qualified_name_warns(self, tmp_path, monkeypatch, caplog):
+        """Test that a package module already loaded from a path keeps the first class and warns."""
+        import logging
+        import sys
+
+        package_dir = tmp_path / "gs_test_ns_prompts"
+        package_dir.mkdir()
+        package_dir.joinpath("__init__.py").write_text("")
+        package_dir.joinpath("x.py").write_text(PACKAGED_PROMPT.format(name="Shared"))
+        monkeypatch.syspath_prepend(str(tmp_path))
+        try:
+            with caplog.at_level(logging.WARNING):
+                manager = PromptManager(
+                    prompt_paths=str(tmp_path), prompt_packages="gs_test_ns_prompts"
+                )
+            assert (
+                "Qualified prompt name 'gs_test_ns_prompts.x.Shared' in package:gs_test_ns_prompts.x "
+                "is already taken. Skipping."
+            ) in caplog.text
+            assert list(manager.iter_names()) == ["gs_test_ns_prompts.x.Shared"]
+            assert manager.get_prompt("Shared") is manager.get_prompt("gs_test_ns_prompts.x.Shared")
+        finally:
+            for name in list(sys.modules):
+                if name.startswith("gs_test_ns_prompts"):
+                    del sys.modules[name]
+
+
+ASSOCIATED_PROMPT = """
+from gs_prompt_manager import PromptBase
+
+class {name}(PromptBase):
+    def set_prompt_chat(self):
+        return "{name}"
+
+    def set_associated_prompt(self):
+        self.associated_prompt = {associated}
+"""
+
+
+class TestPromptManagerAssociatedPrompts:
+    """Tests for associated prompts resolved by name."""
+
+    def write(self, directory, name, associated):
+        with open(os.path.join(directory, f"{name.lower()}.py"), "w") as f:
+            f.write(ASSOCIATED_PROMPT.format(name=name, associated=associated))
+
+    def test_shared_instance_and_dependency_order(self, tmp_path):
+        """Test that every parent resolves to the one registered fragment."""
+        directory = str(tmp_path)
+        self.write(directory, "Fragment", {})
+        for i in range(3):
+            self.write(directory, f"Parent{i}", {"footer": "Fragment"})
+        self.write(directory, "Outer", {"inner": "parent0.Parent0"})
+        manager = PromptManager(prompt_paths=directory)
+        fragment = manager.get_prompt("Fragment")
+        for i in range(3):
+            assert manager.get_prompt(f"Parent{i}").get_associated_prompt("footer") is fragment
+        outer = manager.get_prompt("Outer")
+        assert outer.get_associated_prompt("inner") is manager.get_prompt("Parent0")
+        order = manager._dependency_order
+        assert order.index("fragment.Fragment") < order.index("parent0.Parent0")
+        assert order.index("parent0.Parent0") < order.index("outer.Outer")
+
+    def test_resolution_follows_reload(self, tmp_path):
+        """Test that a reloaded fragment is picked up by unchanged parents."""
+        import time
+
+        directory = str(tmp_path)
+        self.write(directory, "Fragment", {})
+        self.write(directory, "Parent", {"footer": "Fragment"})
+        manager = PromptManager(prompt_paths=directory)
+        parent = manager.get_prompt("Parent")
+        time.sleep(0.01)
+        with open(os.path.join(directory, "fragment.py"), "a") as f:
+            f.write("\n# changed\n    def set_prompt_system(self):\n        return 'new'\n")
+        report = manager.reload()
+        assert "Fragment" in report["updated"]
+        assert manager.get_prompt("Parent") is parent
+        assert parent.get_associated_prompt("footer").prompt_system == "new"
+
+    def test_cycle_raises(self, tmp_path):
+        """Test that associated prompts naming each other are rejected."""
+        directory = str(tmp_path)
+        self.write(directory, "First", {"next": "Second"})
+        self.write(directory, "Second", {"next": "Third"})
+        self.write(directory, "Third", {"back": "First"})
+        with pytest.raises(ValueError, match="Associated prompts form a cycle") as excinfo:
+            PromptManager(prompt_paths=directory)
+        for name in ("first.First", "second.Second", "third.Third"):
+            assert name in str(excinfo.value)
+
+    def test_unknown_name_is_logged(self, tmp_path, caplog):
+        """Test that a name missing from the registry is reported at load."""
+        directory = str(tmp_path)
+        self.write(directory, "Lonely", {"footer": "Nowhere"})
+        manager = PromptManager(prompt_paths=directory)
+        assert "names unknown prompt 'Nowhere'" in caplog.text
+        with pytest.raises(ValueError, match="Prompt 'Nowhere' not found"):
+            manager.get_prompt("Lonely").get_associated_prompt("footer")
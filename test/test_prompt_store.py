@@ -0,0 +1,226 @@
+"""
+Tests for PromptStore, prompt definitions and store-backed PromptManager lookups.
+"""
+import io
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from gs_prompt_manager import PromptBase, PromptManager, PromptStore
+
+
+class StoredPrompt(PromptBase):
+    """A prompt exported to the store."""
+
+    def set_prompt_chat(self):
+        return "Translate to {language}: {text} (<<STYLE>>)"
+
+    def set_prompt_system(self):
+        return "Translator, <<DATETIME>>"
+
+    def set_prompt_pieces_available(self):
+        self.prompt_pieces_available = ["language", "text"]
+
+    def set_prompt_pieces_default_value(self):
+        self.prompt_pieces_default_value = {"language": "French"}
+
+    def set_prompt_predefine_value(self):
+        return {"<<STYLE>>": "formal", "<<DATETIME>>": "2024-01-01 00:00:00"}
+
+    def set_name(self):
+        self.name = "StoredPrompt"
+
+    def set_tools(self):
+        self.tools = ["dictionary"]
+
+
+class LinkedPrompt(StoredPrompt):
+    """A stored prompt that refers to another prompt by name."""
+
+    def set_associated_prompt(self):
+        self.associated_prompt = {"glossary": "Glossary"}
+
+    def set_name(self):
+        self.name = "LinkedPrompt"
+
+
+def make_definition(name, version="1", tags=None, chat="Hi {who}"):
+    return {
+        "name": name,
+        "version": version,
+        "prompt_chat": chat,
+        "prompt_pieces_available": ["who"],
+        "tags": tags or [],
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PromptStore(str(tmp_path / "prompts.db"))
+    yield store
+    store.close()
+
+
+class TestPromptDefinition:
+    """Test suite for PromptBase.to_definition / from_definition."""
+
+    def test_round_trip_keeps_fingerprint_and_rendering(self):
+        """Test that a recreated prompt renders and fingerprints like the original."""
+        prompt = StoredPrompt()
+        recreated = PromptBase.from_definition(prompt.to_definition())
+        assert recreated.fingerprint == prompt.fingerprint
+        assert recreated.get_prompt_chat({"text": "hi"}) == prompt.get_prompt_chat({"text": "hi"})
+        assert recreated.tools == ["dictionary"]
+
+    def test_volatile_macros_get_fresh_values(self):
+        """Test that <<DATETIME>> is not stored but resolved again."""
+        definition = StoredPrompt().to_definition()
+        assert "<<DATETIME>>" not in definition["prompt_predefine_value"]
+        recreated = PromptBase.from_definition(definition)
+        assert "<<DATETIME>>" not in recreated.get_prompt_system({"text": "x"})
+
+    def test_bound_prompt_cannot_be_exported(self):
+        """Test that exporting a bound prompt raises."""
+        with pytest.raises(ValueError, match="Cannot export bound prompt"):
+            StoredPrompt().bind(text="x").to_definition()
+
+    def test_round_trip_keeps_associated_prompts(self):
+        """Test that name-valued associated prompts are exported and recreated."""
+        prompt = LinkedPrompt()
+        recreated = PromptBase.from_definition(prompt.to_definition())
+        assert recreated.associated_prompt == {"glossary": "Glossary"}
+        assert recreated.associated_prompt_names == ["glossary"]
+        assert recreated.fingerprint == prompt.fingerprint
+
+    def test_instance_associated_prompt_cannot_be_exported(self):
+        """Test that exporting an associated prompt given as an instance raises."""
+        prompt = StoredPrompt()
+        prompt.associated_prompt = {"glossary": StoredPrompt()}
+        with pytest.raises(ValueError, match="refer to them by name"):
+            prompt.to_definition()
+
+
+class TestPromptStore:
+    """Test suite for PromptStore."""
+
+    def test_bulk_import_from_subclasses_and_load(self, store):
+        """Test importing subclasses and materializing them lazily."""
+        assert store.put_many([StoredPrompt, make_definition("Other")]) == 2
+        assert len(store) == 2
+        assert "StoredPrompt" in store
+        prompt = store.load("StoredPrompt")
+        assert prompt.get_prompt_chat({"text": "x"}) == "Translate to French: x (formal)"
+        assert store.fingerprint("StoredPrompt") == StoredPrompt().fingerprint
+
+    def test_versions_latest_wins(self, store):
+        """Test that the latest stored version is used unless a version is given."""
+        store.put(make_definition("P", "1", chat="one {who}"))
+        store.put(make_definition("P", "2", chat="two {who}"))
+        assert store.versions("P") == ["1", "2"]
+        assert store.load("P").get_prompt_chat({"who": "x"}) == "two x"
+        assert store.load("P", "1").get_prompt_chat({"who": "x"}) == "one x"
+        assert store.delete("P", "2") == 1
+        assert store.load("P").version == "1"
+
+    def test_lookup_by_tag(self, store):
+        """Test the tag index, including re-tagging on replace."""
+        store.put_many(
+            [
+                make_definition("A", tags=["support"]),
+                make_definition("B", tags=["support", "sales"]),
+                make_definition("C", tags=["sales"]),
+            ]
+        )
+        assert store.names(tag="support") == ["A", "B"]
+        store.put(make_definition("A", tags=["sales"]))
+        assert store.names(tag="support") == ["B"]
+        assert store.names(tag="sales") == ["A", "B", "C"]
+
+    def test_missing_prompt_and_invalid_definition(self, store):
+        """Test errors for unknown prompts and definitions without templates."""
+        with pytest.raises(ValueError, match="not found in prompt store"):
+            store.load("Missing")
+        assert store.get_definition("Missing") is None
+        with pytest.raises(ValueError):
+            store.put({"name": "Broken", "version": "1"})
+        assert "Broken" not in store
+
+    def test_export_import_jsonl(self, store, tmp_path):
+        """Test exporting to JSON lines and importing into another store."""
+        store.put_many([StoredPrompt, make_definition("Other", tags=["t"])])
+        buffer = io.StringIO()
+        assert store.export_jsonl(buffer) == 2
+        other = PromptStore(str(tmp_path / "other.db"))
+        assert other.import_jsonl(io.StringIO(buffer.getvalue())) == 2
+        assert other.names() == ["Other", "StoredPrompt"]
+        assert other.names(tag="t") == ["Other"]
+
+
+class TestPromptManagerPromptStore:
+    """Test suite for PromptManager with a prompt store."""
+
+    def test_lazy_lookup_from_store(self, store):
+        """Test that stored prompts are materialized on first access only."""
+        store.put_many([make_definition(f"P{i}") for i in range(20)])
+        manager = PromptManager(prompt_store=store)
+        assert manager.prompt_instances == {}
+        assert len(manager.get_prompt_names()) == 20
+        prompt = manager.get_prompt("P3")
+        assert manager.get_prompt("P3") is prompt
+        assert list(manager._store_instances) == ["P3"]
+        with pytest.raises(ValueError, match="Prompt 'Missing' not found"):
+            manager.get_prompt("Missing")
+
+    def test_files_take_precedence(self, store):
+        """Test that a prompt loaded from a file shadows a stored one of the same name."""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(temp_dir, "file_prompt.py"), "w") as f:
+                f.write(
+                    "from gs_prompt_manager import PromptBase\n"
+                    "class Shared(PromptBase):\n"
+                    "    def set_prompt_chat(self):\n"
+                    "        return 'from file'\n"
+                    "    def set_name(self):\n"
+                    "        self.name = 'Shared'\n"
+                )
+            store.put(make_definition("Shared", chat="from store"))
+            manager = PromptManager(prompt_paths=temp_dir, prompt_store=store.path)
+            assert manager.get_prompt("Shared").get_prompt_chat() == "from file"
+            assert manager.get_prompt_names() == ["Shared"]
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_reload_picks_up_store_changes(self, store):
+        """Test that reload drops materialized prompts whose stored definition changed."""
+        store.put_many([make_definition("A", chat="old {who}"), make_definition("B")])
+        manager = PromptManager(prompt_store=store)
+        manager.get_prompt("A")
+        manager.get_prompt("B")
+        store.put(make_definition("A", chat="new {who}"))
+        store.delete("B")
+        report = manager.reload()
+        assert report["updated"] == ["A"]
+        assert report["removed"] == ["B"]
+        assert manager.get_prompt("A").get_prompt_chat({"who": "x"}) == "new x"
+
+    def test_reload_picks_up_metadata_changes(self, store):
+        """Test that a stored description change replaces the materialized prompt."""
+        store.put(dict(make_definition("A"), description="old"))
+        manager = PromptManager(prompt_store=store)
+        manager.get_prompt("A")
+        store.put(dict(make_definition("A"), description="new"))
+        assert manager.reload()["updated"] == ["A"]
+        assert manager.get_prompt("A").description == "new"
+
+    def test_reload_keeps_unchanged_exported_prompts(self, store):
+        """Test that prompts stored from instances are not reported as updated on reload."""
+        store.put_many([LinkedPrompt, make_definition("Glossary")])
+        manager = PromptManager(prompt_store=store)
+        prompt = manager.get_prompt("LinkedPrompt")
+        assert prompt.get_associated_prompt("glossary").name == "Glossary"
+        report = manager.reload()
+        assert report["updated"] == []
+        assert manager.get_prompt("LinkedPrompt") is prompt
@@ -0,0 +1,44 @@
+"""
+Tests for CompiledTemplate.
+"""
+from gs_prompt_manager.prompt_template import CompiledTemplate
+
+
+class TestCompiledTemplate:
+    """Test suite for CompiledTemplate."""
+
+    def test_split_into_literals_and_slots(self):
+        """Test that the template is split around available pieces only."""
+        compiled = CompiledTemplate.compile("A {x} B {y} C {z}", ["x", "y"], {})
+        assert compiled.literals == ("A ", " B ", " C {z}")
+        assert compiled.slots == ("x", "y")
+
+    def test_longest_piece_name_wins(self):
+        """Test that overlapping names do not match each other."""
+        compiled = CompiledTemplate.compile("{a}{ab}", ["a", "ab"], {})
+        assert compiled.slots == ("a", "ab")
+        assert compiled.render({"a": "1", "ab": "2"}) == "12"
+
+    def test_macros_folded_at_compile_time(self):
+        """Test that macros are substituted into the static text."""
+        compiled = CompiledTemplate.compile("<<M>> {x} <<N>>", ["x"], {"<<M>>": "m"})
+        assert compiled.literals == ("m ", " <<N>>")
+        assert compiled.unresolved_macros == ("<<N>>",)
+
+    def test_repeated_slot(self):
+        """Test a piece used more than once."""
+        compiled = CompiledTemplate.compile("{x}-{x}", ["x"], {})
+        assert compiled.render({"x": "v"}) == "v-v"
+
+    def test_no_slots(self):
+        """Test a template without pieces."""
+        compiled = CompiledTemplate.compile("static", [], {})
+        assert compiled.render({}) == "static"
+
+    def test_bind_folds_slots(self):
+        """Test that bind merges bound slots into the neighbouring literals."""
+        compiled = CompiledTemplate.compile("A {x} B {y} C", ["x", "y"], {})
+        bound = compiled.bind({"x": "1"})
+        assert bound.literals == ("A 1 B ", " C")
+        assert bound.slots == ("y",)
+        assert bound.render({"y": "2"}) == compiled.render({"x": "1", "y": "2"})
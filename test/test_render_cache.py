@@ -0,0 +1,157 @@
+"""
+Tests for the shared SQLite render cache.
+"""
+import multiprocessing
+
+import pytest
+
+from gs_prompt_manager import PromptBase, RenderCache
+
+
+class CachedPrompt(PromptBase):
+    """A prompt rendered through the RenderCache assigned by each test."""
+
+    def set_prompt_chat(self):
+        return "Hello {name}, it is <<DATETIME>>"
+
+    def set_prompt_system(self):
+        return "System for {name}"
+
+    def set_prompt_pieces_available(self):
+        self.prompt_pieces_available = ["name"]
+
+    def set_name(self):
+        self.name = "CachedPrompt"
+
+
+def _render_in_child(path, queue):
+    cache = RenderCache(path)
+    prompt = CachedPrompt(prompt_chat="Hello {name}")
+    prompt.render_cache = cache
+    prompt.get_prompt_chat({"name": "shared"})
+    queue.put(cache.stats()["hits"])
+
+
+class TestRenderCache:
+    """Test suite for RenderCache."""
+
+    def test_get_set_and_stats(self, tmp_path):
+        """Test storing, reading and the hit/miss counters."""
+        cache = RenderCache(str(tmp_path / "cache.db"))
+        assert cache.get("k") is None
+        cache.set("k", "value")
+        assert cache.get("k") == "value"
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+        assert stats["hit_rate"] == 0.5
+        assert stats["bytes"] == len("value")
+        assert stats["mean_lookup_us"] > 0
+
+    def test_ttl_expires_entries(self, tmp_path):
+        """Test that an entry with a past TTL is not returned and can be purged."""
+        cache = RenderCache(str(tmp_path / "cache.db"), ttl=3600)
+        cache.set("old", "x", ttl=-1)
+        cache.set("new", "y")
+        assert cache.get("old") is None
+        assert cache.get("new") == "y"
+        assert cache.purge_expired() == 1
+
+    def test_size_eviction_drops_oldest(self, tmp_path):
+        """Test that the oldest entries are evicted when over max_bytes."""
+        cache = RenderCache(str(tmp_path / "cache.db"), max_bytes=25)
+        for i in range(5):
+            cache.set(f"k{i}", "0123456789")
+        stats = cache.stats()
+        assert stats["bytes"] <= 25
+        assert stats["evictions"] == 3
+        assert cache.get("k0") is None
+        assert cache.get("k4") == "0123456789"
+
+    def test_overwrite_keeps_size_total(self, tmp_path):
+        """Test that replacing an entry updates the stored size."""
+        cache = RenderCache(str(tmp_path / "cache.db"))
+        cache.set("k", "abc")
+        cache.set("k", "abcdef")
+        assert cache.stats()["bytes"] == 6
+        cache.clear()
+        assert cache.stats()["bytes"] == 0
+
+    def test_invalid_max_bytes(self, tmp_path):
+        """Test that a non-positive max_bytes raises."""
+        with pytest.raises(ValueError, match="max_bytes must be positive"):
+            RenderCache(str(tmp_path / "cache.db"), max_bytes=0)
+
+
+class TestPromptBaseRenderCache:
+    """Test suite for cached PromptBase renders."""
+
+    def test_renders_are_cached_per_template_and_pieces(self, tmp_path):
+        """Test that equal renders hit and different pieces or templates miss."""
+        cache = RenderCache(str(tmp_path / "cache.db"))
+        prompt = CachedPrompt()
+        prompt.render_cache = cache
+        first = prompt.get_prompt_chat({"name": "a"})
+        assert prompt.get_prompt_chat({"name": "a"}) == first
+        prompt.get_prompt_chat({"name": "b"})
+        prompt.get_prompt_system({"name": "a"})
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 3)
+
+    def test_volatile_macro_value_is_part_of_key(self, tmp_path):
+        """Test that a changed <<DATETIME>> is not served from the cache."""
+        cache = RenderCache(str(tmp_path / "cache.db"))
+        prompt = CachedPrompt()
+        prompt.render_cache = cache
+        prompt.get_prompt_chat({"name": "a"})
+        prompt.prompt_predefine_value["<<DATETIME>>"] = "1999-01-01 00:00:00"
+        assert prompt.get_prompt_chat({"name": "a"}).endswith("1999-01-01 00:00:00")
+
+    def test_in_place_changes_miss(self, tmp_path):
+        """Test that macros and defaults changed in place are not served from the cache."""
+        cache = RenderCache(str(tmp_path / "cache.db"))
+        prompt = CachedPrompt(prompt_chat="Org <<ORG>> {name}")
+        prompt.render_cache = cache
+        prompt.prompt_predefine_value["<<ORG>>"] = "A"
+        prompt.prompt_pieces_default_value["name"] = "1"
+        assert prompt.get_prompt_chat() == "Org A 1"
+        prompt.prompt_predefine_value = {"<<ORG>>": "B"}
+        assert prompt.get_prompt_chat() == "Org B 1"
+        prompt.prompt_pieces_default_value["name"] = "2"
+        assert prompt.get_prompt_chat() == "Org B 2"
+
+    def test_repeat_changes_miss(self, tmp_path):
+        """Test that a repeated piece's separator changed in place is not served from the cache."""
+        cache = RenderCache(str(tmp_path / "cache.db"))
+        prompt = CachedPrompt(
+            prompt_chat="L: {items}",
+            prompt_pieces_available=["items"],
+            prompt_pieces_repeat={"items": {"item": "- {item}", "separator": "\n"}},
+        )
+        prompt.render_cache = cache
+        assert prompt.get_prompt_chat({"items": ["a", "b"]}) == "L: - a\n- b"
+        prompt.prompt_pieces_repeat["items"]["separator"] = ", "
+        assert prompt.get_prompt_chat({"items": ["a", "b"]}) == "L: - a, - b"
+
+    def test_definition_change_misses(self, tmp_path):
+        """Test that a changed definition (fingerprint) does not reuse old renders."""
+        cache = RenderCache(str(tmp_path / "cache.db"))
+        first = CachedPrompt(prompt_chat="One {name}")
+        second = CachedPrompt(prompt_chat="Two {name}")
+        first.render_cache = second.render_cache = cache
+        first.get_prompt_chat({"name": "a"})
+        assert second.get_prompt_chat({"name": "a"}) == "Two a"
+
+    def test_shared_between_processes(self, tmp_path):
+        """Test that a render stored by one process is a hit in another."""
+        path = str(tmp_path / "cache.db")
+        cache = RenderCache(path)
+        prompt = CachedPrompt(prompt_chat="Hello {name}")
+        prompt.render_cache = cache
+        prompt.get_prompt_chat({"name": "shared"})
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        child = context.Process(target=_render_in_child, args=(path, queue))
+        child.start()
+        hits = queue.get(timeout=30)
+        child.join(30)
+        assert hits == 1
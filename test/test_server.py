@@ -0,0 +1,247 @@
+"""
+Tests for the local render server and client.
+"""
+import asyncio
+import os
+import shutil
+import socket
+import tempfile
+import threading
+
+import pytest
+
+from gs_prompt_manager import PromptManager
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="Unix domain sockets not available"
+)
+
+from gs_prompt_manager.server import PromptClient, PromptServer  # noqa: E402
+
+ECHO_PROMPT = """
+from gs_prompt_manager import PromptBase
+
+class EchoPrompt(PromptBase):
+    def set_prompt_chat(self):
+        return "Echo: {text}"
+
+    def set_prompt_system(self):
+        return "System for {text}"
+
+    def set_prompt_pieces_available(self):
+        self.prompt_pieces_available = ["text"]
+
+    def set_name(self):
+        self.name = "EchoPrompt"
+"""
+
+
+@pytest.fixture
+def server_socket():
+    """Serve a prompt directory on a Unix socket from a background thread."""
+    temp_dir = tempfile.mkdtemp()
+    with open(os.path.join(temp_dir, "echo_prompt.py"), "w") as f:
+        f.write(ECHO_PROMPT)
+    manager = PromptManager(prompt_paths=temp_dir)
+    path = os.path.join(temp_dir, "prompts.sock")
+    server = PromptServer(manager, path)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.start())
+        started.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    started.wait(5)
+
+    yield path
+
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.close()
+    shutil.rmtree(temp_dir)
+
+
+class TestPromptServer:
+    """Test suite for PromptServer and PromptClient."""
+
+    def test_render_mirrors_prompt_manager(self, server_socket):
+        """Test that client.get_prompt(name).get_prompt_chat(pieces) renders remotely."""
+        with PromptClient(server_socket, timeout=5) as client:
+            prompt = client.get_prompt("EchoPrompt")
+            assert prompt.get_prompt_chat({"text": "hi"}) == "Echo: hi"
+            assert prompt.get_prompt_system({"text": "hi"}) == "System for hi"
+            assert prompt.get_messages({"text": "x"})[1] == {"role": "user", "content": "Echo: x"}
+            assert prompt.get_metadata()["name"] == "EchoPrompt"
+            assert client.get_prompt_names() == ["EchoPrompt"]
+
+    def test_errors_are_raised_client_side(self, server_socket):
+        """Test that a missing prompt and a missing piece raise ValueError on the client."""
+        with PromptClient(server_socket, timeout=5) as client:
+            with pytest.raises(ValueError, match="Prompt 'Missing' not found"):
+                client.get_prompt("Missing")
+            with pytest.raises(ValueError, match="required in prompt input"):
+                client.get_prompt("EchoPrompt").get_prompt_chat()
+            # the connection is still usable
+            assert client.get_prompt("EchoPrompt").get_prompt_chat({"text": "ok"}) == "Echo: ok"
+
+    def test_render_batch_pipelined_in_order(self, server_socket):
+        """Test that a pipelined batch returns results in input order."""
+        with PromptClient(server_socket, timeout=5, window=8) as client:
+            results = client.render_batch("EchoPrompt", ({"text": str(i)} for i in range(100)))
+        assert results == [f"Echo: {i}" for i in range(100)]
+
+    def test_render_batch_error_after_draining(self, server_socket):
+        """Test that a failed render in a batch raises after all responses are read."""
+        with PromptClient(server_socket, timeout=5, window=4) as client:
+            with pytest.raises(ValueError):
+                client.render_batch("EchoPrompt", [{"text": "a"}, {}, {"text": "c"}])
+            assert client.get_prompt_names() == ["EchoPrompt"]
+
+    def test_render_batch_large_frames(self, server_socket):
+        """Test that large pipelined requests and responses do not block client and server."""
+        pieces = [{"text": str(i) * (1024 * 1024)} for i in range(8)]
+        with PromptClient(server_socket, timeout=30) as client:
+            results = client.render_batch("EchoPrompt", pieces)
+            assert [len(result) for result in results] == [len("Echo: ") + 1024 * 1024] * 8
+            assert client.get_prompt_names() == ["EchoPrompt"]
+
+    def test_multiple_clients(self, server_socket):
+        """Test that several clients share one server."""
+        clients = [PromptClient(server_socket, timeout=5) for _ in range(3)]
+        try:
+            for i, client in enumerate(clients):
+                assert client.get_prompt("EchoPrompt").get_prompt_chat({"text": str(i)}) == f"Echo: {i}"
+        finally:
+            for client in clients:
+                client.close()
+
+    def test_malformed_frames_get_error_responses(self, server_socket):
+        """Test that invalid JSON and non-object requests are answered, not dropped."""
+        import json
+        from gs_prompt_manager.server import _HEADER
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as raw:
+            raw.settimeout(5)
+            raw.connect(server_socket)
+            for payload in (b"{not json", b"[1, 2]"):
+                raw.sendall(_HEADER.pack(len(payload)) + payload)
+            reader = raw.makefile("rb")
+            responses = []
+            for _ in range(2):
+                (length,) = _HEADER.unpack(reader.read(_HEADER.size))
+                responses.append(json.loads(reader.read(length)))
+            reader.close()
+        assert [response["ok"] for response in responses] == [False, False]
+        assert responses[1]["error"] == "A request must be a JSON object."
+        # the server keeps serving
+        with PromptClient(server_socket, timeout=5) as client:
+            assert client.get_prompt_names() == ["EchoPrompt"]
+
+    def test_unencodable_result_is_an_error(self):
+        """Test that a result that cannot be JSON encoded is answered with an error."""
+        import json
+        from gs_prompt_manager.server import _HEADER
+
+        server = PromptServer(PromptManager(prompt_paths=[]), "unused.sock")
+        server._operations["bad"] = lambda request: object()
+        frame = server._dispatch(b'{"id": 7, "op": "bad"}')
+        response = json.loads(frame[_HEADER.size:])
+        assert response["id"] == 7 and response["ok"] is False
+        assert response["type"] == "TypeError"
+
+
+def serve_raw(path, respond):
+    """Accept one connection on `path` and answer each request frame with respond(request)."""
+    import json
+    from gs_prompt_manager.server import _HEADER, encode_frame
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen(1)
+
+    def run():
+        connection, _ = listener.accept()
+        reader = connection.makefile("rb")
+        try:
+            while True:
+                header = reader.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    break
+                (length,) = _HEADER.unpack(header)
+                response = respond(json.loads(reader.read(length)))
+                if response is not None:
+                    connection.sendall(encode_frame(response))
+        finally:
+            reader.close()
+            connection.close()
+            listener.close()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+class TestPromptClientFailures:
+    """Test that a failed connection is closed instead of reading stale responses."""
+
+    def test_response_to_another_request(self, tmp_path):
+        """Test that a response with the wrong id breaks the connection."""
+        path = str(tmp_path / "raw.sock")
+        serve_raw(path, lambda request: {"id": request["id"] + 1, "ok": True, "result": []})
+        client = PromptClient(path, timeout=5)
+        with pytest.raises(ConnectionError, match="expected id 1"):
+            client.get_prompt_names()
+        with pytest.raises(ConnectionError, match="expected id 1"):
+            client.get_prompt_names()
+
+    def test_timeout_breaks_connection(self, tmp_path):
+        """Test that a timed out call does not leave its late response for the next call."""
+        path = str(tmp_path / "raw.sock")
+        serve_raw(path, lambda request: None)
+        client = PromptClient(path, timeout=0.2)
+        with pytest.raises(ConnectionError, match="timed out"):
+            client.get_prompt_names()
+        with pytest.raises(ConnectionError, match="timed out"):
+            client.render_batch("EchoPrompt", [{"text": "a"}])
+
+
+class TestPromptServerSocketPath:
+    """Tests for the checks before a server takes over its socket path."""
+
+    def test_refuses_to_replace_a_regular_file(self, tmp_path):
+        """Test that an existing file at the socket path is kept."""
+        path = tmp_path / "prompts.py"
+        path.write_text("keep me")
+        server = PromptServer(PromptManager(prompt_paths=[]), str(path))
+        with pytest.raises(ValueError, match="is not a socket"):
+            asyncio.run(server.start())
+        assert path.read_text() == "keep me"
+
+    def test_refuses_a_live_socket(self, server_socket):
+        """Test that a second server does not take over a running server's socket."""
+        server = PromptServer(PromptManager(prompt_paths=[]), server_socket)
+        with pytest.raises(ValueError, match="already listening"):
+            asyncio.run(server.start())
+        with PromptClient(server_socket, timeout=5) as client:
+            assert client.get_prompt_names() == ["EchoPrompt"]
+
+    def test_replaces_a_stale_socket(self, tmp_path):
+        """Test that a socket file without a server is replaced and removed on close."""
+        path = str(tmp_path / "stale.sock")
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()
+        server = PromptServer(PromptManager(prompt_paths=[]), path)
+
+        async def run():
+            await server.start()
+            await server.close()
+
+        asyncio.run(run())
+        assert not os.path.exists(path)
@@ -0,0 +1,153 @@
+"""
+Tests for ToolRegistry and tools resolved by PromptManager.
+"""
+import json
+import os
+
+import pytest
+
+from gs_prompt_manager import PromptBase, PromptManager, ToolRegistry
+
+SEARCH = {
+    "type": "function",
+    "function": {
+        "name": "search",
+        "description": "Search the knowledge base",
+        "parameters": {"type": "object", "properties": {"query": {"type": "string"}}},
+    },
+}
+WEATHER = {
+    "type": "function",
+    "function": {"name": "weather", "description": "Météo", "parameters": {"type": "object"}},
+}
+
+TOOL_PROMPT = """
+from gs_prompt_manager import PromptBase
+
+class {name}(PromptBase):
+    def set_prompt_chat(self):
+        return "Answer {{question}}"
+
+    def set_tools(self):
+        self.tools = {tools}
+"""
+
+
+@pytest.fixture
+def tool_dir(tmp_path):
+    prompts = {
+        "SearchPrompt": ["search", "weather"],
+        "OtherSearchPrompt": ["search", "weather"],
+        "PlainPrompt": [],
+        "BrokenPrompt": ["missing"],
+    }
+    for name, tools in prompts.items():
+        with open(os.path.join(str(tmp_path), f"{name.lower()}.py"), "w") as f:
+            f.write(TOOL_PROMPT.format(name=name, tools=tools))
+    return str(tmp_path)
+
+
+class TestToolRegistry:
+    """Test suite for ToolRegistry."""
+
+    def test_resolve_encodes_once_per_tool_list(self):
+        """Test that equal tool lists share one ToolSet."""
+        registry = ToolRegistry({"search": SEARCH, "weather": WEATHER})
+        tool_set = registry.resolve(["search", "weather"])
+        assert tool_set.definitions == [SEARCH, WEATHER]
+        assert json.loads(tool_set.json) == [SEARCH, WEATHER]
+        assert registry.resolve(("search", "weather")) is tool_set
+        assert registry.resolve(["weather"]) is not tool_set
+
+    def test_unknown_tool_raises(self):
+        """Test that resolving an unregistered tool fails."""
+        registry = ToolRegistry({"search": SEARCH})
+        with pytest.raises(ValueError, match=r"Unknown tools \['nope'\] for MyPrompt"):
+            registry.resolve(["search", "nope"], "MyPrompt")
+
+    def test_register_validates_and_copies(self):
+        """Test definition checks and isolation from later caller changes."""
+        registry = ToolRegistry()
+        with pytest.raises(ValueError, match="must be a dict"):
+            registry.register("bad", ["not", "a", "dict"])
+        with pytest.raises(ValueError, match="not JSON serializable"):
+            registry.register("bad", {"default": object()})
+        definition = {"name": "echo"}
+        registry.register("echo", definition)
+        definition["name"] = "changed"
+        assert registry.get("echo") == {"name": "echo"}
+        assert "echo" in registry and len(registry) == 1
+
+    def test_register_replaces_cached_sets(self):
+        """Test that a new definition is used by the next resolve."""
+        registry = ToolRegistry({"search": SEARCH})
+        before = registry.resolve(["search"])
+        registry.register("search", WEATHER)
+        assert registry.resolve(["search"]).definitions == [WEATHER]
+        assert before.definitions == [SEARCH]
+
+
+class TestPromptManagerTools:
+    """Tests for tools resolved at load."""
+
+    def test_tools_resolved_at_load(self, tool_dir, caplog):
+        """Test that prompts get shared, pre-encoded tool sets."""
+        manager = PromptManager(
+            prompt_paths=tool_dir, tool_registry={"search": SEARCH, "weather": WEATHER}
+        )
+        prompt = manager.get_prompt("SearchPrompt")
+        assert prompt.get_tools() == [SEARCH, WEATHER]
+        assert prompt.tool_set is manager.get_prompt("OtherSearchPrompt").tool_set
+        assert manager.get_prompt("PlainPrompt").tool_set is None
+        assert manager.get_prompt("BrokenPrompt").tool_set is None
+        assert "Error resolving tools of prompt" in caplog.text
+
+    def test_request_body_includes_tools(self, tool_dir):
+        """Test that the encoded tools are added to the request body."""
+        manager = PromptManager(
+            prompt_paths=tool_dir, tool_registry={"search": SEARCH, "weather": WEATHER}
+        )
+        prompt = manager.get_prompt("SearchPrompt")
+        body = json.loads(prompt.get_request_body({"question": "q"}, model="m"))
+        assert body["tools"] == [SEARCH, WEATHER]
+        assert body["model"] == "m"
+        assert "tools" not in json.loads(
+            prompt.get_request_body({"question": "q"}, include_tools=False)
+        )
+        assert json.loads(prompt.get_request_body({"question": "q"}, tools=[]))["tools"] == []
+        assert "tools" not in json.loads(prompt.get_messages({"question": "q"}, as_json=True))
+
+    def test_reload_picks_up_registry_changes(self, tool_dir):
+        """Test that a reload re-resolves the tools of unchanged prompts."""
+        registry = ToolRegistry({"search": SEARCH, "weather": WEATHER})
+        manager = PromptManager(prompt_paths=tool_dir, tool_registry=registry)
+        prompt = manager.get_prompt("SearchPrompt")
+        registry.register("weather", SEARCH)
+        manager.reload()
+        assert manager.get_prompt("SearchPrompt") is prompt
+        assert prompt.get_tools() == [SEARCH, SEARCH]
+
+    def test_reload_updates_stored_prompt_tools(self, tmp_path):
+        """Test that a reload re-resolves the tools of kept store prompts."""
+        from gs_prompt_manager import PromptStore
+
+        store = PromptStore(str(tmp_path / "prompts.db"))
+        try:
+            store.put({"name": "StoredSearch", "prompt_chat": "Hi", "tools": ["weather"]})
+            registry = ToolRegistry({"weather": WEATHER})
+            manager = PromptManager(prompt_store=store, tool_registry=registry)
+            prompt = manager.get_prompt("StoredSearch")
+            assert prompt.get_tools() == [WEATHER]
+            registry.register("weather", SEARCH)
+            assert manager.reload()["unchanged"] == ["StoredSearch"]
+            assert manager.get_prompt("StoredSearch") is prompt
+            assert json.loads(prompt.get_request_body())["tools"] == [SEARCH]
+        finally:
+            store.close()
+
+    def test_without_registry(self):
+        """Test that a prompt outside a manager has no resolved tools."""
+        prompt = PromptBase(prompt_chat="Hi", tools=["search"])
+        assert prompt.tool_set is None
+        assert prompt.get_tools() == []
+        assert "tools" not in json.loads(prompt.get_request_body())
@@ -0,0 +1,109 @@
+"""
+Tests for the WarningAggregator and its use in PromptBase rendering.
+"""
+import logging
+from gs_prompt_manager import PromptBase, WarningAggregator
+from gs_prompt_manager.warning_aggregator import OVERFLOW_KEY, UNKNOWN_PIECE, UNRESOLVED_MACRO
+
+
+class AggregatedPrompt(PromptBase):
+    """A prompt with an unresolved macro, reporting to the aggregator assigned by each test."""
+
+    def set_prompt_chat(self):
+        return "Hello {name} <<MISSING>>"
+
+    def set_prompt_pieces_available(self):
+        self.prompt_pieces_available = ["name"]
+
+    def set_prompt_pieces_default_value(self):
+        self.prompt_pieces_default_value = {"name": "World"}
+
+    def set_name(self):
+        self.name = "AggregatedPrompt"
+
+
+class TestWarningAggregator:
+    """Test suite for WarningAggregator."""
+
+    def test_first_occurrence_logged_repeats_counted(self, caplog):
+        """Test that only the first occurrence is logged and all are counted."""
+        aggregator = WarningAggregator(interval=3600)
+        with caplog.at_level(logging.WARNING):
+            for _ in range(5):
+                aggregator.record("P", UNKNOWN_PIECE, "bad", ["good"])
+        assert caplog.text.count("Unknown piece 'bad'") == 1
+        assert aggregator.get_counts() == {("P", UNKNOWN_PIECE, "bad"): 5}
+
+    def test_flush_summarizes_repeats_once(self, caplog):
+        """Test that flush reports repeats since the previous summary only."""
+        aggregator = WarningAggregator(interval=3600)
+        for _ in range(3):
+            aggregator.record("P", UNRESOLVED_MACRO, "<<X>>")
+        with caplog.at_level(logging.WARNING):
+            aggregator.flush()
+            aggregator.flush()
+        assert caplog.text.count("Suppressed 2 repeated") == 1
+
+    def test_interval_triggers_summary(self, caplog):
+        """Test that a repeat after the interval elapsed emits a summary."""
+        aggregator = WarningAggregator(interval=0)
+        with caplog.at_level(logging.WARNING):
+            aggregator.record("P", UNKNOWN_PIECE, "bad")
+            aggregator.record("P", UNKNOWN_PIECE, "bad")
+        assert "Suppressed 1 repeated" in caplog.text
+
+    def test_tracked_keys_are_capped(self):
+        """Test that keys beyond max_keys are counted in an overflow entry."""
+        aggregator = WarningAggregator(interval=3600, max_keys=3)
+        for i in range(10):
+            aggregator.record("P", UNKNOWN_PIECE, f"key{i}")
+        counts = aggregator.get_counts()
+        assert len(counts) == 4
+        assert counts[("P", UNKNOWN_PIECE, OVERFLOW_KEY)] == 7
+
+    def test_first_logs_rate_limited(self, caplog):
+        """Test that a flood of new keys logs a bounded number of full records."""
+        aggregator = WarningAggregator(interval=3600, max_first_logs=2)
+        with caplog.at_level(logging.WARNING):
+            for i in range(50):
+                aggregator.record("P", UNKNOWN_PIECE, f"key{i}", ["good"])
+            aggregator.record("Q", UNKNOWN_PIECE, "other")
+        assert caplog.text.count("Unknown piece") == 3
+        caplog.clear()
+        with caplog.at_level(logging.WARNING):
+            aggregator.flush()
+        assert "Suppressed 48 repeated" in caplog.text
+        assert "and 28 more" in caplog.text
+
+    def test_get_summary_and_reset(self):
+        """Test the summary records and reset."""
+        aggregator = WarningAggregator(interval=3600)
+        aggregator.record("P", UNKNOWN_PIECE, "a")
+        aggregator.record("P", UNKNOWN_PIECE, "b")
+        aggregator.record("P", UNKNOWN_PIECE, "b")
+        summary = aggregator.get_summary()
+        assert summary[0] == {"prompt": "P", "kind": UNKNOWN_PIECE, "key": "b", "count": 2}
+        aggregator.reset()
+        assert aggregator.get_summary() == []
+
+    def test_render_records_unknown_pieces_and_macros(self, caplog):
+        """Test that rendering feeds the prompt's aggregator instead of logging every call."""
+        aggregator = WarningAggregator(interval=3600)
+        prompt = AggregatedPrompt()
+        prompt.warning_aggregator = aggregator
+        with caplog.at_level(logging.WARNING):
+            for _ in range(10):
+                prompt.get_prompt_chat({"name": "Bob", "extra": "x"})
+        counts = aggregator.get_counts()
+        assert counts[("AggregatedPrompt", UNKNOWN_PIECE, "extra")] == 10
+        assert counts[("AggregatedPrompt", UNRESOLVED_MACRO, "<<MISSING>>")] == 10
+        assert caplog.text.count("Unknown piece 'extra'") == 1
+        assert caplog.text.count("Unresolved macro '<<MISSING>>'") == 1
+
+    def test_no_warning_skips_macro_check(self):
+        """Test that no_warning suppresses unresolved macro counting."""
+        aggregator = WarningAggregator(interval=3600)
+        prompt = AggregatedPrompt()
+        prompt.warning_aggregator = aggregator
+        prompt.get_prompt_chat(no_warning=True)
+        assert aggregator.get_counts() == {}